@@ -53,6 +53,13 @@ class JobStatus(str, Enum):
     CANCELLED = "cancelled"
 
 
+class JobPriority(int, Enum):
+    """Claim order of pending jobs (lower runs first)"""
+
+    INTERACTIVE = 0  # User is waiting on the result (thumbnails, previews)
+    BATCH = 10  # Bulk processing
+
+
 class LicenseType(str, Enum):
     """Pack license type"""
 
@@ -83,12 +90,23 @@ class Asset(SQLModel, table=True):
     path: str = Field(index=True, unique=True, description="Absolute file path")
     type: AssetType = Field(index=True, description="Asset media type")
     hash: str | None = Field(default=None, index=True, description="File content hash (SHA256)")
+    quick_hash: str | None = Field(
+        default=None, index=True, description="Size + head/tail sample fingerprint (cheap duplicate prefilter)"
+    )
+    phash: str | None = Field(default=None, index=True, description="Perceptual dHash (hex, images only)")
+    size_bytes: int | None = Field(default=None, description="File size in bytes at last scan")
+    mtime: float | None = Field(default=None, description="File modification time (epoch seconds) at last scan")
+    missing: bool = Field(default=False, index=True, description="File no longer found on disk")
+    canonical_id: int | None = Field(
+        default=None, index=True, description="Canonical asset with identical content (None if this is canonical)"
+    )
 
     # Metadata (filled by probing in future steps)
     width: int | None = Field(default=None, description="Image/video width in pixels")
     height: int | None = Field(default=None, description="Image/video height in pixels")
     duration: float | None = Field(default=None, description="Audio/video duration in seconds")
     samplerate: int | None = Field(default=None, description="Audio sample rate in Hz")
+    probed_at: datetime | None = Field(default=None, description="When media metadata was last probed (or attempted)")
 
     # Classification
     theme: str | None = Field(default=None, index=True, description="Asset theme/category (fantasy, sci-fi, etc)")
@@ -152,6 +170,8 @@ class Job(SQLModel, table=True):
     kind: JobKind = Field(index=True, description="Type of job")
     asset_id: int | None = Field(default=None, index=True, description="Asset being processed (if applicable)")
     pack_id: int | None = Field(default=None, index=True, description="Pack being processed (if applicable)")
+    priority: int = Field(default=JobPriority.BATCH, index=True, description="JobPriority; lower is claimed first")
+    batch_id: str | None = Field(default=None, index=True, description="Groups jobs created by one request")
 
     # Parameters (JSON-serialized)
     params_json: str | None = Field(default=None, description="Job parameters as JSON string")
@@ -162,9 +182,45 @@ class Job(SQLModel, table=True):
 
     # Results
     result_path: str | None = Field(default=None, description="Path to output file (if applicable)")
+    result_json: str | None = Field(default=None, description="Per-item results of batch jobs as JSON")
     error_message: str | None = Field(default=None, description="Error message if failed")
 
     # Timestamps
     created_at: datetime = Field(default_factory=lambda: datetime.now(UTC), description="When job was created")
     started_at: datetime | None = Field(default=None, description="When job started running")
     completed_at: datetime | None = Field(default=None, description="When job finished (success or failure)")
+
+    # Lease (durable queue: a worker owns a RUNNING job only while its lease is renewed)
+    worker_id: str | None = Field(default=None, index=True, description="Worker process that claimed the job")
+    lease_expires_at: datetime | None = Field(default=None, description="Job is re-queued if not renewed by then")
+    heartbeat_at: datetime | None = Field(default=None, description="Last lease renewal by the worker")
+    attempts: int = Field(default=0, description="Times the job has been claimed")
+
+
+class Artifact(SQLModel, table=True):
+    """
+    Artifact - Cached job output derived from asset content
+
+    One row per (content hash, job kind, variant, params, tool version);
+    jobs look up the key before recomputing. Rows are evicted least
+    recently used first when Work/ exceeds its size budget.
+    """
+
+    __tablename__ = "artifacts"
+
+    id: int | None = Field(default=None, primary_key=True)
+
+    key: str = Field(index=True, unique=True, description="SHA256 of content hash, kind, variant, params, tool version")
+    content_hash: str = Field(index=True, description="SHA256 of the source content")
+    kind: JobKind = Field(index=True, description="Job kind that produced the output")
+    variant: str | None = Field(default=None, description="Job params type (video_poster, audio_waveform, ...)")
+    tool_version: str = Field(description="Version of the tool/model that produced the output")
+
+    path: str = Field(description="Output file")
+    size_bytes: int = Field(default=0, description="Output size in bytes")
+    hits: int = Field(default=0, description="Times the output was reused")
+
+    created_at: datetime = Field(default_factory=lambda: datetime.now(UTC), description="When output was produced")
+    last_used_at: datetime = Field(
+        default_factory=lambda: datetime.now(UTC), index=True, description="Last store or reuse (LRU order)"
+    )
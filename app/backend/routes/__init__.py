@@ -1,5 +1,5 @@
 """Backend Routes Package"""
 
-from app.backend.routes import health, jobs, probe
+from app.backend.routes import assets, health, jobs, probe
 
-__all__ = ["health", "jobs", "probe"]
+__all__ = ["assets", "health", "jobs", "probe"]
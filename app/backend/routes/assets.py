@@ -0,0 +1,73 @@
+"""
+Assets Routes - Asset Library Queries
+
+Near-duplicate lookup over perceptual hashes (see app/core/phash.py)
+and thumbnail cache statistics
+"""
+
+from fastapi import APIRouter, HTTPException, Query
+from pydantic import BaseModel
+from sqlmodel import Session
+
+from app.backend.models.entities import Asset
+from app.core.db import get_engine
+from app.core.logging import get_logger
+from app.core.phash import find_similar
+from app.core.thumbnails import get_thumbnail_cache_stats
+
+logger = get_logger(__name__)
+router = APIRouter()
+
+
+class SimilarAssetResponse(BaseModel):
+    """Near-duplicate of a queried asset"""
+
+    id: int
+    path: str
+    distance: int
+    """Hamming distance between perceptual hashes (0 = visually identical)"""
+
+
+class ThumbnailCacheStatsResponse(BaseModel):
+    """Thumbnail cache usage"""
+
+    entries: int
+    bytes: int
+    max_bytes: int
+    hits: int
+    misses: int
+    hit_rate: float
+    evictions: int
+
+
+@router.get("/thumbnails/stats", response_model=ThumbnailCacheStatsResponse)
+async def get_thumbnail_stats():
+    """Thumbnail cache hits/misses since startup and bytes on disk"""
+    return ThumbnailCacheStatsResponse(**get_thumbnail_cache_stats())
+
+
+@router.get("/assets/{asset_id}/similar", response_model=list[SimilarAssetResponse])
+def get_similar_assets(asset_id: int, max_distance: int | None = Query(default=None, ge=0, le=64)):
+    """
+    Find images that look like the given asset
+
+    Plain def: the database reads and the first similarity index build
+    block, so FastAPI runs this in its threadpool instead of the event loop.
+
+    Args:
+        asset_id: Query asset ID
+        max_distance: Hamming radius (defaults to settings.phash_max_distance)
+
+    Returns:
+        Similar assets, closest first
+    """
+    with Session(get_engine()) as session:
+        asset = session.get(Asset, asset_id)
+        if not asset:
+            raise HTTPException(status_code=404, detail=f"Asset {asset_id} not found")
+        if not asset.phash:
+            raise HTTPException(status_code=422, detail=f"Asset {asset_id} has no perceptual hash")
+
+    matches = find_similar(asset_id, max_distance)
+    logger.info(f"Found {len(matches)} assets similar to {asset_id}")
+    return [SimilarAssetResponse(id=a.id, path=a.path, distance=distance) for a, distance in matches]
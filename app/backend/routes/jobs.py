@@ -2,23 +2,52 @@
 Jobs Routes - Background Job Management
 
 STEP 6: Integrated with threadpool queue for bg-remove, poster, waveform jobs
+
+Clients follow many jobs with one request: GET /jobs (bulk, paginated) or
+GET /jobs/stream (server-sent events fed from the queue's in-memory state).
 """
 
+import asyncio
+import json
+import time
+from collections.abc import AsyncIterator, Awaitable, Callable
 from datetime import UTC, datetime
+from typing import Any
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 
+from app.backend.models import entities
 from app.backend.models.entities import JobKind
 from app.backend.models.schemas import JobCreate, JobResponse, JobStatus
 from app.core.logging import get_logger
-from app.workers.jobs.bg_remove import run_bg_remove_job
-from app.workers.jobs.thumbnails import run_audio_waveform_job, run_video_poster_job
-from app.workers.queue import enqueue_job, get_job_status
+from app.workers.jobs.bg_remove import batch_timeout
+from app.workers.queue import (
+    cancel_batch,
+    enqueue_job,
+    enqueue_jobs,
+    get_batch_status,
+    get_job_events,
+    get_job_status,
+    get_live_progress,
+    list_jobs,
+)
 
 logger = get_logger(__name__)
 router = APIRouter()
 
+# Event stream tuning
+STREAM_POLL_SEC = 0.25  # How often new transitions/progress are pushed
+STREAM_KEEPALIVE_SEC = 15.0  # Comment line sent when idle (keeps proxies from closing)
+STREAM_SNAPSHOT_LIMIT = 1000  # Jobs sent in the initial snapshot
+
+TERMINAL_STATUSES = {
+    entities.JobStatus.COMPLETED.value,
+    entities.JobStatus.FAILED.value,
+    entities.JobStatus.CANCELLED.value,
+}
+
 
 # Request/Response Models
 class BgRemoveRequest(BaseModel):
@@ -33,6 +62,30 @@ class JobIdResponse(BaseModel):
 
     job_ids: list[int]
     """List of created job IDs"""
+    batch_id: str | None = None
+    """Groups the created jobs (GET /jobs/batches/{batch_id})"""
+    skipped_asset_ids: list[int] = []
+    """Requested assets that do not exist"""
+
+
+class BatchStatusResponse(BaseModel):
+    """Aggregate state of a batch of jobs"""
+
+    batch_id: str
+    total: int
+    counts: dict[str, int]
+    """Jobs per status"""
+    progress: float
+    """Mean progress of all jobs"""
+    done: bool
+    """No job is pending or running"""
+
+
+class BatchCancelResponse(BaseModel):
+    """Result of cancelling a batch"""
+
+    batch_id: str
+    cancelled: int
 
 
 class JobStatusResponse(BaseModel):
@@ -40,22 +93,128 @@ class JobStatusResponse(BaseModel):
 
     id: int
     kind: str
+    priority: int | None = None
+    batch_id: str | None = None
     status: str
     progress: float
     result_path: str | None
+    results: list[dict[str, Any]] | None = None
     error_message: str | None
     created_at: str | None
     started_at: str | None
     completed_at: str | None
 
 
+class JobListResponse(BaseModel):
+    """Page of jobs"""
+
+    total: int
+    """Jobs matching the filters"""
+    offset: int
+    limit: int
+    jobs: list[JobStatusResponse]
+
+
+def _parse_list(value: str | None, parse: Callable[[str], Any], name: str) -> list | None:
+    """Parse a comma-separated query parameter (422 on bad items)"""
+    if value is None:
+        return None
+    try:
+        return [parse(item.strip()) for item in value.split(",") if item.strip()]
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=f"Invalid {name}: {value}") from e
+
+
+def _enqueue_for_assets(kind: JobKind, asset_ids: list[int], params: dict[str, Any] | None = None) -> JobIdResponse:
+    """Create one job per asset in a single transaction (422 if no asset exists)"""
+    batch_id, job_ids, skipped = enqueue_jobs(kind, asset_ids, params=params)
+    if skipped:
+        logger.warning(f"Skipped {len(skipped)} unknown assets: {skipped[:20]}")
+    if not job_ids:
+        raise HTTPException(status_code=422, detail="None of the requested assets exist")
+    return JobIdResponse(job_ids=job_ids, batch_id=batch_id, skipped_asset_ids=skipped)
+
+
+def _sse(event: str, data: dict[str, Any]) -> str:
+    """Format one server-sent event"""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+async def stream_job_events(
+    is_disconnected: Callable[[], Awaitable[bool]],
+    ids: list[int] | None = None,
+    statuses: list[entities.JobStatus] | None = None,
+    poll_interval: float = STREAM_POLL_SEC,
+) -> AsyncIterator[str]:
+    """
+    Server-sent events for job state
+
+    Sends a "snapshot" of the matching jobs from the database once, then
+    "job" events for transitions and "progress" events for running jobs,
+    both from memory. A "resync" event means events were missed and the
+    client should fetch GET /jobs again.
+
+    Args:
+        is_disconnected: Returns True once the client has gone
+        ids: Only these jobs
+        statuses: Only transitions into these states (progress is sent if
+            running is included or no filter is given)
+        poll_interval: Seconds between pushes
+    """
+    events = get_job_events()
+    seq = events.seq
+    wanted_ids = set(ids) if ids is not None else None
+    wanted_statuses = {status.value for status in statuses} if statuses else None
+    send_progress = wanted_statuses is None or entities.JobStatus.RUNNING.value in wanted_statuses
+
+    total, jobs = list_jobs(ids=ids, statuses=statuses, limit=STREAM_SNAPSHOT_LIMIT)
+    yield _sse("snapshot", {"total": total, "jobs": jobs})
+
+    sent_progress: dict[int, float] = {job["id"]: job["progress"] for job in jobs}
+    finished: set[int] = set()
+    last_sent = time.monotonic()
+    while not await is_disconnected():
+        chunks = []
+        if send_progress:
+            for job_id, progress in get_live_progress().items():
+                if wanted_ids is not None and job_id not in wanted_ids:
+                    continue
+                if job_id not in finished and sent_progress.get(job_id) != progress:
+                    sent_progress[job_id] = progress
+                    chunks.append(_sse("progress", {"id": job_id, "progress": progress}))
+
+        seq, new_events, complete = events.since(seq)
+        if not complete:
+            chunks.append(_sse("resync", {"seq": seq}))
+        for event in new_events:
+            if event["status"] in TERMINAL_STATUSES:
+                finished.add(event["id"])
+                sent_progress.pop(event["id"], None)
+            elif event["status"] == entities.JobStatus.PENDING.value:
+                finished.discard(event["id"])  # Re-queued
+            if wanted_ids is not None and event["id"] not in wanted_ids:
+                continue
+            if wanted_statuses is not None and event["status"] not in wanted_statuses:
+                continue
+            chunks.append(_sse("job", event))
+
+        if chunks:
+            yield "".join(chunks)
+            last_sent = time.monotonic()
+        elif time.monotonic() - last_sent > STREAM_KEEPALIVE_SEC:
+            yield ": keep-alive\n\n"
+            last_sent = time.monotonic()
+
+        await asyncio.sleep(poll_interval)
+
+
 @router.post("/jobs/bg-remove", response_model=JobIdResponse, status_code=201)
 async def create_bg_remove_jobs(request: BgRemoveRequest):
     """
     Create background removal job(s)
 
     Accepts list of asset IDs and enqueues background removal jobs.
-    Returns list of created job IDs.
+    Returns list of created job IDs and their batch ID.
 
     Args:
         request: BgRemoveRequest with asset_ids
@@ -64,27 +223,37 @@ async def create_bg_remove_jobs(request: BgRemoveRequest):
         JobIdResponse with list of job IDs
     """
     logger.info(f"Creating {len(request.asset_ids)} background removal jobs")
+    return _enqueue_for_assets(JobKind.BG_REMOVE, request.asset_ids)
 
-    job_ids = []
-    for asset_id in request.asset_ids:
-        try:
-            job_id = enqueue_job(
-                kind=JobKind.BG_REMOVE,
-                job_func=run_bg_remove_job,
-                asset_id=asset_id,
-                params={"asset_id": asset_id},
-            )
-            job_ids.append(job_id)
-            logger.info(f"Enqueued BG removal job {job_id} for asset {asset_id}")
-
-        except Exception as e:
-            logger.error(f"Failed to enqueue job for asset {asset_id}: {e}")
-            continue
 
-    if not job_ids:
-        raise HTTPException(status_code=500, detail="Failed to enqueue any jobs")
+@router.post("/jobs/bg-remove-batch", response_model=JobIdResponse, status_code=201)
+async def create_bg_remove_batch_job(request: BgRemoveRequest):
+    """
+    Create one batch background removal job for many assets
 
-    return JobIdResponse(job_ids=job_ids)
+    Much faster than one job per asset for large selections: the model is
+    loaded once per worker and images stream through it. Per-image results
+    are returned in the job's "results".
+
+    Args:
+        request: BgRemoveRequest with asset_ids
+
+    Returns:
+        JobIdResponse with the single batch job ID
+    """
+    if not request.asset_ids:
+        raise HTTPException(status_code=422, detail="asset_ids must not be empty")
+
+    logger.info(f"Creating batch background removal job for {len(request.asset_ids)} assets")
+    job_id = enqueue_job(
+        kind=JobKind.BG_REMOVE,
+        params={
+            "type": "batch",
+            "asset_ids": request.asset_ids,
+            "timeout_sec": batch_timeout(len(request.asset_ids)),
+        },
+    )
+    return JobIdResponse(job_ids=[job_id])
 
 
 @router.post("/jobs/video-poster", response_model=JobIdResponse, status_code=201)
@@ -101,26 +270,7 @@ async def create_video_poster_jobs(request: BgRemoveRequest):
         JobIdResponse with list of job IDs
     """
     logger.info(f"Creating {len(request.asset_ids)} video poster jobs")
-
-    job_ids = []
-    for asset_id in request.asset_ids:
-        try:
-            job_id = enqueue_job(
-                kind=JobKind.THUMBNAIL,
-                job_func=run_video_poster_job,
-                asset_id=asset_id,
-                params={"asset_id": asset_id, "type": "video_poster"},
-            )
-            job_ids.append(job_id)
-
-        except Exception as e:
-            logger.error(f"Failed to enqueue video poster job for asset {asset_id}: {e}")
-            continue
-
-    if not job_ids:
-        raise HTTPException(status_code=500, detail="Failed to enqueue any jobs")
-
-    return JobIdResponse(job_ids=job_ids)
+    return _enqueue_for_assets(JobKind.THUMBNAIL, request.asset_ids, params={"type": "video_poster"})
 
 
 @router.post("/jobs/audio-waveform", response_model=JobIdResponse, status_code=201)
@@ -137,26 +287,103 @@ async def create_audio_waveform_jobs(request: BgRemoveRequest):
         JobIdResponse with list of job IDs
     """
     logger.info(f"Creating {len(request.asset_ids)} audio waveform jobs")
+    return _enqueue_for_assets(JobKind.THUMBNAIL, request.asset_ids, params={"type": "audio_waveform"})
 
-    job_ids = []
-    for asset_id in request.asset_ids:
-        try:
-            job_id = enqueue_job(
-                kind=JobKind.THUMBNAIL,
-                job_func=run_audio_waveform_job,
-                asset_id=asset_id,
-                params={"asset_id": asset_id, "type": "audio_waveform"},
-            )
-            job_ids.append(job_id)
-
-        except Exception as e:
-            logger.error(f"Failed to enqueue audio waveform job for asset {asset_id}: {e}")
-            continue
 
-    if not job_ids:
-        raise HTTPException(status_code=500, detail="Failed to enqueue any jobs")
+@router.post("/jobs/thumbnails", response_model=JobIdResponse, status_code=201)
+async def create_thumbnail_pyramid_jobs(request: BgRemoveRequest):
+    """
+    Create grid thumbnail job(s)
+
+    Each job decodes one image or video once and caches its WebP thumbnail
+    pyramid (64/128/256/512), so later grid requests at any zoom are hits.
+
+    Args:
+        request: Request with asset_ids
+
+    Returns:
+        JobIdResponse with list of job IDs
+    """
+    logger.info(f"Creating {len(request.asset_ids)} thumbnail pyramid jobs")
+    return _enqueue_for_assets(JobKind.THUMBNAIL, request.asset_ids, params={"type": "pyramid"})
+
+
+@router.get("/jobs", response_model=JobListResponse)
+async def list_jobs_route(
+    ids: str | None = Query(None, description="Comma-separated job IDs"),
+    status: str | None = Query(None, description="Comma-separated statuses (pending,running,...)"),
+    kind: str | None = Query(None, description="Comma-separated job kinds"),
+    batch_id: str | None = Query(None, description="Only jobs of this batch"),
+    offset: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=1000),
+):
+    """
+    Retrieve many jobs in one request
+
+    Replaces polling GET /jobs/{job_id} per job. Results are ordered by job
+    ID; running jobs report their live progress.
+
+    Returns:
+        JobListResponse with the total match count and one page of jobs
+    """
+    total, jobs = list_jobs(
+        ids=_parse_list(ids, int, "ids"),
+        statuses=_parse_list(status, entities.JobStatus, "status"),
+        kinds=_parse_list(kind, JobKind, "kind"),
+        batch_id=batch_id,
+        offset=offset,
+        limit=limit,
+    )
+    return JobListResponse(total=total, offset=offset, limit=limit, jobs=[JobStatusResponse(**job) for job in jobs])
 
-    return JobIdResponse(job_ids=job_ids)
+
+# Declared before /jobs/{job_id} so "stream" is not parsed as a job ID
+@router.get("/jobs/stream")
+async def stream_jobs(
+    request: Request,
+    ids: str | None = Query(None, description="Comma-separated job IDs (default: all jobs)"),
+    status: str | None = Query(None, description="Comma-separated statuses to report transitions into"),
+):
+    """
+    Stream job state as server-sent events
+
+    Events: snapshot (initial state), job (transition), progress (running
+    job progress), resync (missed events; refetch GET /jobs).
+    """
+    generator = stream_job_events(
+        request.is_disconnected,
+        ids=_parse_list(ids, int, "ids"),
+        statuses=_parse_list(status, entities.JobStatus, "status"),
+    )
+    return StreamingResponse(
+        generator, media_type="text/event-stream", headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@router.get("/jobs/batches/{batch_id}", response_model=BatchStatusResponse)
+async def get_batch(batch_id: str):
+    """
+    Retrieve aggregate status of a batch (404 if unknown)
+
+    Use GET /jobs?batch_id=... for the individual jobs.
+    """
+    status = get_batch_status(batch_id)
+    if not status:
+        raise HTTPException(status_code=404, detail=f"Batch {batch_id} not found")
+    return BatchStatusResponse(**status)
+
+
+@router.post("/jobs/batches/{batch_id}/cancel", response_model=BatchCancelResponse)
+async def cancel_batch_route(batch_id: str):
+    """
+    Cancel all pending and running jobs of a batch
+
+    Returns:
+        BatchCancelResponse with the number of jobs cancelled
+    """
+    if not get_batch_status(batch_id):
+        raise HTTPException(status_code=404, detail=f"Batch {batch_id} not found")
+    return BatchCancelResponse(batch_id=batch_id, cancelled=cancel_batch(batch_id))
 
 
 @router.get("/jobs/{job_id}", response_model=JobStatusResponse)
@@ -11,9 +11,11 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
-from app.backend.routes import health, jobs, llm, probe, prompts
+from app.backend.routes import assets, health, jobs, llm, probe, prompts
 from app.core.db import create_db_and_tables
 from app.core.logging import get_logger
+from app.workers.cpu_pool import shutdown_cpu_executor
+from app.workers.queue import start_queue, stop_queue
 
 logger = get_logger(__name__)
 
@@ -32,6 +34,16 @@ async def startup_event():
     create_db_and_tables()
     logger.info("Database initialized successfully")
 
+    # Resume jobs left pending/running by a previous run
+    start_queue()
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Stop claiming jobs; unfinished ones resume on next start"""
+    stop_queue()
+    shutdown_cpu_executor()
+
 
 # CORS - allow localhost UI to communicate with backend
 app.add_middleware(
@@ -49,6 +61,7 @@ async def startup_event():
 app.include_router(health.router, prefix="/api", tags=["health"])
 app.include_router(probe.router, prefix="/api", tags=["probe"])
 app.include_router(jobs.router, prefix="/api", tags=["jobs"])
+app.include_router(assets.router, prefix="/api", tags=["assets"])
 app.include_router(llm.router)
 app.include_router(prompts.router)  # LLM routes have /api/llm prefix built-in
 
@@ -0,0 +1,208 @@
+"""
+Derived Artifact Cache
+Reuse job outputs keyed on input content, parameters and tool version
+
+Jobs that derive a file from an asset (background removal, posters,
+waveforms) compute a key from the asset's content hash, the job kind and
+variant, the parameters that affect the output and the version of the tool
+that produces it. A hit returns the existing file instantly; a miss writes
+the output to a key-derived path (no collision-suffix loops) and records it.
+
+The `artifacts` table doubles as an LRU index: every store or reuse bumps
+last_used_at, and once the tracked outputs exceed ARTIFACT_CACHE_MAX_MB the
+least recently used files are deleted. Only files recorded here are ever
+evicted.
+"""
+
+import hashlib
+import json
+import threading
+from datetime import UTC, datetime
+from functools import cache
+from importlib.metadata import PackageNotFoundError, version
+from pathlib import Path
+from typing import Any
+
+from sqlalchemy import delete, func
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlmodel import Session, select, update
+
+from app.backend.models.entities import Artifact, JobKind
+from app.core.config import settings
+from app.core.db import chunked, get_engine
+from app.core.logging import get_logger
+
+logger = get_logger(__name__)
+
+# Lookup counters of this process
+_stats_lock = threading.Lock()
+_hits = 0
+_misses = 0
+
+
+@cache
+def package_version(name: str) -> str:
+    """Installed version of a Python package ("unknown" if not installed)"""
+    try:
+        return version(name)
+    except PackageNotFoundError:
+        return "unknown"
+
+
+def artifact_key(
+    content_hash: str, kind: JobKind, variant: str | None, params: dict[str, Any] | None, tool_version: str
+) -> str:
+    """
+    Cache key of a derived output
+
+    Args:
+        content_hash: SHA256 of the source asset
+        kind: Job kind
+        variant: Job params type (None for kinds with one output)
+        params: Settings that change the output (model, size, quality, ...)
+        tool_version: Version of the producing tool; bump it when output changes
+
+    Returns:
+        Hex SHA256 key
+    """
+    payload = json.dumps([content_hash, kind.value, variant, params or {}, tool_version], sort_keys=True)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def artifact_output_path(directory: Path, stem: str, tag: str, key: str, suffix: str) -> Path:
+    """Output path for a key: {directory}/{stem}_{tag}_{key[:12]}{suffix}"""
+    return directory / f"{stem}_{tag}_{key[:12]}{suffix}"
+
+
+def lookup_artifact(key: str) -> Path | None:
+    """
+    Find the cached output for a key
+
+    Marks the artifact as recently used. Rows whose file was deleted
+    outside the cache are dropped.
+
+    Returns:
+        Path to the output, or None on a miss
+    """
+    global _hits, _misses
+    engine = get_engine()
+    with Session(engine) as session:
+        artifact = session.exec(select(Artifact).where(Artifact.key == key)).first()
+        path = Path(artifact.path) if artifact else None
+        if artifact and not path.exists():
+            logger.info(f"Cached artifact vanished, dropping: {path}")
+            session.delete(artifact)
+            session.commit()
+            path = None
+        elif artifact:
+            session.exec(
+                update(Artifact)
+                .where(Artifact.id == artifact.id)
+                .values(hits=Artifact.hits + 1, last_used_at=datetime.now(UTC))
+            )
+            session.commit()
+
+    with _stats_lock:
+        if path:
+            _hits += 1
+        else:
+            _misses += 1
+    return path
+
+
+def store_artifact(
+    key: str, content_hash: str, kind: JobKind, variant: str | None, tool_version: str, path: Path
+) -> None:
+    """
+    Record a freshly produced output, then evict if over budget
+
+    Args:
+        key: artifact_key() of the output
+        content_hash: SHA256 of the source asset
+        kind: Job kind
+        variant: Job params type
+        tool_version: Version of the producing tool
+        path: Output file (must exist)
+    """
+    now = datetime.now(UTC)
+    values = {
+        "key": key,
+        "content_hash": content_hash,
+        "kind": kind,
+        "variant": variant,
+        "tool_version": tool_version,
+        "path": str(path),
+        "size_bytes": path.stat().st_size,
+        "hits": 0,
+        "created_at": now,
+        "last_used_at": now,
+    }
+    stmt = sqlite_insert(Artifact.__table__).values(**values)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["key"],
+        set_={"path": stmt.excluded.path, "size_bytes": stmt.excluded.size_bytes, "last_used_at": now},
+    )
+
+    engine = get_engine()
+    with Session(engine) as session:
+        session.exec(stmt)
+        session.commit()
+
+    evict_artifacts()
+
+
+def evict_artifacts(max_bytes: int | None = None) -> int:
+    """
+    Delete least recently used outputs until the cache fits its budget
+
+    Args:
+        max_bytes: Size budget (default: settings.artifact_cache_max_mb)
+
+    Returns:
+        Number of artifacts evicted
+    """
+    budget = max_bytes if max_bytes is not None else settings.artifact_cache_max_mb * 1024 * 1024
+    engine = get_engine()
+    with Session(engine) as session:
+        total = session.exec(select(func.coalesce(func.sum(Artifact.size_bytes), 0))).one()
+        if total <= budget:
+            return 0
+
+        victims: list[tuple[int, str]] = []
+        rows = session.exec(select(Artifact.id, Artifact.path, Artifact.size_bytes).order_by(Artifact.last_used_at))
+        for artifact_id, path, size_bytes in rows:
+            if total <= budget:
+                break
+            victims.append((artifact_id, path))
+            total -= size_bytes
+
+        for _, path in victims:
+            try:
+                Path(path).unlink(missing_ok=True)
+            except OSError as e:
+                logger.warning(f"Cannot delete cached artifact {path}: {e}")
+        for chunk in chunked([artifact_id for artifact_id, _ in victims]):
+            session.exec(delete(Artifact).where(Artifact.id.in_(chunk)))
+        session.commit()
+
+    logger.info(f"Evicted {len(victims)} cached artifacts ({total / 1024 / 1024:.1f} MB kept)")
+    return len(victims)
+
+
+def get_artifact_stats() -> dict[str, Any]:
+    """Cached outputs, their size and this process's hit rate"""
+    engine = get_engine()
+    with Session(engine) as session:
+        count, total = session.exec(
+            select(func.count(Artifact.id), func.coalesce(func.sum(Artifact.size_bytes), 0))
+        ).one()
+
+    lookups = _hits + _misses
+    return {
+        "artifacts": count,
+        "size_bytes": total,
+        "budget_bytes": settings.artifact_cache_max_mb * 1024 * 1024,
+        "hits": _hits,
+        "misses": _misses,
+        "hit_rate": _hits / lookups if lookups else 0.0,
+    }
@@ -23,6 +23,14 @@ class Settings(BaseSettings):
 
     # Database
     db_path: str = "./podstudio.db"
+    db_journal_mode: str = "WAL"  # WAL lets readers proceed while one thread writes
+    db_synchronous: str = "NORMAL"  # Safe with WAL; FULL fsyncs on every commit
+    db_busy_timeout_ms: int = 5000  # Wait this long for a write lock instead of "database is locked"
+    db_mmap_size_mb: int = 256  # Memory-mapped reads
+    db_cache_size_mb: int = 64  # Page cache per connection
+    db_pool_size: int = 8  # Pooled connections (job workers + watcher + API + UI)
+    db_pool_overflow: int = 8  # Extra short-lived connections under bursts
+    db_pool_timeout_sec: float = 30.0  # Wait for a free pooled connection
 
     # External Tools
     media_tools_ffmpeg: str = "ffmpeg"
@@ -40,10 +48,33 @@ class Settings(BaseSettings):
 
     # File Watcher
     watch_folders: str = ""  # Comma-separated paths
+    ingest_batch_size: int = 200  # Max new files per insert transaction
+    ingest_batch_window_sec: float = 0.5  # Max wait before flushing a partial batch
+    watch_reconcile_on_start: bool = True  # Sync DB with watch folders when watcher starts
+    watch_settle_seconds: float = 1.0  # Size/mtime must be stable this long before ingest
+    watch_recursive: bool = True  # Also watch subfolders (e.g. dated generator output dirs)
+    ingest_hash_workers: int = 2  # Threads hashing new files off the observer thread
+    ingest_max_inflight: int = 64  # Files queued on the hash pool before the flush thread waits
+    ingest_max_pending: int = 10000  # Pending paths before bulk producers (reconcile) block
+    ingest_full_hash_max_mb: int = 64  # Larger files get a quick fingerprint; SHA256 only on fingerprint collision
+    phash_max_distance: int = 8  # Hamming radius (of 64 bits) for "similar image" lookups
+    ingest_probe_metadata: bool = True  # Fill width/height/duration/samplerate after insert
+    probe_workers: int = 2  # Processes reading image headers / running ffprobe
+    probe_batch_size: int = 100  # Probed files per bulk UPDATE
 
     # Worker Configuration
-    worker_backend: str = "threadpool"
+    worker_backend: str = "threadpool"  # "processpool" runs CPU-bound steps in killable worker processes
     worker_threads: int = 4
+    worker_processes: int = 2  # Processes for CPU-bound steps (each keeps its own model loaded)
+    job_lease_seconds: int = 60  # RUNNING jobs without a heartbeat this long are re-queued
+    job_max_attempts: int = 3  # Give up on a job after this many crashed/abandoned runs
+    job_poll_interval_sec: float = 1.0  # Dispatcher checks the jobs table at least this often
+    job_interactive_slots: int = 1  # Worker threads only INTERACTIVE jobs (thumbnails) may use
+    job_ram_fraction: float = 0.5  # Share of available RAM running jobs may claim
+    job_kind_limits: str = ""  # Per-kind concurrency caps, e.g. "bg_remove=1,upscale=1"
+    job_timeouts: str = ""  # Per-kind time limits in seconds, e.g. "bg_remove=300,transcode=7200"
+    job_progress_flush_sec: float = 0.5  # Progress reports are coalesced and written at most this often
+    artifact_cache_max_mb: int = 2048  # Cached job outputs in Work/ beyond this are evicted (LRU)
 
     # Backend Service
     backend_host: str = "127.0.0.1"
@@ -61,6 +92,9 @@ class Settings(BaseSettings):
     # UI Settings
     ui_theme: str = "light"
     ui_thumbnail_size: int = 256
+    thumb_cache_max_mb: int = 512  # Thumbnails in cache_root beyond this are evicted (LRU)
+    thumb_store: str = "files"  # files (one WebP each) or pack (SQLite blob file, fewer reads per grid page)
+    ui_thumbnail_workers: int = 4  # Background threads loading grid thumbnails (UI stays responsive)
     ui_grid_columns: str = "auto"
 
     # Export Settings
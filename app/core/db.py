@@ -3,10 +3,22 @@
 Schema: Asset, Pack, Job
 
 STEP 4: Database engine creation and table initialization
+
+Every connection gets the SQLite profile from settings (WAL journal,
+synchronous, busy_timeout, mmap and page cache) so the job threads, watcher,
+API server and UI can read while one of them writes.
+
+create_all() never alters existing tables, so columns and indexes added to
+the models later are added to existing databases by migrate_schema().
 """
 
+from collections.abc import Callable, Iterator
+from enum import Enum
 from pathlib import Path
+from typing import Any
 
+from sqlalchemy import Column, event, literal
+from sqlalchemy.engine import Connection, Engine
 from sqlmodel import SQLModel, create_engine
 
 from app.core.config import settings
@@ -14,16 +26,108 @@
 
 logger = get_logger(__name__)
 
-# Global engine instance
+# Global engine instance (created on first get_engine() call, never at import)
 _engine = None
 
+# Called by reset_engine() while the old engine is still usable (see on_engine_reset())
+_reset_hooks: list[Callable[[], None]] = []
+
+# Keep IN (...) lists and executemany batches well below SQLite's bound-parameter limit
+SQL_IN_CHUNK = 500
+
+
+def chunked(items: list, size: int = SQL_IN_CHUNK) -> Iterator[list]:
+    """Yield successive slices of at most `size` items"""
+    for start in range(0, len(items), size):
+        yield items[start : start + size]
+
+
+def on_engine_reset(hook: Callable[[], None]):
+    """
+    Register a function to run before the engine is reset
+
+    For state tied to the current database (e.g. buffered writes), which
+    must be flushed or dropped rather than written to the next engine.
+
+    Args:
+        hook: Called without arguments while the old engine is still current
+    """
+    _reset_hooks.append(hook)
+
 
 def reset_engine():
     """Reset global engine (for testing only)"""
     global _engine
+    if _engine is not None:
+        for hook in _reset_hooks:
+            try:
+                hook()
+            except Exception as e:
+                logger.error(f"Engine reset hook {hook!r} failed: {e}")
+        _engine.dispose()
     _engine = None
 
 
+def sqlite_pragmas() -> dict[str, Any]:
+    """
+    SQLite pragmas applied to every new connection (from settings)
+
+    Returns:
+        Pragma name -> value, in the order they are applied
+    """
+    return {
+        "journal_mode": settings.db_journal_mode,
+        "synchronous": settings.db_synchronous,
+        "busy_timeout": settings.db_busy_timeout_ms,
+        "mmap_size": settings.db_mmap_size_mb * 1024 * 1024,
+        "cache_size": -settings.db_cache_size_mb * 1024,  # negative = KiB
+        "temp_store": "MEMORY",
+    }
+
+
+def create_sqlite_engine(db_path: str | Path, pragmas: dict[str, Any] | None = None, echo: bool = False) -> Engine:
+    """
+    Create a pooled SQLite engine with per-connection pragmas
+
+    Args:
+        db_path: Database file path
+        pragmas: Pragmas to apply on connect (None = no tuning, SQLite defaults)
+        echo: Log SQL statements
+
+    Returns:
+        Engine instance
+    """
+    pragmas = dict(pragmas or {})
+    busy_timeout_ms = pragmas.get("busy_timeout", 0)
+
+    new_engine = create_engine(
+        f"sqlite:///{db_path}",
+        echo=echo,
+        connect_args={
+            "check_same_thread": False,  # Required for SQLite
+            # sqlite3's own lock wait; matches busy_timeout when set
+            **({"timeout": busy_timeout_ms / 1000} if busy_timeout_ms else {}),
+        },
+        # One connection per concurrently writing thread (jobs, watcher, API, UI)
+        pool_size=settings.db_pool_size,
+        max_overflow=settings.db_pool_overflow,
+        pool_timeout=settings.db_pool_timeout_sec,
+    )
+
+    if pragmas:
+
+        @event.listens_for(new_engine, "connect")
+        def _apply_pragmas(dbapi_connection, _connection_record):
+            cursor = dbapi_connection.cursor()
+            try:
+                for name, value in pragmas.items():
+                    cursor.execute(f"PRAGMA {name}={value}")
+            finally:
+                cursor.close()
+
+    return new_engine
+
+
 def get_engine():
     """
     Get or create SQLModel engine
@@ -34,21 +138,39 @@ def get_engine():
     global _engine
     if _engine is None:
         db_path = Path(settings.db_path)
-        db_url = f"sqlite:///{db_path}"
 
         # Ensure parent directory exists
         db_path.parent.mkdir(parents=True, exist_ok=True)
 
-        _engine = create_engine(
-            db_url,
+        _engine = create_sqlite_engine(
+            db_path,
+            pragmas=sqlite_pragmas(),
             echo=settings.app_debug,  # Log SQL in debug mode
-            connect_args={"check_same_thread": False},  # Required for SQLite
         )
-        logger.info(f"Database engine created: {db_path}")
+        logger.info(
+            f"Database engine created: {db_path} (journal={settings.db_journal_mode}, "
+            f"synchronous={settings.db_synchronous}, pool={settings.db_pool_size}+{settings.db_pool_overflow})"
+        )
 
     return _engine
 
 
+def read_pragmas(names: list[str] | None = None) -> dict[str, Any]:
+    """
+    Read effective pragma values from a pooled connection (diagnostics)
+
+    Args:
+        names: Pragmas to read (defaults to the configured profile)
+
+    Returns:
+        Pragma name -> current value
+    """
+    with get_engine().connect() as connection:
+        return {
+            name: connection.exec_driver_sql(f"PRAGMA {name}").scalar() for name in (names or list(sqlite_pragmas()))
+        }
+
+
 def create_db_and_tables():
     """
     Create database file and all tables
@@ -63,8 +185,59 @@ def create_db_and_tables():
 
     # Create all tables
     SQLModel.metadata.create_all(engine)
+
+    # Upgrade tables created by older versions
+    migrate_schema(engine)
     logger.info("Database tables created/verified")
 
 
-# Backwards compatibility
-engine = get_engine()
+def migrate_schema(engine: Engine) -> list[str]:
+    """
+    Add model columns and indexes missing from existing tables
+
+    Idempotent: columns are compared with PRAGMA table_info, indexes are
+    created with checkfirst. Tables that do not exist yet are left to
+    create_all().
+
+    Args:
+        engine: Engine of the database to upgrade
+
+    Returns:
+        Added columns as "table.column"
+    """
+    added = []
+    with engine.begin() as connection:
+        for table in SQLModel.metadata.sorted_tables:
+            existing = {row[1] for row in connection.exec_driver_sql(f'PRAGMA table_info("{table.name}")')}
+            if not existing:
+                continue
+
+            for column in table.columns:
+                if column.name not in existing:
+                    connection.exec_driver_sql(
+                        f'ALTER TABLE "{table.name}" ADD COLUMN {_column_ddl(column, connection)}'
+                    )
+                    added.append(f"{table.name}.{column.name}")
+
+            for index in table.indexes:
+                index.create(connection, checkfirst=True)
+
+    if added:
+        logger.info(f"Migrated database schema: added {', '.join(added)}")
+    return added
+
+
+def _column_ddl(column: Column, connection: Connection) -> str:
+    """Column definition for ALTER TABLE ADD COLUMN (existing rows get the model default)"""
+    ddl = f'"{column.name}" {column.type.compile(dialect=connection.dialect)}'
+
+    default = column.default.arg if column.default is not None and column.default.is_scalar else None
+    if isinstance(default, Enum):
+        # IntEnums (JobPriority) live in INTEGER columns; other enums are stored by name
+        default = int(default) if isinstance(default, int) else default.name
+    if default is not None:
+        rendered = literal(default).compile(dialect=connection.dialect, compile_kwargs={"literal_binds": True})
+        ddl += f" DEFAULT {rendered}"
+        if not column.nullable:
+            ddl += " NOT NULL"  # SQLite only allows NOT NULL on added columns with a default
+    return ddl
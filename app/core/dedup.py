@@ -0,0 +1,223 @@
+"""
+Content Deduplication
+Link assets with identical content (same SHA256) to one canonical asset
+
+The canonical asset of a hash group is the oldest row (lowest id); every other
+row in the group points at it via Asset.canonical_id. Jobs use the index to
+reuse outputs already produced for identical content instead of reprocessing.
+
+Hashing is tiered: every asset gets a cheap quick_hash (size + head/tail
+sample). Small files are fully hashed at ingest; large ones only when another
+asset shares their quick_hash, since differing fingerprints rule out duplicates.
+"""
+
+import json
+from collections.abc import Iterable
+from pathlib import Path
+from typing import Any
+
+from sqlalchemy import func
+from sqlmodel import Session, select, update
+
+from app.backend.models.entities import Asset, Job, JobKind, JobStatus
+from app.core.config import settings
+from app.core.db import chunked, get_engine
+from app.core.logging import get_logger
+from app.core.utils import compute_hash, compute_quick_fingerprint
+
+logger = get_logger(__name__)
+
+
+def link_duplicates(session: Session, hashes: Iterable[str | None]) -> int:
+    """
+    Recompute canonical links for every asset sharing one of the given hashes
+
+    Does not commit; callers run this inside their own transaction.
+
+    Args:
+        session: Open database session
+        hashes: Content hashes whose groups changed (None values are ignored)
+
+    Returns:
+        Number of assets linked to a canonical asset
+    """
+    unique = sorted({h for h in hashes if h})
+    linked = 0
+
+    for chunk in chunked(unique):
+        canonical = dict(
+            session.exec(select(Asset.hash, func.min(Asset.id)).where(Asset.hash.in_(chunk)).group_by(Asset.hash)).all()
+        )
+        rows = session.exec(select(Asset.id, Asset.hash, Asset.canonical_id).where(Asset.hash.in_(chunk))).all()
+
+        params: list[dict[str, Any]] = []
+        for asset_id, content_hash, canonical_id in rows:
+            target = canonical.get(content_hash)
+            wanted = None if asset_id == target else target
+            if wanted is not None:
+                linked += 1
+            if canonical_id != wanted:
+                params.append({"id": asset_id, "canonical_id": wanted})
+
+        if params:
+            session.exec(update(Asset), params=params)
+
+    return linked
+
+
+def fingerprint_file(path: str | Path, size: int) -> tuple[str, str | None]:
+    """
+    Compute the hashes recorded for a file at ingest or rescan
+
+    Args:
+        path: File path
+        size: File size in bytes (from a stat the caller already made)
+
+    Returns:
+        (quick_hash, hash) where hash is None for files above
+        settings.ingest_full_hash_max_mb (deferred until a collision)
+    """
+    quick_hash = compute_quick_fingerprint(path)
+    if size > settings.ingest_full_hash_max_mb * 1024 * 1024:
+        return quick_hash, None
+    return quick_hash, compute_hash(str(path))
+
+
+def resolve_quick_hash_collisions(quick_hashes: Iterable[str | None]) -> int:
+    """
+    Fully hash deferred assets whose quick_hash is shared with another asset
+
+    Full hashes are computed outside any transaction; the results are then
+    written and linked in one short transaction.
+
+    Args:
+        quick_hashes: Fingerprints of recently added or changed assets
+
+    Returns:
+        Number of assets that received a full hash
+    """
+    unique = sorted({h for h in quick_hashes if h})
+    if not unique:
+        return 0
+
+    engine = get_engine()
+    pending: list[tuple[int, str]] = []
+    with Session(engine) as session:
+        for chunk in chunked(unique):
+            colliding = (
+                select(Asset.quick_hash)
+                .where(Asset.quick_hash.in_(chunk))
+                .group_by(Asset.quick_hash)
+                .having(func.count(Asset.id) > 1)
+            )
+            pending.extend(
+                session.exec(
+                    select(Asset.id, Asset.path).where(
+                        Asset.quick_hash.in_(colliding),
+                        Asset.hash.is_(None),
+                        Asset.missing == False,  # noqa: E712
+                    )
+                ).all()
+            )
+
+    if not pending:
+        return 0
+
+    params: list[dict[str, Any]] = []
+    for asset_id, path in pending:
+        try:
+            params.append({"id": asset_id, "hash": compute_hash(path)})
+        except OSError as e:
+            logger.warning(f"Cannot hash {path} for duplicate check: {e}")
+
+    with Session(engine) as session:
+        if params:
+            session.exec(update(Asset), params=params)
+        link_duplicates(session, (row["hash"] for row in params))
+        session.commit()
+
+    logger.info(f"Resolved {len(params)} quick-hash collisions with full hashes")
+    return len(params)
+
+
+def rebuild_dedup_index() -> int:
+    """
+    Recompute canonical links for the whole library
+
+    Returns:
+        Number of duplicate assets
+    """
+    engine = get_engine()
+    with Session(engine) as session:
+        hashes = session.exec(select(Asset.hash).where(Asset.hash.is_not(None)).distinct()).all()
+        linked = link_duplicates(session, hashes)
+        session.commit()
+
+    logger.info(f"Dedup index rebuilt: {linked} duplicate assets across {len(hashes)} hashes")
+    return linked
+
+
+def get_duplicates(asset_id: int) -> list[Asset]:
+    """
+    Get every other asset with the same content
+
+    Args:
+        asset_id: Any asset in the group
+
+    Returns:
+        Assets sharing the content hash, canonical first
+    """
+    engine = get_engine()
+    with Session(engine) as session:
+        asset = session.get(Asset, asset_id)
+        if not asset or not asset.hash:
+            return []
+        return list(
+            session.exec(select(Asset).where(Asset.hash == asset.hash, Asset.id != asset_id).order_by(Asset.id)).all()
+        )
+
+
+def find_reusable_output(asset_id: int, kind: JobKind, variant: str | None = None) -> Path | None:
+    """
+    Find an existing job output produced for identical content
+
+    Looks for a completed job of the same kind (and params "type", for kinds
+    like THUMBNAIL that cover several outputs) on any asset with the same
+    content hash, whose output file still exists.
+
+    Args:
+        asset_id: Asset about to be processed
+        kind: Job kind
+        variant: Optional params["type"] to match
+
+    Returns:
+        Path to the reusable output, or None
+    """
+    engine = get_engine()
+    with Session(engine) as session:
+        asset = session.get(Asset, asset_id)
+        if not asset or not asset.hash:
+            return None
+
+        candidates = session.exec(
+            select(Job.result_path, Job.params_json)
+            .join(Asset, Job.asset_id == Asset.id)
+            .where(
+                Asset.hash == asset.hash,
+                Job.kind == kind,
+                Job.status == JobStatus.COMPLETED,
+                Job.result_path.is_not(None),
+            )
+            .order_by(Job.completed_at.desc())
+        ).all()
+
+    for result_path, params_json in candidates:
+        if variant is not None:
+            params = json.loads(params_json) if params_json else {}
+            if params.get("type") != variant:
+                continue
+        output = Path(result_path)
+        if output.exists():
+            return output
+
+    return None
@@ -2,12 +2,23 @@
 File Type Detection
 Extension-based detection for STEP 4 (metadata stubs only)
 
-Future: MIME type + magic signature + ffprobe fallback for robust detection
+Content detection: magic signatures in the first SNIFF_BYTES bytes decide the
+type; ffprobe is only consulted when a container could hold either audio or
+video (or an audio/video file has no known signature). Results are cached by (path, size, mtime) so repeated lookups from the
+watcher, ingest, thumbnails and grid never read the file twice.
 """
 
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
 from pathlib import Path
 
 from app.backend.models.entities import AssetType
+from app.core.logging import get_logger
+from app.core.media_probe import run_ffprobe
+
+logger = get_logger(__name__)
 
 # Extension to AssetType mapping
 EXTENSION_MAP = {
@@ -82,3 +93,217 @@ def detect_filetype(path: str) -> str:
     if asset_type is None:
         return "unknown"
     return asset_type.value  # Returns 'image', 'audio', or 'video'
+
+
+# Bytes read for signature sniffing
+SNIFF_BYTES = 512
+
+# Max cached detections (one entry per path)
+DETECTION_CACHE_SIZE = 50000
+
+# ISO-BMFF (ftyp) brands that identify a non-video file
+_AUDIO_BRANDS = {b"M4A ", b"M4B ", b"M4P ", b"F4A "}
+_IMAGE_BRANDS = {b"avif", b"avis", b"heic", b"heix", b"mif1", b"msf1"}
+
+_IMAGE = frozenset({AssetType.IMAGE})
+_AUDIO = frozenset({AssetType.AUDIO})
+_VIDEO = frozenset({AssetType.VIDEO})
+_AUDIO_OR_VIDEO = _AUDIO | _VIDEO
+
+
+@dataclass(frozen=True)
+class DetectedType:
+    """Result of content-based type detection"""
+
+    asset_type: AssetType
+    format: str
+    """Container/codec name, e.g. 'png', 'webp', 'mp4', 'mp3'"""
+    source: str
+    """How it was decided: 'signature', 'ffprobe' or 'extension'"""
+
+
+def sniff_signature(head: bytes) -> tuple[str, frozenset[AssetType]] | None:
+    """
+    Identify a file from its leading bytes
+
+    Args:
+        head: First bytes of the file (SNIFF_BYTES is plenty)
+
+    Returns:
+        (format, candidate types) or None if no signature matched.
+        Several candidates mean the container alone is ambiguous.
+    """
+    if head.startswith(b"\x89PNG\r\n\x1a\n"):
+        return "png", _IMAGE
+    if head.startswith(b"\xff\xd8\xff"):
+        return "jpeg", _IMAGE
+    if head[:6] in (b"GIF87a", b"GIF89a"):
+        return "gif", _IMAGE
+    if head[:4] in (b"II*\x00", b"MM\x00*"):
+        return "tiff", _IMAGE
+    if head.startswith(b"BM") and len(head) >= 14:
+        return "bmp", _IMAGE
+    if head[:4] == b"RIFF" and len(head) >= 12:
+        kind = head[8:12]
+        if kind == b"WEBP":
+            return "webp", _IMAGE
+        if kind == b"WAVE":
+            return "wav", _AUDIO
+        if kind == b"AVI ":
+            return "avi", _VIDEO
+    if head[4:8] == b"ftyp":
+        brand = head[8:12]
+        if brand in _IMAGE_BRANDS:
+            return brand.decode("latin-1").strip(), _IMAGE
+        if brand in _AUDIO_BRANDS:
+            return "m4a", _AUDIO
+        if brand == b"qt  ":
+            return "mov", _VIDEO
+        # Generic brands (isom, mp42, ...) are used for both .mp4 and .m4a
+        return "mp4", _AUDIO_OR_VIDEO
+    if head.startswith(b"\x1a\x45\xdf\xa3"):
+        return ("webm" if b"webm" in head else "matroska"), _AUDIO_OR_VIDEO
+    if head.startswith(b"OggS"):
+        if b"theora" in head:
+            return "ogg", _VIDEO
+        if b"vorbis" in head or b"OpusHead" in head or b"FLAC" in head:
+            return "ogg", _AUDIO
+        return "ogg", _AUDIO_OR_VIDEO
+    if head.startswith(b"fLaC"):
+        return "flac", _AUDIO
+    if head.startswith(b"ID3"):
+        return "mp3", _AUDIO
+    if head.startswith(b"FLV"):
+        return "flv", _VIDEO
+    if len(head) >= 2 and head[0] == 0xFF and head[1] & 0xE0 == 0xE0:
+        # MPEG audio frame sync; 0xFFF with layer bits 00 is AAC ADTS
+        return ("aac" if head[1] & 0xF6 == 0xF0 else "mp3"), _AUDIO
+
+    return None
+
+
+def _type_from_ffprobe(path: Path) -> AssetType | None:
+    """Decide audio vs video from stream info (None if ffprobe cannot tell)"""
+    try:
+        data = run_ffprobe(str(path))
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        logger.debug(f"ffprobe could not identify {path}: {e}")
+        return None
+
+    streams = data.get("streams") or []
+    if any(s.get("codec_type") == "video" and not (s.get("disposition") or {}).get("attached_pic") for s in streams):
+        return AssetType.VIDEO
+    if any(s.get("codec_type") == "audio" for s in streams):
+        return AssetType.AUDIO
+    return None
+
+
+def _detect(path: Path, size: int) -> DetectedType | None:
+    """Uncached detection: signature first, ffprobe only when ambiguous"""
+    if size == 0:
+        return None
+
+    ext = path.suffix.lower()
+    by_extension = EXTENSION_MAP.get(ext)
+
+    with path.open("rb") as f:
+        head = f.read(SNIFF_BYTES)
+    sniffed = sniff_signature(head)
+
+    if sniffed is not None:
+        fmt, candidates = sniffed
+        if len(candidates) == 1:
+            return DetectedType(next(iter(candidates)), fmt, "signature")
+    elif by_extension is None or by_extension == AssetType.IMAGE:
+        # Every supported image format has a signature: without one it is corrupt or mislabelled
+        return None
+    else:
+        fmt, candidates = ext.lstrip("."), frozenset({by_extension})
+
+    # Ambiguous container or unknown audio/video format: the streams decide
+    probed = _type_from_ffprobe(path)
+    if probed is not None:
+        return DetectedType(probed, fmt, "ffprobe")
+    # ffprobe missing or undecided: the extension breaks the tie
+    if by_extension in candidates:
+        return DetectedType(by_extension, fmt, "extension")
+    return None
+
+
+_cache: OrderedDict[str, tuple[int, int, DetectedType | None]] = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def detect_file_type(path: str | Path, stat: os.stat_result | None = None) -> DetectedType | None:
+    """
+    Detect a file's type from its content, with caching
+
+    Only files with a supported extension are considered. Signature matches
+    override the extension (a WebP saved as .png is still an image), and
+    containers that can hold audio or video are decided by ffprobe (a .mp4
+    holding only audio is audio). The extension is only a fallback for audio
+    and video that ffprobe cannot decide; an image extension without an
+    image signature is rejected.
+
+    Args:
+        path: File path
+        stat: Optional stat result the caller already has (saves a syscall)
+
+    Returns:
+        DetectedType, or None if unsupported, empty or unreadable
+    """
+    file_path = Path(path)
+    if not is_supported(file_path):
+        return None
+
+    try:
+        if stat is None:
+            stat = file_path.stat()
+    except OSError:
+        return None
+
+    key = str(file_path)
+    with _cache_lock:
+        cached = _cache.get(key)
+        if cached is not None and cached[:2] == (stat.st_size, stat.st_mtime_ns):
+            _cache.move_to_end(key)
+            return cached[2]
+
+    try:
+        detected = _detect(file_path, stat.st_size)
+    except OSError as e:
+        logger.warning(f"Cannot read {file_path} for type detection: {e}")
+        return None
+
+    if detected is not None and detected.asset_type != EXTENSION_MAP.get(file_path.suffix.lower()):
+        logger.info(f"{file_path.name}: content is {detected.format} ({detected.asset_type.value}), not its extension")
+
+    with _cache_lock:
+        _cache[key] = (stat.st_size, stat.st_mtime_ns, detected)
+        _cache.move_to_end(key)
+        while len(_cache) > DETECTION_CACHE_SIZE:
+            _cache.popitem(last=False)
+    return detected
+
+
+def detect_asset_type(path: str | Path, stat: os.stat_result | None = None) -> AssetType | None:
+    """
+    Detect a file's AssetType from its content (see detect_file_type)
+
+    Args:
+        path: File path
+        stat: Optional stat result the caller already has
+
+    Returns:
+        AssetType enum value or None if unsupported/unreadable
+    """
+    detected = detect_file_type(path, stat)
+    return detected.asset_type if detected else None
+
+
+def clear_detection_cache():
+    """Forget cached detections (for testing)"""
+    with _cache_lock:
+        _cache.clear()
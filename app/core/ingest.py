@@ -0,0 +1,457 @@
+"""
+Ingest Pipeline
+Coalesce file watcher events into micro-batches and insert Assets in bulk
+
+Watchdog callbacks only enqueue paths; a background flush thread drains them
+in batches (by count or time window), checks existence with one IN query per
+batch, hashes new files on a bounded worker pool and inserts all new Asset
+rows in a single transaction. Large files that may be copies of known ones
+are fully hashed afterwards on the same pool, never on the flush thread.
+"""
+
+import threading
+import time
+from collections.abc import Iterable
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import Any
+
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlmodel import Session, select
+
+from app.backend.models.entities import Asset, AssetProvenance, AssetType
+from app.core.config import settings
+from app.core.db import SQL_IN_CHUNK, chunked, get_engine
+from app.core.dedup import fingerprint_file, link_duplicates, resolve_quick_hash_collisions
+from app.core.filetypes import detect_asset_type
+from app.core.logging import get_logger
+from app.core.media_probe import ProbeStage
+from app.core.phash import compute_dhash
+
+logger = get_logger(__name__)
+
+
+@dataclass
+class IngestStats:
+    """Throughput counters for the ingest pipeline"""
+
+    events_received: int = 0
+    events_coalesced: int = 0
+    files_inserted: int = 0
+    files_skipped: int = 0
+    files_failed: int = 0
+    collisions_resolved: int = 0
+    batches_committed: int = 0
+    last_batch_size: int = 0
+    last_batch_seconds: float = 0.0
+    busy_seconds: float = 0.0
+    started_at: float = field(default_factory=time.monotonic)
+
+    def as_dict(self) -> dict[str, Any]:
+        """Snapshot counters plus derived throughput figures"""
+        uptime = max(time.monotonic() - self.started_at, 1e-9)
+        busy = max(self.busy_seconds, 1e-9)
+        return {
+            "events_received": self.events_received,
+            "events_coalesced": self.events_coalesced,
+            "files_inserted": self.files_inserted,
+            "files_skipped": self.files_skipped,
+            "files_failed": self.files_failed,
+            "collisions_resolved": self.collisions_resolved,
+            "batches_committed": self.batches_committed,
+            "last_batch_size": self.last_batch_size,
+            "last_batch_seconds": round(self.last_batch_seconds, 4),
+            "avg_batch_size": round(self.files_inserted / self.batches_committed, 2) if self.batches_committed else 0.0,
+            "files_per_sec": round(self.files_inserted / busy, 2) if self.files_inserted else 0.0,
+            "uptime_seconds": round(uptime, 2),
+        }
+
+
+class IngestPipeline:
+    """
+    Micro-batching ingest stage between the file watcher and the database
+
+    submit() is cheap and safe to call from the watchdog observer thread.
+    Paths are coalesced (duplicate events for the same file collapse into one)
+    and dispatched when `batch_size` paths are pending or `batch_window` seconds
+    have passed since the first pending event.
+
+    Stages:
+        1. flush thread filters known paths with one IN query per batch
+        2. a bounded hash worker pool stats and hashes new files
+        3. the flush thread commits hashed rows in one transaction per batch
+        4. the hash pool fully hashes large files whose fingerprint collides
+        5. a ProbeStage fills media metadata for inserted rows in the background
+
+    At most `max_inflight` files are being hashed at once. When the pool is
+    saturated the flush thread waits and further events keep coalescing in the
+    pending set, so the observer thread is never blocked by hashing. Bulk
+    producers (submit_many, used by reconciliation) do block once `max_pending`
+    paths are queued.
+    """
+
+    def __init__(
+        self,
+        batch_size: int | None = None,
+        batch_window: float | None = None,
+        hash_workers: int | None = None,
+        max_inflight: int | None = None,
+        max_pending: int | None = None,
+    ):
+        """
+        Initialize ingest pipeline
+
+        Args:
+            batch_size: Max paths per batch (defaults to settings.ingest_batch_size)
+            batch_window: Max seconds to wait before flushing a partial batch
+                (defaults to settings.ingest_batch_window_sec)
+            hash_workers: Hash worker threads (defaults to settings.ingest_hash_workers)
+            max_inflight: Max files queued on the hash pool (defaults to settings.ingest_max_inflight)
+            max_pending: Pending-path limit for bulk producers (defaults to settings.ingest_max_pending)
+        """
+        self.batch_size = max(1, batch_size or settings.ingest_batch_size)
+        self.batch_window = batch_window if batch_window is not None else settings.ingest_batch_window_sec
+        self.hash_workers = max(1, hash_workers or settings.ingest_hash_workers)
+        self.max_inflight = max(self.hash_workers, max_inflight or settings.ingest_max_inflight)
+        self.max_pending = max(self.batch_size, max_pending or settings.ingest_max_pending)
+        self.stats = IngestStats()
+        self.prober = ProbeStage() if settings.ingest_probe_metadata else None
+
+        self._pending: dict[Path, None] = {}  # insertion-ordered set
+        self._first_pending_at: float | None = None
+        self._inflight: set[Path] = set()
+        self._ready: list[dict[str, Any]] = []
+        self._collision_checks: set[Future] = set()
+        self._first_ready_at: float | None = None
+        self._lock = threading.Lock()
+        self._changed = threading.Condition(self._lock)
+        self._flush_lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(self.max_inflight)
+        self._wakeup = threading.Event()
+        self._executor: ThreadPoolExecutor | None = None
+        self._thread: threading.Thread | None = None
+        self._running = False
+
+    def start(self):
+        """Start the background flush thread"""
+        if self._running:
+            return
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name="ingest_flush", daemon=True)
+        self._thread.start()
+        if self.prober:
+            self.prober.start()
+        logger.info(
+            f"Ingest pipeline started (batch_size={self.batch_size}, window={self.batch_window}s, "
+            f"hash_workers={self.hash_workers})"
+        )
+
+    def stop(self, flush: bool = True):
+        """
+        Stop the flush thread
+
+        Args:
+            flush: Drain any pending paths before returning
+        """
+        if not self._running:
+            return
+        self._running = False
+        self._wakeup.set()
+        with self._changed:
+            self._changed.notify_all()
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+        if flush:
+            self.flush()
+        if self._executor:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+        if self.prober:
+            self.prober.stop(drain=flush)
+        logger.info("Ingest pipeline stopped")
+
+    def is_running(self) -> bool:
+        """Check if flush thread is running"""
+        return self._running
+
+    def submit(self, path: str | Path):
+        """Queue a path for ingest (never blocks)"""
+        file_path = Path(path)
+        with self._lock:
+            self.stats.events_received += 1
+            if file_path in self._pending:
+                self.stats.events_coalesced += 1
+                return
+            self._pending[file_path] = None
+            if self._first_pending_at is None:
+                self._first_pending_at = time.monotonic()
+            if len(self._pending) >= self.batch_size:
+                self._wakeup.set()
+
+    def submit_many(self, paths: Iterable[str | Path]):
+        """
+        Queue several paths for ingest
+
+        Blocks while `max_pending` paths are already queued and the flush
+        thread is running, so bulk producers cannot outrun the hash pool.
+        """
+        for path in paths:
+            with self._changed:
+                while self._running and len(self._pending) >= self.max_pending:
+                    self._wakeup.set()
+                    self._changed.wait(timeout=0.5)
+            self.submit(path)
+
+    def pending_count(self) -> int:
+        """Number of paths waiting to be dispatched"""
+        with self._lock:
+            return len(self._pending)
+
+    def flush(self) -> int:
+        """
+        Synchronously drain all pending paths
+
+        Dispatches everything pending, waits for the hash pool to finish,
+        commits the resulting rows, resolves their fingerprint collisions and
+        probes their media metadata.
+
+        Returns:
+            Number of assets inserted
+        """
+        with self._flush_lock:
+            while batch := self._take_batch():
+                self._dispatch(batch)
+            with self._changed:
+                while self._inflight:
+                    self._changed.wait(timeout=0.5)
+            inserted = 0
+            while rows := self._take_ready(force=True):
+                inserted += self._commit(rows)
+            with self._lock:
+                checks = list(self._collision_checks)
+            wait(checks)
+            if self.prober:
+                self.prober.drain()
+            return inserted
+
+    def get_stats(self) -> dict[str, Any]:
+        """Get throughput metrics snapshot"""
+        with self._lock:
+            snapshot = self.stats.as_dict()
+            snapshot["pending"] = len(self._pending)
+            snapshot["hashing"] = len(self._inflight)
+            snapshot["ready"] = len(self._ready)
+            snapshot["collision_checks"] = len(self._collision_checks)
+        if self.prober:
+            snapshot["probe"] = {**self.prober.stats.as_dict(), "queued": self.prober.queued_count()}
+        return snapshot
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        """Create the hash worker pool on first use"""
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.hash_workers, thread_name_prefix="ingest_hash")
+        return self._executor
+
+    def _take_batch(self, force: bool = True) -> list[Path]:
+        """Pop up to batch_size pending paths (only when due unless forced)"""
+        with self._changed:
+            if not self._pending:
+                return []
+            if not force and not (
+                len(self._pending) >= self.batch_size
+                or (
+                    self._first_pending_at is not None
+                    and time.monotonic() - self._first_pending_at >= self.batch_window
+                )
+            ):
+                return []
+            batch = []
+            for path in self._pending:
+                batch.append(path)
+                if len(batch) >= self.batch_size:
+                    break
+            for path in batch:
+                del self._pending[path]
+            self._first_pending_at = time.monotonic() if self._pending else None
+            self._changed.notify_all()
+            return batch
+
+    def _take_ready(self, force: bool = False) -> list[dict[str, Any]]:
+        """Pop up to batch_size hashed rows (only when due unless forced)"""
+        with self._lock:
+            if not self._ready:
+                return []
+            if not force and not (
+                len(self._ready) >= self.batch_size
+                or (self._first_ready_at is not None and time.monotonic() - self._first_ready_at >= self.batch_window)
+                or not (self._pending or self._inflight)
+            ):
+                return []
+            rows = self._ready[: self.batch_size]
+            del self._ready[: self.batch_size]
+            self._first_ready_at = time.monotonic() if self._ready else None
+            return rows
+
+    def _run(self):
+        """Flush thread main loop"""
+        while self._running:
+            self._wakeup.wait(timeout=max(self.batch_window / 4, 0.01))
+            self._wakeup.clear()
+            with self._flush_lock:
+                while self._running and (batch := self._take_batch(force=False)):
+                    self._dispatch(batch)
+                while rows := self._take_ready():
+                    self._commit(rows)
+
+    def _dispatch(self, paths: list[Path]):
+        """
+        Filter known paths with one IN query per chunk and hand new ones to the hash pool
+
+        Blocks (on the flush thread) while `max_inflight` files are being hashed.
+        """
+        keys = [str(p) for p in paths]
+        engine = get_engine()
+        existing: set[str] = set()
+        with Session(engine) as session:
+            for chunk in chunked(keys, SQL_IN_CHUNK):
+                existing.update(session.exec(select(Asset.path).where(Asset.path.in_(chunk))).all())
+
+        executor = self._get_executor()
+        for file_path in paths:
+            with self._lock:
+                if str(file_path) in existing or file_path in self._inflight:
+                    self.stats.files_skipped += 1
+                    continue
+                self._inflight.add(file_path)
+            self._slots.acquire()
+            executor.submit(self._prepare, file_path)
+
+    def _prepare(self, file_path: Path):
+        """Hash worker: build the insert row for one file"""
+        try:
+            row = self._build_row(file_path)
+        except Exception as e:
+            logger.error(f"Failed to prepare asset {file_path}: {e}")
+            row = None
+            with self._lock:
+                self.stats.files_failed += 1
+        else:
+            if row is None:
+                with self._lock:
+                    self.stats.files_skipped += 1
+        finally:
+            self._slots.release()
+
+        with self._changed:
+            if row is not None:
+                self._ready.append(row)
+                if self._first_ready_at is None:
+                    self._first_ready_at = time.monotonic()
+            self._inflight.discard(file_path)
+            if len(self._ready) >= self.batch_size or not self._inflight:
+                self._wakeup.set()
+            self._changed.notify_all()
+
+    def _resolve_collisions(self, quick_hashes: list[str]):
+        """Hash worker: fully hash deferred assets sharing one of these fingerprints"""
+        try:
+            resolved = resolve_quick_hash_collisions(quick_hashes)
+        except Exception as e:
+            logger.error(f"Failed to resolve quick-hash collisions: {e}")
+            return
+        with self._lock:
+            self.stats.collisions_resolved += resolved
+
+    def _commit(self, rows: list[dict[str, Any]]) -> int:
+        """
+        Insert hashed rows in a single transaction
+
+        Database work only: fingerprint collisions of large files are handed
+        to the hash pool, which may need to read whole files.
+
+        Returns:
+            Number of assets inserted
+        """
+        started = time.perf_counter()
+        engine = get_engine()
+        with Session(engine) as session:
+            # Core executemany: one cached statement, one transaction for the whole batch.
+            # RETURNING yields only the rows actually inserted (not those skipped on conflict)
+            table = Asset.__table__
+            stmt = (
+                sqlite_insert(table)
+                .on_conflict_do_nothing(index_elements=["path"])
+                .returning(table.c.path, table.c.type)
+            )
+            new_rows = session.connection().execute(stmt, rows).all()
+            inserted = len(new_rows)
+            # Link copies of already-known content to their canonical asset
+            link_duplicates(session, (row["hash"] for row in rows))
+            session.commit()
+
+        elapsed = time.perf_counter() - started
+        # Large files were only fingerprinted; fully hash the ones that may be copies
+        deferred = [row["quick_hash"] for row in rows if row["hash"] is None and row["quick_hash"]]
+        if deferred:
+            future = self._get_executor().submit(self._resolve_collisions, deferred)
+            with self._lock:
+                self._collision_checks.add(future)
+            future.add_done_callback(self._collision_check_done)
+        if self.prober:
+            self.prober.submit([(path, asset_type) for path, asset_type in new_rows])
+        with self._lock:
+            self.stats.files_inserted += inserted
+            self.stats.files_skipped += len(rows) - inserted
+            self.stats.busy_seconds += elapsed
+            if inserted:
+                self.stats.batches_committed += 1
+                self.stats.last_batch_size = inserted
+                self.stats.last_batch_seconds = elapsed
+
+        if inserted:
+            logger.info(f"Ingested {inserted}/{len(rows)} assets in {elapsed * 1000:.1f} ms")
+        return inserted
+
+    def _collision_check_done(self, future: Future):
+        """Forget a finished collision check (runs on the hash worker)"""
+        with self._lock:
+            self._collision_checks.discard(future)
+
+    def _build_row(self, file_path: Path) -> dict[str, Any] | None:
+        """Build an Asset insert row (None if file vanished or unsupported)"""
+        try:
+            stat = file_path.stat()
+        except FileNotFoundError:
+            logger.warning(f"File vanished before insert: {file_path}")
+            return None
+
+        # Content sniffing: a WebP named .png or an audio-only .mp4 gets its real type
+        asset_type = detect_asset_type(file_path, stat)
+        if asset_type is None:
+            logger.warning(f"Unsupported or unreadable file: {file_path}")
+            return None
+
+        quick_hash, content_hash = fingerprint_file(file_path, stat.st_size)
+        now = datetime.now(UTC)
+        return {
+            "path": str(file_path),
+            "type": asset_type,
+            "hash": content_hash,
+            "quick_hash": quick_hash,
+            "phash": compute_dhash(file_path) if asset_type == AssetType.IMAGE else None,
+            "size_bytes": stat.st_size,
+            "mtime": stat.st_mtime,
+            "width": None,  # Filled by the ProbeStage after insert
+            "height": None,
+            "duration": None,
+            "samplerate": None,
+            "theme": None,  # User will set this later
+            "source": None,
+            "provenance": AssetProvenance.UNKNOWN,  # User will curate this later
+            "approved": False,  # Requires manual approval
+            "created_at": now,
+            "updated_at": now,
+        }
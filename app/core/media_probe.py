@@ -0,0 +1,391 @@
+"""
+Media Metadata Probing
+Fill Asset width/height/duration/samplerate without decoding whole files
+
+Images: Pillow lazy open reads only the header (no pixel decode)
+Audio/video: one `ffprobe -print_format json -show_format -show_streams` call
+
+Probing runs in a process pool and results are written back with one
+executemany UPDATE per batch. ProbeStage runs this in the background behind
+the ingest pipeline; probe_paths() is the synchronous form used by rescans.
+Failed probes also set probed_at (metadata stays empty), so unreadable files
+or a missing ffprobe are not retried on every start.
+"""
+
+import json
+import multiprocessing
+import subprocess
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import Any
+
+from PIL import Image
+from sqlalchemy import bindparam, update
+from sqlmodel import Session, select
+
+from app.backend.models.entities import Asset, AssetType
+from app.core.config import settings
+from app.core.db import chunked, get_engine
+from app.core.logging import get_logger
+
+logger = get_logger(__name__)
+
+FFPROBE_TIMEOUT_SEC = 30
+
+_METADATA_FIELDS = ("width", "height", "duration", "samplerate")
+
+# Global probe process pool (spawned on first use, shared by every ProbeStage)
+_executor: ProcessPoolExecutor | None = None
+_executor_lock = threading.Lock()
+
+
+def get_probe_executor() -> ProcessPoolExecutor:
+    """Get or create the global probe process pool"""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            # spawn: forking while ingest threads hold locks can deadlock the child
+            _executor = ProcessPoolExecutor(
+                max_workers=max(1, settings.probe_workers), mp_context=multiprocessing.get_context("spawn")
+            )
+            logger.info(f"Initialized probe pool with {settings.probe_workers} processes")
+        return _executor
+
+
+def shutdown_probe_executor():
+    """Shutdown the probe pool (for testing/cleanup)"""
+    global _executor
+    with _executor_lock:
+        if _executor:
+            _executor.shutdown(wait=True)
+            _executor = None
+
+
+def _probe_image(path: str) -> dict[str, Any]:
+    """Read image dimensions from the header only"""
+    with Image.open(path) as img:
+        width, height = img.size
+        # Animated GIF/WebP: n_frames is read lazily too; duration is per frame in ms
+        frames = getattr(img, "n_frames", 1)
+        duration = None
+        if frames > 1 and img.info.get("duration"):
+            duration = frames * img.info["duration"] / 1000.0
+    return {"width": width, "height": height, "duration": duration, "samplerate": None}
+
+
+def parse_ffprobe(data: dict[str, Any]) -> dict[str, Any]:
+    """
+    Extract Asset metadata from ffprobe JSON output
+
+    Args:
+        data: Parsed output of ffprobe -show_format -show_streams
+
+    Returns:
+        Dict with width, height, duration, samplerate (None when absent)
+    """
+    streams = data.get("streams") or []
+    video = next(
+        (s for s in streams if s.get("codec_type") == "video" and not (s.get("disposition") or {}).get("attached_pic")),
+        None,
+    )
+    audio = next((s for s in streams if s.get("codec_type") == "audio"), None)
+
+    duration = (data.get("format") or {}).get("duration")
+    if duration is None:
+        duration = next((s["duration"] for s in (video, audio) if s and s.get("duration")), None)
+
+    return {
+        "width": int(video["width"]) if video and video.get("width") else None,
+        "height": int(video["height"]) if video and video.get("height") else None,
+        "duration": float(duration) if duration not in (None, "N/A") else None,
+        "samplerate": int(audio["sample_rate"]) if audio and audio.get("sample_rate") else None,
+    }
+
+
+def run_ffprobe(path: str, ffprobe: str | None = None) -> dict[str, Any]:
+    """
+    Run ffprobe once and return its format/streams JSON
+
+    Args:
+        path: Media file path
+        ffprobe: ffprobe executable (defaults to settings.media_tools_ffprobe)
+
+    Returns:
+        Parsed ffprobe output
+
+    Raises:
+        FileNotFoundError: ffprobe is not installed
+        RuntimeError: ffprobe could not read the file
+    """
+    cmd = [ffprobe or settings.media_tools_ffprobe, "-v", "error", "-print_format", "json"]
+    cmd += ["-show_format", "-show_streams", path]
+    result = subprocess.run(
+        cmd,
+        capture_output=True,
+        text=True,
+        timeout=FFPROBE_TIMEOUT_SEC,
+        creationflags=getattr(subprocess, "CREATE_NO_WINDOW", 0),
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"ffprobe failed: {result.stderr.strip()}")
+    return json.loads(result.stdout or "{}")
+
+
+def _probe_av(path: str, ffprobe: str) -> dict[str, Any]:
+    """Read audio/video metadata with a single ffprobe call"""
+    return parse_ffprobe(run_ffprobe(path, ffprobe))
+
+
+def probe_file(path: str, asset_type: str, ffprobe: str = "ffprobe") -> dict[str, Any] | None:
+    """
+    Probe one file (runs inside pool worker processes)
+
+    Args:
+        path: File path
+        asset_type: AssetType value
+        ffprobe: ffprobe executable
+
+    Returns:
+        Metadata dict, or None if the file could not be probed
+    """
+    try:
+        if asset_type == AssetType.IMAGE.value:
+            return _probe_image(path)
+        return _probe_av(path, ffprobe)
+    except FileNotFoundError as e:
+        if Path(path).exists():
+            logger.warning(f"ffprobe not found ({ffprobe}); audio/video metadata unavailable")
+        else:
+            logger.debug(f"File vanished before probe: {path} ({e})")
+    except Exception as e:
+        logger.warning(f"Probe failed for {path}: {e}")
+    return None
+
+
+@dataclass
+class ProbeStats:
+    """Probe stage counters"""
+
+    files_probed: int = 0
+    files_failed: int = 0
+    batches_written: int = 0
+    busy_seconds: float = 0.0
+
+    def as_dict(self) -> dict[str, Any]:
+        """Serialize for logging or API responses"""
+        data = asdict(self)
+        data["busy_seconds"] = round(self.busy_seconds, 3)
+        return data
+
+
+def _write_results(results: list[tuple[str, dict[str, Any]]], failed: list[str] | None = None) -> int:
+    """
+    Bulk-update probed metadata by path (one executemany statement each for successes and failures)
+
+    Args:
+        results: (path, metadata) of probed files
+        failed: Paths that could not be probed; only their probed_at is set
+
+    Returns:
+        Number of assets updated with metadata
+    """
+    if not results and not failed:
+        return 0
+
+    now = datetime.now(UTC)
+    table = Asset.__table__
+    engine = get_engine()
+    with Session(engine) as session:
+        connection = session.connection()
+        if results:
+            stmt = (
+                update(table)
+                .where(table.c.path == bindparam("b_path"))
+                .values(**{name: bindparam(f"b_{name}") for name in _METADATA_FIELDS}, probed_at=now, updated_at=now)
+            )
+            connection.execute(
+                stmt,
+                [{"b_path": path, **{f"b_{name}": meta[name] for name in _METADATA_FIELDS}} for path, meta in results],
+            )
+        if failed:
+            stmt = update(table).where(table.c.path == bindparam("b_path")).values(probed_at=now)
+            connection.execute(stmt, [{"b_path": path} for path in failed])
+        session.commit()
+    return len(results)
+
+
+def _probe_batch(items: list[tuple[str, str]], stats: ProbeStats | None = None) -> int:
+    """Probe a batch on the process pool and write the results"""
+    started = time.perf_counter()
+    paths = [path for path, _ in items]
+    types = [asset_type for _, asset_type in items]
+    ffprobes = [settings.media_tools_ffprobe] * len(items)
+    chunksize = max(1, len(items) // (4 * max(1, settings.probe_workers)))
+
+    results = []
+    failed = []
+    probed = get_probe_executor().map(probe_file, paths, types, ffprobes, chunksize=chunksize)
+    for path, meta in zip(paths, probed, strict=True):
+        if meta is None:
+            failed.append(path)
+        else:
+            results.append((path, meta))
+    written = _write_results(results, failed)
+
+    elapsed = time.perf_counter() - started
+    if stats is not None:
+        stats.files_probed += written
+        stats.files_failed += len(failed)
+        stats.batches_written += 1 if written else 0
+        stats.busy_seconds += elapsed
+    logger.debug(f"Probed {written}/{len(items)} files in {elapsed * 1000:.1f} ms")
+    return written
+
+
+def probe_paths(items: list[tuple[str, AssetType | str]]) -> int:
+    """
+    Probe files synchronously and store their metadata
+
+    Probes and writes in batches of settings.probe_batch_size, like ProbeStage.
+
+    Args:
+        items: (path, asset type) pairs
+
+    Returns:
+        Number of assets updated
+    """
+    batch_size = max(1, settings.probe_batch_size)
+    normalized = [(str(path), AssetType(asset_type).value) for path, asset_type in items]
+    return sum(_probe_batch(batch) for batch in chunked(normalized, batch_size))
+
+
+def backfill_media_metadata() -> int:
+    """
+    Probe every present asset that has never been probed (or attempted)
+
+    Returns:
+        Number of assets updated
+    """
+    engine = get_engine()
+    with Session(engine) as session:
+        items = session.exec(
+            select(Asset.path, Asset.type).where(Asset.probed_at.is_(None), Asset.missing == False)  # noqa: E712
+        ).all()
+
+    updated = probe_paths(list(items))
+    if items:
+        logger.info(f"Backfilled media metadata for {updated}/{len(items)} assets")
+    return updated
+
+
+class ProbeStage:
+    """
+    Background metadata probing behind the ingest pipeline
+
+    submit() queues freshly inserted assets; a worker thread drains the queue
+    in batches of `batch_size`, probes them on the shared process pool and
+    bulk-updates their rows.
+    """
+
+    def __init__(self, batch_size: int | None = None):
+        """
+        Initialize probe stage
+
+        Args:
+            batch_size: Files per UPDATE batch (defaults to settings.probe_batch_size)
+        """
+        self.batch_size = max(1, batch_size or settings.probe_batch_size)
+        self.stats = ProbeStats()
+
+        self._queue: dict[str, str] = {}  # path -> asset type (insertion-ordered)
+        self._busy = False
+        self._lock = threading.Lock()
+        self._changed = threading.Condition(self._lock)
+        self._thread: threading.Thread | None = None
+        self._running = False
+
+    def start(self):
+        """Start the background probe thread"""
+        if self._running:
+            return
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name="media_probe", daemon=True)
+        self._thread.start()
+
+    def stop(self, drain: bool = True):
+        """
+        Stop the probe thread
+
+        Args:
+            drain: Probe everything still queued before returning
+        """
+        if self._running:
+            with self._changed:
+                self._running = False
+                self._changed.notify_all()
+            if self._thread:
+                self._thread.join()
+                self._thread = None
+        if drain:
+            self.drain()
+
+    def submit(self, items: list[tuple[str, AssetType | str]]):
+        """Queue (path, asset type) pairs for probing (never blocks)"""
+        if not items:
+            return
+        with self._changed:
+            for path, asset_type in items:
+                self._queue[str(path)] = AssetType(asset_type).value
+            self._changed.notify_all()
+
+    def queued_count(self) -> int:
+        """Number of files waiting to be probed"""
+        with self._lock:
+            return len(self._queue)
+
+    def drain(self) -> int:
+        """
+        Synchronously probe everything queued (waits for an in-progress batch)
+
+        Returns:
+            Number of assets updated by this call
+        """
+        updated = 0
+        while True:
+            with self._changed:
+                while self._busy:
+                    self._changed.wait(timeout=0.5)
+                batch = self._take_batch()
+                if not batch:
+                    return updated
+                self._busy = True
+            try:
+                updated += _probe_batch(batch, self.stats)
+            except Exception as e:
+                logger.error(f"Probe batch failed: {e}")
+            finally:
+                with self._changed:
+                    self._busy = False
+                    self._changed.notify_all()
+
+    def _take_batch(self) -> list[tuple[str, str]]:
+        """Pop up to batch_size queued items (caller holds the lock)"""
+        batch = []
+        while self._queue and len(batch) < self.batch_size:
+            path = next(iter(self._queue))
+            batch.append((path, self._queue.pop(path)))
+        return batch
+
+    def _run(self):
+        """Probe loop: wait for work, then drain"""
+        while True:
+            with self._changed:
+                while self._running and not self._queue:
+                    self._changed.wait()
+                if not self._running:
+                    return
+            self.drain()
@@ -0,0 +1,251 @@
+"""
+Perceptual Hashing
+Find near-duplicate images (generator variations, re-encodes, resizes)
+
+Each image gets a 64-bit difference hash (dHash) at ingest, stored as hex on
+Asset.phash. Lookups use an in-memory BK-tree over all image hashes so a
+query only visits the part of the tree within the hamming radius instead of
+comparing against every image in the library.
+"""
+
+import threading
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from PIL import Image
+from sqlmodel import Session, select
+
+from app.backend.models.entities import Asset, AssetType
+from app.core.config import settings
+from app.core.db import get_engine
+from app.core.logging import get_logger
+
+logger = get_logger(__name__)
+
+DHASH_SIZE = 8  # 8x8 gradient bits = 64-bit hash
+
+
+def compute_dhash(path: str | Path, hash_size: int = DHASH_SIZE) -> str | None:
+    """
+    Compute the difference hash of an image
+
+    The image is reduced to (hash_size + 1) x hash_size grayscale pixels and
+    each bit records whether a pixel is brighter than its right neighbour.
+
+    Args:
+        path: Image file path
+        hash_size: Bits per row/column
+
+    Returns:
+        Hex string (hash_size**2 bits), or None if the image cannot be decoded
+    """
+    try:
+        with Image.open(path) as img:
+            # JPEG: let the decoder downscale instead of decoding full resolution
+            img.draft("L", (hash_size * 8, hash_size * 8))
+            small = img.convert("L").resize((hash_size + 1, hash_size), Image.Resampling.BOX)
+    except Exception as e:
+        logger.warning(f"Cannot compute perceptual hash for {path}: {e}")
+        return None
+
+    pixels = small.tobytes()
+    value = 0
+    width = hash_size + 1
+    for row in range(hash_size):
+        offset = row * width
+        for col in range(hash_size):
+            value = (value << 1) | (pixels[offset + col] > pixels[offset + col + 1])
+
+    return f"{value:0{hash_size * hash_size // 4}x}"
+
+
+def hamming_distance(a: int, b: int) -> int:
+    """Number of differing bits between two hashes"""
+    return (a ^ b).bit_count()
+
+
+@dataclass
+class _BKNode:
+    """BK-tree node: one hash, the assets sharing it, children keyed by distance"""
+
+    value: int
+    items: list[int] = field(default_factory=list)
+    children: dict[int, "_BKNode"] = field(default_factory=dict)
+
+
+class BKTree:
+    """
+    Burkhard-Keller tree over integer hashes under hamming distance
+
+    By the triangle inequality, a query with radius r only needs to descend
+    into children whose edge distance d satisfies |d - dist(query, node)| <= r.
+    """
+
+    def __init__(self):
+        self._root: _BKNode | None = None
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def add(self, value: int, item: int):
+        """
+        Insert a hash
+
+        Args:
+            value: Hash as integer
+            item: Payload (asset ID)
+        """
+        self._size += 1
+        if self._root is None:
+            self._root = _BKNode(value, [item])
+            return
+
+        node = self._root
+        while True:
+            distance = hamming_distance(value, node.value)
+            if distance == 0:
+                node.items.append(item)
+                return
+            child = node.children.get(distance)
+            if child is None:
+                node.children[distance] = _BKNode(value, [item])
+                return
+            node = child
+
+    def search(self, value: int, max_distance: int) -> list[tuple[int, int]]:
+        """
+        Find every item within max_distance of value
+
+        Args:
+            value: Query hash as integer
+            max_distance: Maximum hamming distance (inclusive)
+
+        Returns:
+            (distance, item) pairs sorted by distance
+        """
+        if self._root is None:
+            return []
+
+        results = []
+        stack = [self._root]
+        while stack:
+            node = stack.pop()
+            distance = hamming_distance(value, node.value)
+            if distance <= max_distance:
+                results.extend((distance, item) for item in node.items)
+            low, high = distance - max_distance, distance + max_distance
+            stack.extend(child for edge, child in node.children.items() if low <= edge <= high)
+
+        results.sort()
+        return results
+
+
+class SimilarityIndex:
+    """
+    Lazily built BK-tree over every image asset's perceptual hash
+
+    Assets added since the last query are picked up incrementally (by id);
+    call invalidate() when existing hashes change (rescans, deletions).
+    """
+
+    def __init__(self):
+        self._tree = BKTree()
+        self._max_id = 0
+        self._lock = threading.Lock()
+
+    def invalidate(self):
+        """Drop the tree; it is rebuilt on the next query"""
+        with self._lock:
+            self._tree = BKTree()
+            self._max_id = 0
+
+    def _sync(self, session: Session):
+        """Add image hashes inserted since the last sync"""
+        rows = session.exec(
+            select(Asset.id, Asset.phash).where(Asset.id > self._max_id, Asset.phash.is_not(None)).order_by(Asset.id)
+        ).all()
+        for asset_id, phash in rows:
+            self._tree.add(int(phash, 16), asset_id)
+            self._max_id = asset_id
+        if rows:
+            logger.debug(f"Similarity index: added {len(rows)} hashes ({len(self._tree)} total)")
+
+    def find_similar(self, asset_id: int, max_distance: int | None = None) -> list[tuple[Asset, int]]:
+        """
+        Find images perceptually similar to an asset
+
+        Args:
+            asset_id: Query asset
+            max_distance: Hamming radius (defaults to settings.phash_max_distance)
+
+        Returns:
+            (asset, distance) pairs, closest first, excluding the query asset
+            and assets whose files are missing
+        """
+        if max_distance is None:
+            max_distance = settings.phash_max_distance
+
+        engine = get_engine()
+        with Session(engine) as session:
+            asset = session.get(Asset, asset_id)
+            if not asset or not asset.phash:
+                return []
+
+            with self._lock:
+                self._sync(session)
+                matches = self._tree.search(int(asset.phash, 16), max_distance)
+
+            distances = {item: distance for distance, item in matches if item != asset_id}
+            if not distances:
+                return []
+            found = session.exec(
+                select(Asset).where(Asset.id.in_(list(distances)), Asset.missing == False)  # noqa: E712
+            ).all()
+
+        return sorted(((a, distances[a.id]) for a in found), key=lambda pair: (pair[1], pair[0].id))
+
+
+_index = SimilarityIndex()
+
+
+def find_similar(asset_id: int, max_distance: int | None = None) -> list[tuple[Asset, int]]:
+    """Find near-duplicate images using the shared SimilarityIndex"""
+    return _index.find_similar(asset_id, max_distance)
+
+
+def invalidate_similarity_index():
+    """Force the shared SimilarityIndex to rebuild on next use"""
+    _index.invalidate()
+
+
+def backfill_phashes() -> int:
+    """
+    Compute perceptual hashes for image assets ingested before they existed
+
+    Returns:
+        Number of assets updated
+    """
+    engine = get_engine()
+    with Session(engine) as session:
+        assets = session.exec(
+            select(Asset).where(
+                Asset.type == AssetType.IMAGE,
+                Asset.phash.is_(None),
+                Asset.missing == False,  # noqa: E712
+            )
+        ).all()
+        updated = 0
+        for asset in assets:
+            phash = compute_dhash(asset.path)
+            if phash:
+                asset.phash = phash
+                session.add(asset)
+                updated += 1
+        session.commit()
+
+    if updated:
+        # Existing rows changed: the incremental sync would not see them
+        invalidate_similarity_index()
+        logger.info(f"Backfilled perceptual hashes for {updated} images")
+    return updated
@@ -0,0 +1,211 @@
+"""
+Watch Folder Reconciliation
+Bring the assets table in sync with what is actually on disk
+
+Run when the watcher starts: files that arrived while PODStudio was closed are
+ingested, changed files get fresh size/mtime/fingerprints, and rows whose files are gone
+are marked missing. Comparison is by (path, size, mtime) so unchanged files are
+never re-read.
+"""
+
+import os
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any
+
+from sqlmodel import Session, select, update
+
+from app.backend.models.entities import Asset, AssetType
+from app.core.config import settings
+from app.core.db import SQL_IN_CHUNK, chunked, get_engine
+from app.core.dedup import fingerprint_file, link_duplicates, resolve_quick_hash_collisions
+from app.core.filetypes import detect_asset_type, is_supported
+from app.core.ingest import IngestPipeline
+from app.core.logging import get_logger
+from app.core.media_probe import probe_paths
+from app.core.phash import compute_dhash, invalidate_similarity_index
+from app.core.utils import compute_quick_fingerprint
+
+logger = get_logger(__name__)
+
+
+@dataclass
+class ReconcileReport:
+    """Summary of a reconciliation pass"""
+
+    folder: str
+    scanned: int = 0
+    new: int = 0
+    inserted: int = 0
+    updated: int = 0
+    restored: int = 0
+    missing: int = 0
+    elapsed_seconds: float = 0.0
+
+    def as_dict(self) -> dict[str, Any]:
+        """Report as plain dict"""
+        return asdict(self)
+
+
+def scan_folder(folder: Path, recursive: bool = False) -> dict[str, tuple[int, float]]:
+    """
+    Walk a folder with os.scandir and stat supported files
+
+    Args:
+        folder: Folder to walk
+        recursive: Descend into subfolders
+
+    Returns:
+        dict of path -> (size_bytes, mtime)
+    """
+    found: dict[str, tuple[int, float]] = {}
+    stack = [str(folder)]
+
+    while stack:
+        current = stack.pop()
+        try:
+            with os.scandir(current) as entries:
+                for entry in entries:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            if recursive:
+                                stack.append(entry.path)
+                            continue
+                        if not entry.is_file() or not is_supported(entry.name):
+                            continue
+                        # DirEntry.stat() is served from the directory listing on Windows
+                        stat = entry.stat()
+                    except OSError as e:
+                        logger.debug(f"Skipping unreadable entry {entry.path}: {e}")
+                        continue
+                    found[str(Path(entry.path))] = (stat.st_size, stat.st_mtime)
+        except OSError as e:
+            logger.warning(f"Cannot scan folder {current}: {e}")
+
+    return found
+
+
+def _load_known(
+    session: Session, folder: Path, recursive: bool
+) -> dict[str, tuple[int, int | None, float | None, bool, str | None, str | None]]:
+    """Load (id, size, mtime, missing, hash, quick_hash) for every asset under folder in one query"""
+    prefix = str(folder).rstrip("/\\") + os.sep
+    rows = session.exec(
+        select(Asset.id, Asset.path, Asset.size_bytes, Asset.mtime, Asset.missing, Asset.hash, Asset.quick_hash).where(
+            Asset.path.startswith(prefix, autoescape=True)
+        )
+    ).all()
+
+    known = {}
+    for asset_id, path, size_bytes, mtime, missing, content_hash, quick_hash in rows:
+        if not recursive and str(Path(path).parent) != str(folder):
+            continue
+        known[path] = (asset_id, size_bytes, mtime, missing, content_hash, quick_hash)
+    return known
+
+
+def reconcile_folder(
+    folder: str | Path, pipeline: IngestPipeline | None = None, recursive: bool = False
+) -> ReconcileReport:
+    """
+    Reconcile one watch folder against the assets table
+
+    Args:
+        folder: Watch folder to reconcile
+        pipeline: Ingest pipeline used for new files (a private one is flushed if None)
+        recursive: Include subfolders
+
+    Returns:
+        ReconcileReport with counts
+    """
+    started = time.perf_counter()
+    folder_path = Path(folder)
+    report = ReconcileReport(folder=str(folder_path))
+
+    if not folder_path.is_dir():
+        logger.warning(f"Cannot reconcile missing folder: {folder_path}")
+        return report
+
+    on_disk = scan_folder(folder_path, recursive=recursive)
+    report.scanned = len(on_disk)
+
+    engine = get_engine()
+    with Session(engine) as session:
+        known = _load_known(session, folder_path, recursive)
+        rehashed: set[str | None] = set()
+        requick: set[str] = set()
+        rephashed = False
+        reprobe: list[tuple[str, AssetType]] = []
+
+        updates: list[dict[str, Any]] = []
+        for path, (asset_id, size_bytes, mtime, missing, content_hash, quick_hash) in known.items():
+            stat = on_disk.get(path)
+            if stat is None:
+                if not missing:
+                    updates.append({"id": asset_id, "missing": True})
+                    report.missing += 1
+                continue
+
+            size, disk_mtime = stat
+            row: dict[str, Any] = {"id": asset_id}
+            if missing:
+                row["missing"] = False
+                report.restored += 1
+            if size_bytes is None or quick_hash is None:
+                # Row predates size/fingerprint tracking: record them without a full rehash
+                try:
+                    row.update(size_bytes=size, mtime=disk_mtime, quick_hash=compute_quick_fingerprint(path))
+                    requick.add(row["quick_hash"])
+                except OSError as e:
+                    logger.warning(f"Cannot fingerprint {path}: {e}")
+            elif size_bytes != size or mtime != disk_mtime:
+                try:
+                    new_quick, new_hash = fingerprint_file(path, size)
+                    row.update(size_bytes=size, mtime=disk_mtime, quick_hash=new_quick, hash=new_hash)
+                    rehashed.update((content_hash, new_hash))
+                    requick.add(new_quick)
+                    asset_type = detect_asset_type(path)
+                    if asset_type is not None:
+                        row["type"] = asset_type
+                        reprobe.append((path, asset_type))
+                    if asset_type == AssetType.IMAGE:
+                        row["phash"] = compute_dhash(path)
+                        rephashed = True
+                    report.updated += 1
+                except OSError as e:
+                    logger.warning(f"Cannot rehash changed file {path}: {e}")
+                    continue
+            if len(row) > 1:
+                updates.append(row)
+
+        for chunk in chunked(updates, SQL_IN_CHUNK):
+            session.exec(update(Asset), params=chunk)
+        # Edited files may join or leave a duplicate group
+        link_duplicates(session, rehashed)
+        session.commit()
+    resolve_quick_hash_collisions(requick)
+    if rephashed:
+        invalidate_similarity_index()
+    if reprobe and settings.ingest_probe_metadata:
+        # Dimensions/duration may have changed with the content
+        probe_paths(reprobe)
+
+    new_paths = [path for path in on_disk if path not in known]
+    report.new = len(new_paths)
+    if new_paths:
+        if pipeline is None:
+            pipeline = IngestPipeline()
+            pipeline.submit_many(new_paths)
+            report.inserted = pipeline.flush()
+        else:
+            # Shared pipeline: rows land with the watcher's own batches
+            pipeline.submit_many(new_paths)
+
+    report.elapsed_seconds = round(time.perf_counter() - started, 3)
+    logger.info(
+        f"Reconciled {folder_path}: scanned={report.scanned} new={report.new} "
+        f"updated={report.updated} restored={report.restored} missing={report.missing} "
+        f"in {report.elapsed_seconds}s"
+    )
+    return report
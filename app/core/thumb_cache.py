@@ -0,0 +1,221 @@
+"""
+Thumbnail Cache
+Content-keyed thumbnail files with an LRU index and a byte budget
+
+Thumbnails are keyed on the source's quick fingerprint (size + head/tail
+sample, the whole file for small ones) and the requested size, so:
+- an edited file gets a new key (the fingerprint is re-read whenever the
+  mtime changes; an in-place edit that keeps the size and both sampled ends
+  of a large file is the one change that is not noticed),
+- a moved or renamed file keeps its key (no regeneration),
+- identical copies share one thumbnail, whatever their mtimes.
+
+The index (key -> bytes, least recently used first) is rebuilt from the
+cache directory on first use, ordered by file mtime; hits bump the file's
+mtime so the order survives restarts. When the files exceed the budget the
+least recently used are deleted. Files written by other processes (job
+workers) are adopted on their first hit; files in an older format (other
+suffix) are deleted when the index is built.
+"""
+
+import contextlib
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from pathlib import Path
+from typing import Any
+
+from app.core.logging import get_logger
+from app.core.utils import compute_quick_fingerprint
+
+logger = get_logger(__name__)
+
+# Bump when thumbnail rendering changes, so old files stop matching
+THUMB_CACHE_VERSION = 1
+
+# Files in the cache directory that are not managed by the index
+UNTRACKED_PREFIX = "placeholder_"
+
+
+@lru_cache(maxsize=4096)
+def _fingerprint(path: str, mtime_ns: int, size: int) -> str:  # noqa: ARG001
+    """Quick fingerprint, read once per path/mtime/size (grids ask for the same files repeatedly)"""
+    return compute_quick_fingerprint(path)
+
+
+def thumbnail_key(source_path: Path, variant: str) -> str:
+    """
+    Cache key of a thumbnail (shared by the file cache and the pack)
+
+    Args:
+        source_path: Source media file (must exist)
+        variant: What is rendered from it, e.g. "image_256"
+
+    Returns:
+        Hex key
+    """
+    stat = Path(source_path).stat()
+    fingerprint = _fingerprint(str(source_path), stat.st_mtime_ns, stat.st_size)
+    payload = f"{THUMB_CACHE_VERSION}|{fingerprint}|{variant}"
+    return hashlib.blake2b(payload.encode(), digest_size=16).hexdigest()
+
+
+class ThumbnailCache:
+    """
+    LRU index over thumbnail files in one directory
+
+    Thread-safe; files are written to a temporary name and renamed into
+    place, so readers never see partial thumbnails.
+    """
+
+    def __init__(self, directory: Path, max_bytes: int, suffix: str = ".jpg"):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.suffix = suffix
+        self._lock = threading.Lock()
+        self._index: OrderedDict[str, int] | None = None  # key -> bytes, LRU first
+        self._bytes = 0
+
+        # Stats
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def key(self, source_path: Path, variant: str) -> str:
+        """Cache key of a thumbnail (see thumbnail_key())"""
+        return thumbnail_key(source_path, variant)
+
+    def path_for(self, key: str) -> Path:
+        """File a thumbnail with this key is (or will be) stored in"""
+        return self.directory / f"{key}{self.suffix}"
+
+    def temp_path_for(self, key: str) -> Path:
+        """Where to write a new thumbnail before put() moves it into place"""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        return self.directory / f"{key}.{threading.get_ident()}.tmp{self.suffix}"
+
+    def get(self, key: str) -> Path | None:
+        """
+        Look up a thumbnail, marking it recently used
+
+        Returns:
+            Path to the file, or None on a miss
+        """
+        path = self.path_for(key)
+        with self._lock:
+            index = self._load_index()
+            if key in index and path.exists():
+                index.move_to_end(key)
+                self.hits += 1
+            elif path.exists():
+                # Written by another process since the index was built
+                size = path.stat().st_size
+                index[key] = size
+                self._bytes += size
+                self.hits += 1
+                self._evict()
+            else:
+                if key in index:
+                    self._bytes -= index.pop(key)
+                self.misses += 1
+                return None
+
+        with contextlib.suppress(OSError):
+            os.utime(path)
+        return path
+
+    def put(self, key: str, temp_path: Path) -> Path:
+        """
+        Move a freshly written thumbnail into place and evict if over budget
+
+        Args:
+            key: Cache key
+            temp_path: File written by the caller (from temp_path_for())
+
+        Returns:
+            Final path of the thumbnail
+        """
+        path = self.path_for(key)
+        Path(temp_path).replace(path)
+        size = path.stat().st_size
+        with self._lock:
+            index = self._load_index()
+            self._bytes += size - index.pop(key, 0)
+            index[key] = size
+            self._evict()
+        return path
+
+    def clear(self) -> int:
+        """
+        Delete every thumbnail (placeholders included)
+
+        Returns:
+            Number of files deleted
+        """
+        deleted = 0
+        with self._lock:
+            if self.directory.exists():
+                for thumb_file in self.directory.iterdir():
+                    try:
+                        thumb_file.unlink()
+                        deleted += 1
+                    except OSError as e:
+                        logger.error(f"Failed to delete thumbnail {thumb_file}: {e}")
+            self._index = OrderedDict()
+            self._bytes = 0
+        return deleted
+
+    def get_stats(self) -> dict[str, Any]:
+        """Hits, misses, evictions and bytes used"""
+        with self._lock:
+            index = self._load_index()
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(index),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+            }
+
+    def _load_index(self) -> OrderedDict[str, int]:
+        """Build the index from the directory on first use (caller holds the lock)"""
+        if self._index is not None:
+            return self._index
+
+        self.directory.mkdir(parents=True, exist_ok=True)
+        entries = []
+        for thumb_file in self.directory.iterdir():
+            if thumb_file.name.startswith(UNTRACKED_PREFIX) or ".tmp" in thumb_file.name:
+                continue
+            if thumb_file.suffix != self.suffix:
+                with contextlib.suppress(OSError):
+                    thumb_file.unlink()  # Older cache format
+                continue
+            try:
+                stat = thumb_file.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, thumb_file.name[: -len(self.suffix)], stat.st_size))
+
+        entries.sort()
+        self._index = OrderedDict((key, size) for _, key, size in entries)
+        self._bytes = sum(self._index.values())
+        logger.debug(f"Thumbnail cache index: {len(self._index)} files, {self._bytes / 1024 / 1024:.1f} MB")
+        self._evict()
+        return self._index
+
+    def _evict(self):
+        """Delete least recently used files until under budget (caller holds the lock)"""
+        while self._bytes > self.max_bytes and len(self._index) > 1:
+            key, size = self._index.popitem(last=False)
+            self._bytes -= size
+            self.evictions += 1
+            try:
+                self.path_for(key).unlink(missing_ok=True)
+            except OSError as e:
+                logger.warning(f"Failed to evict thumbnail {key}: {e}")
@@ -0,0 +1,254 @@
+"""
+Thumbnail Pack
+Thumbnails packed as blobs in one SQLite file
+
+Alternative to one file per thumbnail (THUMB_STORE=pack): a grid page of a
+few hundred thumbnails is one indexed SELECT over a memory-mapped database
+instead of a few hundred opens and seeks, which dominate cold loads on
+NTFS and network drives.
+
+Keys are the same content keys as the file cache (see thumbnail_key() in
+app/core/thumb_cache.py). Each row records its size and last use; once the
+blobs exceed the byte budget the least recently used rows are deleted.
+
+The blob is the last column, so size and last use are read without walking
+a row's overflow pages, and triggers keep the total size in a one-row
+table. Reads only buffer their last-use bumps; they are written with the
+next put or once TOUCH_BATCH keys are pending, so a warm page load never
+takes the writer lock.
+"""
+
+import threading
+import time
+from pathlib import Path
+from typing import Any
+
+from sqlalchemy import (
+    DDL,
+    Column,
+    Float,
+    Integer,
+    LargeBinary,
+    MetaData,
+    String,
+    Table,
+    bindparam,
+    delete,
+    event,
+    func,
+    select,
+    update,
+)
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.engine import Engine
+
+from app.core.db import chunked, create_sqlite_engine, sqlite_pragmas
+from app.core.logging import get_logger
+
+logger = get_logger(__name__)
+
+# Stored as PRAGMA user_version; a pack with another layout is dropped and rebuilt
+PACK_SCHEMA_VERSION = 2
+
+# Buffered last-use bumps written without waiting for the next put
+TOUCH_BATCH = 1000
+
+# Own metadata: the pack is a separate database file, not part of the app schema
+_metadata = MetaData()
+
+thumbs_table = Table(
+    "thumbs",
+    _metadata,
+    Column("key", String, primary_key=True),
+    Column("size", Integer, nullable=False),
+    Column("last_used", Float, nullable=False, index=True),
+    Column("data", LargeBinary, nullable=False),  # Last: may spill into overflow pages
+)
+
+totals_table = Table(
+    "totals",
+    _metadata,
+    Column("id", Integer, primary_key=True),
+    Column("bytes", Integer, nullable=False),
+)
+
+event.listen(totals_table, "after_create", DDL("INSERT INTO totals (id, bytes) VALUES (1, 0)"))
+for _ddl in (
+    "CREATE TRIGGER thumbs_insert AFTER INSERT ON thumbs "
+    "BEGIN UPDATE totals SET bytes = bytes + NEW.size WHERE id = 1; END",
+    "CREATE TRIGGER thumbs_delete AFTER DELETE ON thumbs "
+    "BEGIN UPDATE totals SET bytes = bytes - OLD.size WHERE id = 1; END",
+    "CREATE TRIGGER thumbs_resize AFTER UPDATE OF size ON thumbs "
+    "BEGIN UPDATE totals SET bytes = bytes - OLD.size + NEW.size WHERE id = 1; END",
+):
+    event.listen(thumbs_table, "after_create", DDL(_ddl))
+
+
+class ThumbnailPack:
+    """
+    LRU thumbnail store in one SQLite file
+
+    Thread- and process-safe (SQLite WAL); writers batch whole pyramids or
+    pages into one transaction.
+    """
+
+    def __init__(self, db_path: Path, max_bytes: int):
+        self.db_path = Path(db_path)
+        self.max_bytes = max_bytes
+        self._engine: Engine | None = None
+        self._engine_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._touched: dict[str, float] = {}  # key -> last use not yet written
+
+        # Stats
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @property
+    def engine(self) -> Engine:
+        """Engine of the pack file (created with the app's SQLite profile on first use)"""
+        with self._engine_lock:
+            if self._engine is None:
+                self.db_path.parent.mkdir(parents=True, exist_ok=True)
+                self._engine = create_sqlite_engine(self.db_path, pragmas=sqlite_pragmas())
+                with self._engine.begin() as connection:
+                    if connection.exec_driver_sql("PRAGMA user_version").scalar() != PACK_SCHEMA_VERSION:
+                        _metadata.drop_all(connection)
+                        _metadata.create_all(connection)
+                        connection.exec_driver_sql(f"PRAGMA user_version = {PACK_SCHEMA_VERSION}")
+            return self._engine
+
+    def get_many(self, keys: list[str]) -> dict[str, bytes]:
+        """
+        Load thumbnails, marking them recently used
+
+        Read-only: the last-use bumps are buffered (see _write_touches()).
+
+        Args:
+            keys: Cache keys (e.g. one grid page)
+
+        Returns:
+            Key -> WebP bytes for the keys that are stored
+        """
+        found: dict[str, bytes] = {}
+        if not keys:
+            return found
+
+        with self.engine.connect() as connection:
+            for chunk in chunked(list(dict.fromkeys(keys))):
+                rows = connection.execute(
+                    select(thumbs_table.c.key, thumbs_table.c.data).where(thumbs_table.c.key.in_(chunk))
+                )
+                found.update((row.key, row.data) for row in rows)
+
+        now = time.time()
+        with self._stats_lock:
+            self.hits += len(found)
+            self.misses += len(set(keys)) - len(found)
+            self._touched.update(dict.fromkeys(found, now))
+            due = len(self._touched) >= TOUCH_BATCH
+        if due:
+            with self.engine.begin() as connection:
+                self._write_touches(connection)
+        return found
+
+    def get(self, key: str) -> bytes | None:
+        """Load one thumbnail (None on a miss)"""
+        return self.get_many([key]).get(key)
+
+    def put_many(self, items: dict[str, bytes]):
+        """
+        Store thumbnails in one transaction and evict if over budget
+
+        Args:
+            items: Key -> encoded thumbnail
+        """
+        if not items:
+            return
+
+        now = time.time()
+        rows = [{"key": key, "data": data, "size": len(data), "last_used": now} for key, data in items.items()]
+        stmt = sqlite_insert(thumbs_table)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[thumbs_table.c.key],
+            set_={"data": stmt.excluded.data, "size": stmt.excluded.size, "last_used": stmt.excluded.last_used},
+        )
+        with self.engine.begin() as connection:
+            connection.execute(stmt, rows)
+            self._write_touches(connection)
+            self._evict(connection)
+
+    def clear(self) -> int:
+        """
+        Delete every thumbnail
+
+        Returns:
+            Number of thumbnails deleted
+        """
+        with self._stats_lock:
+            self._touched.clear()
+        with self.engine.begin() as connection:
+            return connection.execute(delete(thumbs_table)).rowcount
+
+    def get_stats(self) -> dict[str, Any]:
+        """Hits, misses, evictions and bytes used"""
+        with self.engine.connect() as connection:
+            entries = connection.execute(select(func.count()).select_from(thumbs_table)).scalar_one()
+            total = connection.execute(select(totals_table.c.bytes)).scalar_one()
+        with self._stats_lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": entries,
+                "bytes": total,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+            }
+
+    def close(self):
+        """Write buffered last-use bumps and dispose the engine (the pack is reopened on next use)"""
+        if self._engine is not None and self._touched:
+            with self.engine.begin() as connection:
+                self._write_touches(connection)
+        with self._engine_lock:
+            if self._engine is not None:
+                self._engine.dispose()
+                self._engine = None
+
+    def _write_touches(self, connection):
+        """Write buffered last-use bumps (inside the caller's write transaction)"""
+        with self._stats_lock:
+            touched, self._touched = self._touched, {}
+        if touched:
+            connection.execute(
+                update(thumbs_table)
+                .where(thumbs_table.c.key == bindparam("b_key"))
+                .values(last_used=bindparam("b_used")),
+                [{"b_key": key, "b_used": used} for key, used in touched.items()],
+            )
+
+    def _evict(self, connection):
+        """Delete least recently used rows until under budget (inside the caller's transaction)"""
+        total = connection.execute(select(totals_table.c.bytes)).scalar_one()
+        if total <= self.max_bytes:
+            return
+
+        doomed = []
+        rows = connection.execute(
+            select(thumbs_table.c.key, thumbs_table.c.size).order_by(thumbs_table.c.last_used, thumbs_table.c.key)
+        )
+        for key, size in rows:
+            if total <= self.max_bytes:
+                break
+            doomed.append(key)
+            total -= size
+        rows.close()
+
+        for chunk in chunked(doomed):
+            connection.execute(delete(thumbs_table).where(thumbs_table.c.key.in_(chunk)))
+        with self._stats_lock:
+            self.evictions += len(doomed)
+        logger.debug(f"Evicted {len(doomed)} thumbnails from {self.db_path.name}")
@@ -6,128 +6,340 @@
 - Pillow for image thumbnails
 - Placeholder icons for audio
 - FFmpeg for video (fallback to placeholder)
+
+Large sources are decoded at reduced size where the format allows: JPEGs
+at 1/2, 1/4 or 1/8 scale via draft(); other formats are box-reduced by an
+integer factor before the final LANCZOS pass (reducing_gap). Alpha is
+flattened without splitting every band (see load_thumbnail()).
+
+Thumbnails live in a ThumbnailCache under settings.cache_root, keyed on
+source content only (quick fingerprint; see app/core/thumb_cache.py) and
+kept within THUMB_CACHE_MAX_MB by LRU eviction. Copies share thumbnails;
+an in-place edit of a large file that keeps its size and both sampled ends
+is not noticed.
+
+Each source is decoded once into a pyramid of WebP thumbnails
+(THUMB_PYRAMID_LEVELS); a request for any size is served from the smallest
+level at least that large, so grid zoom changes never decode originals.
+
+With THUMB_STORE=pack the pyramids go into one SQLite blob file instead
+(see app/core/thumb_pack.py) and load_thumbnail_page() reads a whole grid
+page with a few queries.
 """
 
-import hashlib
-import subprocess
+import io
+import os
+import tempfile
+import threading
 from pathlib import Path
+from typing import Any
 
 from PIL import Image
 
 from app.backend.models.entities import AssetType
-from app.core.filetypes import guess_type_by_extension
+from app.core.config import settings
+from app.core.filetypes import detect_asset_type
 from app.core.logging import get_logger
+from app.core.thumb_cache import ThumbnailCache, thumbnail_key
+from app.core.thumb_pack import ThumbnailPack
+from app.workers.cancellation import CancellationToken, run_subprocess
 
 logger = get_logger(__name__)
 
-# Thumbnail cache directory
-THUMB_CACHE_DIR = Path("Cache/thumbs")
+# Thumbnail cache directory (under settings.cache_root)
+THUMB_CACHE_SUBDIR = "thumbs"
+THUMB_PACK_FILE = "thumbs.pack.db"  # THUMB_STORE=pack
 THUMB_SIZE = (256, 256)
 
+# Decode/reduce to at least this multiple of the target size before LANCZOS
+# (2.0+ is visually indistinguishable from a full-size resample)
+THUMB_REDUCING_GAP = 2.0
 
-def _ensure_cache_dir():
-    """Ensure thumbnail cache directory exists"""
-    THUMB_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+# Bounding-box edges rendered from one decode (each level is downscaled from the next larger)
+THUMB_PYRAMID_LEVELS = (64, 128, 256, 512)
+THUMB_WEBP_QUALITY = 80
 
 
-def _get_cache_path(source_path: str, size: int = 256) -> Path:
-    """
-    Generate predictable cache path for thumbnail
+_cache: ThumbnailCache | None = None
+_pack: ThumbnailPack | None = None
+_cache_lock = threading.Lock()
 
-    Uses hash of source path + size to create unique filename
-    """
-    path_hash = hashlib.md5(f"{source_path}_{size}".encode()).hexdigest()
-    return THUMB_CACHE_DIR / f"{path_hash}.jpg"
 
+def get_thumbnail_cache() -> ThumbnailCache:
+    """Get or create the thumbnail cache (directory and budget from settings)"""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = ThumbnailCache(
+                Path(settings.cache_root) / THUMB_CACHE_SUBDIR, settings.thumb_cache_max_mb * 1024 * 1024, ".webp"
+            )
+        return _cache
 
-def generate_image_thumbnail(source_path: Path, size: tuple[int, int] = THUMB_SIZE) -> Path:
+
+def get_thumbnail_pack() -> ThumbnailPack:
+    """Get or create the packed thumbnail store (file and budget from settings)"""
+    global _pack
+    with _cache_lock:
+        if _pack is None:
+            _pack = ThumbnailPack(
+                Path(settings.cache_root) / THUMB_PACK_FILE, settings.thumb_cache_max_mb * 1024 * 1024
+            )
+        return _pack
+
+
+def use_thumbnail_pack() -> bool:
+    """Whether grid thumbnails are stored in the pack (THUMB_STORE=pack)"""
+    return settings.thumb_store == "pack"
+
+
+def reset_thumbnail_cache():
+    """Forget the cache instances (after changing settings, e.g. in tests)"""
+    global _cache, _pack
+    with _cache_lock:
+        _cache = None
+        if _pack is not None:
+            _pack.close()
+        _pack = None
+
+
+def get_thumbnail_cache_stats() -> dict[str, Any]:
+    """Hits, misses and bytes used of the active thumbnail store"""
+    if use_thumbnail_pack():
+        return get_thumbnail_pack().get_stats()
+    return get_thumbnail_cache().get_stats()
+
+
+def pyramid_level(size: int) -> int:
+    """Smallest pyramid level at least `size` (the largest level for bigger requests)"""
+    for level in THUMB_PYRAMID_LEVELS:
+        if level >= size:
+            return level
+    return THUMB_PYRAMID_LEVELS[-1]
+
+
+def render_pyramid(img: Image.Image) -> dict[int, Image.Image]:
     """
-    Generate thumbnail for image file using Pillow
+    Decode an opened image once and downscale it to every pyramid level
 
     Args:
-        source_path: Path to source image
-        size: Thumbnail size (width, height)
+        img: Image from Image.open() (not yet loaded)
 
     Returns:
-        Path to cached thumbnail
+        Level -> RGB image fitting level x level
+    """
+    top = THUMB_PYRAMID_LEVELS[-1]
+    current = load_thumbnail(img, (top, top))
+    levels = {top: current}
+    for level in reversed(THUMB_PYRAMID_LEVELS[:-1]):
+        current = current.copy()
+        current.thumbnail((level, level), Image.Resampling.LANCZOS, reducing_gap=None)
+        levels[level] = current
+    return levels
+
+
+def encode_pyramid(
+    source_path: Path, asset_type: AssetType, token: CancellationToken | None = None
+) -> dict[int, bytes]:
     """
-    _ensure_cache_dir()
-    cache_path = _get_cache_path(str(source_path), size[0])
+    Render every pyramid level of an image or video from one decode
 
-    # Return cached if exists
-    if cache_path.exists():
-        return cache_path
+    Args:
+        source_path: Source image or video
+        asset_type: IMAGE or VIDEO
+        token: Cancellation token of the calling job (kills ffmpeg when tripped)
 
-    try:
+    Returns:
+        Level -> WebP bytes
+
+    Raises:
+        ValueError: Unsupported asset type
+        RuntimeError: ffmpeg could not extract a frame
+        JobCancelledError: Job was cancelled or timed out while ffmpeg ran
+    """
+    if asset_type == AssetType.IMAGE:
         with Image.open(source_path) as img:
-            # Convert RGBA to RGB if needed
-            if img.mode in ("RGBA", "LA", "P"):
-                background = Image.new("RGB", img.size, (255, 255, 255))
-                if img.mode == "P":
-                    img = img.convert("RGBA")
-                background.paste(img, mask=img.split()[-1] if img.mode in ("RGBA", "LA") else None)
-                img = background
-
-            # Generate thumbnail maintaining aspect ratio
-            img.thumbnail(size, Image.Resampling.LANCZOS)
-
-            # Save as JPEG
-            img.save(cache_path, "JPEG", quality=85, optimize=True)
-            logger.debug(f"Generated image thumbnail: {cache_path}")
-            return cache_path
+            levels = render_pyramid(img)
+    elif asset_type == AssetType.VIDEO:
+        levels = _render_video_pyramid(source_path, token)
+    else:
+        raise ValueError(f"No thumbnail pyramid for {asset_type.value} assets")
+
+    encoded = {}
+    for level, thumb in levels.items():
+        buffer = io.BytesIO()
+        thumb.save(buffer, "WEBP", quality=THUMB_WEBP_QUALITY, method=4)
+        encoded[level] = buffer.getvalue()
+    return encoded
+
+
+def generate_thumbnail_pyramid(
+    source_path: Path, asset_type: AssetType, token: CancellationToken | None = None
+) -> dict[int, Path]:
+    """
+    Render every pyramid level of an image or video into the file cache
 
-    except Exception as e:
-        logger.error(f"Failed to generate image thumbnail for {source_path}: {e}")
-        return _get_placeholder_path("image")
+    Pure file work (no database access): safe to run in a worker process.
 
+    Args:
+        source_path: Source image or video
+        asset_type: IMAGE or VIDEO
+        token: Cancellation token of the calling job (see encode_pyramid())
 
-def generate_video_thumbnail(source_path: Path, size: tuple[int, int] = THUMB_SIZE) -> Path:
+    Returns:
+        Level -> cached WebP thumbnail
+
+    Raises:
+        ValueError: Unsupported asset type
+        RuntimeError: ffmpeg could not extract a frame
     """
-    Generate thumbnail for video file using ffmpeg
+    cache = get_thumbnail_cache()
+    paths = {}
+    for level, data in encode_pyramid(source_path, asset_type, token).items():
+        key = cache.key(source_path, f"{asset_type.value}_{level}")
+        temp_path = cache.temp_path_for(key)
+        try:
+            temp_path.write_bytes(data)
+            paths[level] = cache.put(key, temp_path)
+        finally:
+            temp_path.unlink(missing_ok=True)
+    logger.debug(f"Generated thumbnail pyramid for {source_path}")
+    return paths
 
-    Extracts frame at 1 second or falls back to placeholder
+
+def pack_thumbnail_pyramid(
+    source_path: Path, asset_type: AssetType, token: CancellationToken | None = None
+) -> dict[int, str]:
+    """
+    Render every pyramid level of an image or video into the pack (one transaction)
+
+    Touches only the pack database: safe to run in a worker process.
 
     Args:
-        source_path: Path to source video
-        size: Thumbnail size (width, height)
+        source_path: Source image or video
+        asset_type: IMAGE or VIDEO
+        token: Cancellation token of the calling job (see encode_pyramid())
 
     Returns:
-        Path to cached thumbnail or placeholder
+        Level -> pack key
     """
-    _ensure_cache_dir()
-    cache_path = _get_cache_path(str(source_path), size[0])
-
-    # Return cached if exists
-    if cache_path.exists():
-        return cache_path
-
+    encoded = encode_pyramid(source_path, asset_type, token)
+    keys = {level: thumbnail_key(source_path, f"{asset_type.value}_{level}") for level in encoded}
+    get_thumbnail_pack().put_many({keys[level]: data for level, data in encoded.items()})
+    logger.debug(f"Packed thumbnail pyramid for {source_path}")
+    return keys
+
+
+def _render_video_pyramid(source_path: Path, token: CancellationToken | None = None) -> dict[int, Image.Image]:
+    """Extract one frame at the top level's size with ffmpeg and build the pyramid from it"""
+    top = THUMB_PYRAMID_LEVELS[-1]
+    # Unique per call: workers in other processes may render a same-named source at once
+    fd, frame_name = tempfile.mkstemp(prefix="podstudio_frame_", suffix=".png")
+    os.close(fd)
+    frame_path = Path(frame_name)
     try:
-        # Try to extract frame with ffmpeg
-        result = subprocess.run(
+        result = run_subprocess(
             [
                 "ffmpeg",
-                "-i",
-                str(source_path),
                 "-ss",
                 "00:00:01",  # 1 second in
+                "-i",
+                str(source_path),
                 "-vframes",
                 "1",
                 "-vf",
-                f"scale={size[0]}:{size[1]}:force_original_aspect_ratio=decrease",
+                f"scale={top}:{top}:force_original_aspect_ratio=decrease",
                 "-y",
-                str(cache_path),
+                str(frame_path),
             ],
-            capture_output=True,
+            token,
             timeout=10,
         )
+        if result.returncode != 0 or not frame_path.stat().st_size:
+            raise RuntimeError(f"ffmpeg failed: {result.stderr[-500:]}")
+        with Image.open(frame_path) as img:
+            return render_pyramid(img)
+    finally:
+        frame_path.unlink(missing_ok=True)
 
-        if result.returncode == 0 and cache_path.exists():
-            logger.debug(f"Generated video thumbnail: {cache_path}")
-            return cache_path
-        else:
-            logger.warning(f"ffmpeg failed for {source_path}, using placeholder")
-            return _get_placeholder_path("video")
 
+def _pyramid_thumbnail(source_path: Path, asset_type: AssetType, size: int) -> Path:
+    """Cached pyramid level for `size`, rendering the whole pyramid on a miss"""
+    cache = get_thumbnail_cache()
+    level = pyramid_level(size)
+    cached = cache.get(cache.key(source_path, f"{asset_type.value}_{level}"))
+    if cached:
+        return cached
+    return generate_thumbnail_pyramid(source_path, asset_type)[level]
+
+
+def generate_image_thumbnail(source_path: Path, size: tuple[int, int] = THUMB_SIZE) -> Path:
+    """
+    Generate thumbnail for image file using Pillow
+
+    Args:
+        source_path: Path to source image
+        size: Thumbnail size (width, height); served from the matching pyramid level
+
+    Returns:
+        Path to cached thumbnail
+    """
+    try:
+        return _pyramid_thumbnail(source_path, AssetType.IMAGE, max(size))
+    except Exception as e:
+        logger.error(f"Failed to generate image thumbnail for {source_path}: {e}")
+        return _get_placeholder_path("image")
+
+
+def load_thumbnail(img: Image.Image, size: tuple[int, int] = THUMB_SIZE) -> Image.Image:
+    """
+    Decode an opened image at reduced size and fit it into `size`
+
+    Must be called before the image is loaded. thumbnail() with a
+    reducing_gap first calls draft(), so JPEGs are decoded directly at the
+    smallest DCT scale (1/2, 1/4, 1/8) still THUMB_REDUCING_GAP times the
+    target and an 8K JPEG never exists in memory at full size. Formats
+    without scaled decoding (PNG, WebP, ...) are decoded once and shrunk
+    with a cheap integer reduce() before the LANCZOS pass.
+
+    Args:
+        img: Image from Image.open() (not yet loaded)
+        size: Bounding box (width, height)
+
+    Returns:
+        RGB image fitting `size`, aspect ratio preserved, alpha flattened on white
+    """
+    if img.mode == "P":
+        # Palette images only resample with NEAREST; expand them first
+        img = img.convert("RGBA")
+
+    if img.mode in ("RGBA", "LA"):
+        # Flattening first is cheaper than the premultiplied copy resize() makes of
+        # RGBA, and only the alpha band is extracted (split() would copy all four)
+        background = Image.new("RGB", img.size, (255, 255, 255))
+        background.paste(img, mask=img.getchannel("A"))
+        img = background
+    elif img.mode not in ("RGB", "L", "CMYK"):
+        img = img.convert("RGB")
+
+    img.thumbnail(size, Image.Resampling.LANCZOS, reducing_gap=THUMB_REDUCING_GAP)
+    return img if img.mode == "RGB" else img.convert("RGB")
+
+
+def generate_video_thumbnail(source_path: Path, size: tuple[int, int] = THUMB_SIZE) -> Path:
+    """
+    Generate thumbnail for video file using ffmpeg
+
+    Extracts frame at 1 second or falls back to placeholder
+
+    Args:
+        source_path: Path to source video
+        size: Thumbnail size (width, height); served from the matching pyramid level
+
+    Returns:
+        Path to cached thumbnail or placeholder
+    """
+    try:
+        return _pyramid_thumbnail(source_path, AssetType.VIDEO, max(size))
     except FileNotFoundError:
         logger.warning("ffmpeg not found, using video placeholder")
         return _get_placeholder_path("video")
@@ -149,8 +361,9 @@ def _get_placeholder_path(asset_type: str) -> Path:
     Returns:
         Path to placeholder image
     """
-    _ensure_cache_dir()
-    placeholder_path = THUMB_CACHE_DIR / f"placeholder_{asset_type}.jpg"
+    cache_dir = get_thumbnail_cache().directory
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    placeholder_path = cache_dir / f"placeholder_{asset_type}.jpg"
 
     # Generate simple colored placeholder if it doesn't exist
     if not placeholder_path.exists():
@@ -186,8 +399,8 @@ def generate_thumbnail(path: str, size: int = 256) -> str:
         logger.warning(f"Source file not found: {path}")
         return str(_get_placeholder_path("unknown"))
 
-    # Determine asset type
-    asset_type = guess_type_by_extension(source_path)
+    # Determine asset type (content-sniffed, cached per path/size/mtime)
+    asset_type = detect_asset_type(source_path)
 
     if asset_type is None:
         logger.warning(f"Unsupported file type: {path}")
@@ -212,12 +425,80 @@ def generate_thumbnail(path: str, size: int = 256) -> str:
         return str(_get_placeholder_path(asset_type.value if asset_type else "unknown"))
 
 
+def _read_thumbnail(path: str, size: int) -> bytes:
+    """
+    Read one thumbnail from the file cache
+
+    Falls back to the placeholder when the cached file cannot be read, e.g.
+    because another thread's put() evicted it right after generation.
+    """
+    try:
+        return Path(generate_thumbnail(path, size)).read_bytes()
+    except Exception as e:
+        logger.warning(f"Cannot read thumbnail for {path}: {e}")
+    try:
+        return _get_placeholder_path("unknown").read_bytes()
+    except OSError as e:
+        logger.error(f"Cannot read placeholder thumbnail: {e}")
+        return b""
+
+
+def load_thumbnail_page(paths: list[str], size: int = 256) -> dict[str, bytes]:
+    """
+    Load the thumbnails of one grid page
+
+    With THUMB_STORE=pack every cached thumbnail of the page comes from one
+    batched query; misses are rendered and stored in one transaction.
+    Otherwise each thumbnail is read from the file cache.
+
+    Args:
+        paths: Source media paths (e.g. the ~200 assets of a grid page)
+        size: Thumbnail size in pixels (square), snapped to a pyramid level
+
+    Returns:
+        Source path -> encoded image (WebP, or JPEG for placeholders; empty
+        if not even a placeholder could be read)
+    """
+    if not use_thumbnail_pack():
+        return {path: _read_thumbnail(path, size) for path in paths}
+
+    level = pyramid_level(size)
+    wanted: dict[str, tuple[str, Path, AssetType]] = {}  # path -> (key, source, type)
+    page: dict[str, bytes] = {}
+    for path in paths:
+        source_path = Path(path)
+        asset_type = detect_asset_type(source_path) if source_path.exists() else None
+        if asset_type in (AssetType.IMAGE, AssetType.VIDEO):
+            wanted[path] = (thumbnail_key(source_path, f"{asset_type.value}_{level}"), source_path, asset_type)
+        else:
+            page[path] = _get_placeholder_path(asset_type.value if asset_type else "unknown").read_bytes()
+
+    pack = get_thumbnail_pack()
+    stored = pack.get_many([key for key, _, _ in wanted.values()])
+    rendered: dict[str, bytes] = {}
+    for path, (key, source_path, asset_type) in wanted.items():
+        if key in stored or key in rendered:
+            page[path] = stored.get(key) or rendered[key]
+            continue
+        try:
+            encoded = encode_pyramid(source_path, asset_type)
+        except Exception as e:
+            logger.error(f"Failed to generate thumbnail for {path}: {e}")
+            page[path] = _get_placeholder_path(asset_type.value).read_bytes()
+            continue
+        for other_level, data in encoded.items():
+            rendered[thumbnail_key(source_path, f"{asset_type.value}_{other_level}")] = data
+        page[path] = encoded[level]
+
+    pack.put_many(rendered)
+    if rendered:
+        logger.debug(f"Thumbnail page: {len(stored)} packed, {len(wanted) - len(stored)} rendered")
+    return {path: page[path] for path in paths}
+
+
 def clear_thumbnail_cache():
-    """Clear all cached thumbnails"""
-    if THUMB_CACHE_DIR.exists():
-        for thumb_file in THUMB_CACHE_DIR.glob("*.jpg"):
-            try:
-                thumb_file.unlink()
-                logger.debug(f"Deleted thumbnail: {thumb_file}")
-            except Exception as e:
-                logger.error(f"Failed to delete thumbnail {thumb_file}: {e}")
+    """Clear all cached thumbnails (least recently used ones are evicted automatically)"""
+    deleted = get_thumbnail_cache().clear()
+    if use_thumbnail_pack() or (Path(settings.cache_root) / THUMB_PACK_FILE).exists():
+        deleted += get_thumbnail_pack().clear()
+    logger.debug(f"Deleted {deleted} thumbnails")
@@ -1,9 +1,12 @@
 """Core Utilities - Shared Helper Functions
 
 STEP 5: File operations for curation (move, rename, hash)
+Tiered hashing: quick size + head/tail fingerprint, full SHA256 only when needed
 """
 
 import hashlib
+import mmap
+import os
 import shutil
 from pathlib import Path
 
@@ -16,10 +19,22 @@
 logger = get_logger(__name__)
 
 
+# Full-hash read strategy: large buffered reads, mmap for very large files
+HASH_BUFFER_SIZE = 1024 * 1024  # 1 MiB
+HASH_MMAP_THRESHOLD = 64 * 1024 * 1024  # 64 MiB
+HASH_MMAP_SLICE = 16 * 1024 * 1024  # hashlib releases the GIL on large slices
+
+# Quick fingerprint: bytes sampled from the head and tail of the file
+QUICK_HASH_SAMPLE = 64 * 1024  # 64 KiB
+
+
 def compute_hash(path: str, algorithm: str = "sha256") -> str:
     """
     Compute file hash
 
+    Reads in 1 MiB chunks; files above HASH_MMAP_THRESHOLD are memory-mapped
+    and hashed in large slices to avoid per-chunk Python overhead.
+
     Args:
         path: File path
         algorithm: Hash algorithm (sha256, md5)
@@ -39,12 +54,52 @@ def compute_hash(path: str, algorithm: str = "sha256") -> str:
         raise ValueError(f"Unsupported algorithm: {algorithm}")
 
     with file_path.open("rb") as f:
-        while chunk := f.read(8192):
-            hasher.update(chunk)
+        size = os.fstat(f.fileno()).st_size
+        if size and size >= HASH_MMAP_THRESHOLD:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                view = memoryview(mapped)
+                try:
+                    for start in range(0, size, HASH_MMAP_SLICE):
+                        hasher.update(view[start : start + HASH_MMAP_SLICE])
+                finally:
+                    view.release()
+        else:
+            buffer = bytearray(HASH_BUFFER_SIZE)
+            view = memoryview(buffer)
+            while read := f.readinto(buffer):
+                hasher.update(view[:read])
 
     return hasher.hexdigest()
 
 
+def compute_quick_fingerprint(path: str | Path, sample_size: int = QUICK_HASH_SAMPLE) -> str:
+    """
+    Compute a cheap content fingerprint: file size + hash of head and tail samples
+
+    Two files with different fingerprints are guaranteed to differ; equal
+    fingerprints only mean a full hash is needed to confirm a duplicate.
+    Files up to 2 * sample_size are hashed whole, so their fingerprint is exact.
+
+    Args:
+        path: File path
+        sample_size: Bytes read from each end of the file
+
+    Returns:
+        Fingerprint string "<size hex>-<blake2b hex>"
+    """
+    hasher = hashlib.blake2b(digest_size=16)
+    with Path(path).open("rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        if size <= 2 * sample_size:
+            hasher.update(f.read())
+        else:
+            hasher.update(f.read(sample_size))
+            f.seek(-sample_size, os.SEEK_END)
+            hasher.update(f.read(sample_size))
+
+    return f"{size:x}-{hasher.hexdigest()}"
+
+
 def safe_move_file(source: str | Path, dest_dir: str | Path, update_db: bool = True) -> Path:
     """
     Safely move file to destination directory with collision handling
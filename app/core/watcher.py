@@ -3,117 +3,240 @@
 Monitor folders for new assets using watchdog
 
 STEP 4: Basic file watcher with DB insert (metadata stubs only)
+Events are handed to the batched IngestPipeline (app/core/ingest.py)
 Future: Auto-ingest pipeline with file moving and metadata extraction
 """
 
-import hashlib
+import threading
 import time
-from datetime import UTC, datetime
+from collections import OrderedDict
+from collections.abc import Callable
+from dataclasses import dataclass
 from pathlib import Path
+from typing import Any
 
-from sqlmodel import Session, select
-from watchdog.events import FileCreatedEvent, FileSystemEventHandler
+from watchdog.events import FileSystemEvent, FileSystemEventHandler
 from watchdog.observers import Observer
 
-from app.backend.models.entities import Asset, AssetProvenance
 from app.core.config import settings
-from app.core.db import get_engine
-from app.core.filetypes import guess_type_by_extension, is_supported
+from app.core.filetypes import is_supported
+from app.core.ingest import IngestPipeline
 from app.core.logging import get_logger
+from app.core.media_probe import backfill_media_metadata
+from app.core.phash import backfill_phashes
+from app.core.reconcile import ReconcileReport, reconcile_folder
 
 logger = get_logger(__name__)
 
 
+@dataclass
+class _SettleEntry:
+    """Per-path write-completion state"""
+
+    size: int | None = None
+    mtime: float | None = None
+    last_change: float = 0.0
+    closed: bool = False
+
+
+class SettleTracker:
+    """
+    Write-completion detector for files being written into watch folders
+
+    A path is considered settled once its (size, mtime) has not changed for
+    `settle_seconds`, or as soon as a close-after-write event was seen and two
+    consecutive stats taken after it match (one poll to record, the next to
+    confirm). Close events for untracked paths are ignored. Settled paths are handed to `on_settled` exactly once;
+    paths that disappear (temp files, aborted renders) are dropped.
+    """
+
+    def __init__(self, on_settled: Callable[[Path], None], settle_seconds: float | None = None):
+        """
+        Initialize settle tracker
+
+        Args:
+            on_settled: Callback invoked (on the tracker thread) with each settled path
+            settle_seconds: Quiet period required (defaults to settings.watch_settle_seconds)
+        """
+        self.on_settled = on_settled
+        self.settle_seconds = settle_seconds if settle_seconds is not None else settings.watch_settle_seconds
+        self._entries: dict[Path, _SettleEntry] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def start(self):
+        """Start the polling thread"""
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="watch_settle", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop the polling thread (tracked paths are forgotten)"""
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+        with self._lock:
+            self._entries.clear()
+
+    def touch(self, path: Path):
+        """Record write activity on a path"""
+        with self._lock:
+            entry = self._entries.setdefault(path, _SettleEntry())
+            entry.last_change = time.monotonic()
+            entry.closed = False
+
+    def mark_closed(self, path: Path):
+        """Record that a writer closed a tracked file (stats taken before the close do not count)"""
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry is None:
+                return
+            entry.closed = True
+            entry.size = entry.mtime = None
+
+    def discard(self, path: Path):
+        """Stop tracking a path (moved away or deleted)"""
+        with self._lock:
+            self._entries.pop(path, None)
+
+    def tracked_count(self) -> int:
+        """Number of paths still waiting to settle"""
+        with self._lock:
+            return len(self._entries)
+
+    def poll(self) -> list[Path]:
+        """
+        Stat tracked paths once and release the settled ones
+
+        Returns:
+            Paths that settled during this poll
+        """
+        now = time.monotonic()
+        with self._lock:
+            candidates = list(self._entries.items())
+
+        settled = []
+        for path, entry in candidates:
+            try:
+                stat = path.stat()
+            except OSError:
+                self.discard(path)
+                continue
+
+            with self._lock:
+                if self._entries.get(path) is not entry:
+                    continue
+                if (stat.st_size, stat.st_mtime) != (entry.size, entry.mtime):
+                    first_look = entry.size is None
+                    entry.size, entry.mtime = stat.st_size, stat.st_mtime
+                    if not first_look:
+                        # Still growing: restart the quiet period
+                        entry.last_change = now
+                        continue
+                    if entry.closed:
+                        # Closed: settles once the next stat confirms this one
+                        continue
+                    # First look: the quiet period runs from the last event
+                if entry.closed or now - entry.last_change >= self.settle_seconds:
+                    del self._entries[path]
+                    settled.append(path)
+
+        for path in settled:
+            try:
+                self.on_settled(path)
+            except Exception as e:
+                logger.error(f"Settle callback failed for {path}: {e}")
+        return settled
+
+    def _run(self):
+        """Polling loop"""
+        interval = max(self.settle_seconds / 4, 0.05)
+        while not self._stop.wait(interval):
+            self.poll()
+
+
 class AssetFileHandler(FileSystemEventHandler):
     """
     Watchdog event handler for new asset files
 
-    Inserts Asset records into database when supported files are created
+    Created/modified/moved/closed events feed a SettleTracker; once a file is
+    quiescent it is forwarded to the ingest pipeline, which inserts Asset
+    records in batches off the observer thread
     """
 
-    def __init__(self):
+    def __init__(self, pipeline: IngestPipeline, settle_seconds: float | None = None):
         super().__init__()
-        self._recent_files = {}  # path -> timestamp (for debouncing)
+        self.pipeline = pipeline
+        self.tracker = SettleTracker(self._on_settled, settle_seconds)
+        self._recent_files: OrderedDict[Path, float] = OrderedDict()  # path -> submit time (for debouncing)
         self._debounce_seconds = 2.0
+        self._max_recent_files = 10000
+        self._recent_lock = threading.Lock()
 
-    def on_created(self, event: FileCreatedEvent):
+    def on_created(self, event: FileSystemEvent):
         """Handle file creation events"""
         if event.is_directory:
             return
+        self._track(Path(event.src_path))
 
-        file_path = Path(event.src_path)
-
-        # Check if file is supported
-        if not is_supported(file_path):
-            return
-
-        # Debounce: Skip if we've seen this file recently
-        now = time.time()
-        if file_path in self._recent_files and now - self._recent_files[file_path] < self._debounce_seconds:
+    def on_modified(self, event: FileSystemEvent):
+        """Handle writes to a file (restarts its quiet period)"""
+        if event.is_directory:
             return
+        self._track(Path(event.src_path))
 
-        self._recent_files[file_path] = now
-
-        # Insert asset into database
-        try:
-            self._insert_asset(file_path)
-        except Exception as e:
-            logger.error(f"Failed to insert asset {file_path}: {e}")
-
-    def _insert_asset(self, file_path: Path):
-        """Insert new Asset record into database"""
-        # Ensure file exists and is readable
-        if not file_path.exists():
-            logger.warning(f"File vanished before insert: {file_path}")
+    def on_moved(self, event: FileSystemEvent):
+        """Handle renames (e.g. render.tmp -> render.png)"""
+        if event.is_directory:
             return
+        self.tracker.discard(Path(event.src_path))
+        self._track(Path(event.dest_path))
 
-        # Guess asset type from extension
-        asset_type = guess_type_by_extension(file_path)
-        if asset_type is None:
-            logger.warning(f"Unsupported file type: {file_path}")
+    def on_closed(self, event: FileSystemEvent):
+        """Handle close-after-write (inotify only; other platforms rely on stability)"""
+        if event.is_directory:
             return
+        file_path = Path(event.src_path)
+        if is_supported(file_path):
+            self.tracker.mark_closed(file_path)
 
-        # Calculate file hash (for deduplication)
-        file_hash = self._calculate_hash(file_path)
+    def on_deleted(self, event: FileSystemEvent):
+        """Forget files deleted before they settled"""
+        if not event.is_directory:
+            self.tracker.discard(Path(event.src_path))
 
-        # Check if asset already exists
-        engine = get_engine()
-        with Session(engine) as session:
-            existing = session.exec(select(Asset).where(Asset.path == str(file_path))).first()
-            if existing:
-                logger.info(f"Asset already exists: {file_path}")
+    def _track(self, file_path: Path):
+        """Start or restart settle tracking for a supported file"""
+        # Check if file is supported
+        if not is_supported(file_path):
+            return
+        self.tracker.touch(file_path)
+
+    def _on_settled(self, file_path: Path):
+        """Forward a settled file to the ingest pipeline"""
+        now = time.monotonic()
+        with self._recent_lock:
+            self._evict_recent(now)
+            # Debounce: Skip if we've submitted this file recently
+            if file_path in self._recent_files:
                 return
+            self._recent_files[file_path] = now
+
+        # Queue for batched insert
+        self.pipeline.submit(file_path)
 
-            # Create new asset (metadata stubs only)
-            asset = Asset(
-                path=str(file_path),
-                type=asset_type,
-                hash=file_hash,
-                width=None,  # TODO: Extract from image metadata
-                height=None,
-                duration_sec=None,  # TODO: Extract from audio/video metadata
-                samplerate_hz=None,
-                theme=None,  # User will set this later
-                source=None,
-                provenance=AssetProvenance.UNKNOWN,  # User will curate this later
-                approved=False,  # Requires manual approval
-                created_at=datetime.now(UTC),
-                updated_at=datetime.now(UTC),
-            )
-
-            session.add(asset)
-            session.commit()
-            session.refresh(asset)
-
-            logger.info(f"Inserted asset: {file_path} (id={asset.id}, type={asset_type.value})")
-
-    def _calculate_hash(self, file_path: Path) -> str:
-        """Calculate SHA256 hash of file"""
-        sha256 = hashlib.sha256()
-        with file_path.open("rb") as f:
-            while chunk := f.read(8192):
-                sha256.update(chunk)
-        return sha256.hexdigest()
+    def _evict_recent(self, now: float):
+        """Drop debounce entries older than the window (oldest first) and cap the size"""
+        while self._recent_files:
+            path, submitted_at = next(iter(self._recent_files.items()))
+            if now - submitted_at < self._debounce_seconds and len(self._recent_files) < self._max_recent_files:
+                break
+            del self._recent_files[path]
 
 
 class FileWatcher:
@@ -137,7 +260,12 @@ def __init__(self, folders: list[str] | None = None):
 
         self.folders = [Path(f) for f in folders]
         self.observer = Observer()
-        self.handler = AssetFileHandler()
+        self.pipeline = IngestPipeline()
+        self.handler = AssetFileHandler(self.pipeline)
+        self.recursive = settings.watch_recursive
+        self.reconcile_on_start = settings.watch_reconcile_on_start
+        self.last_reconcile: list[ReconcileReport] = []
+        self._reconcile_thread: threading.Thread | None = None
         self._running = False
 
     def start(self):
@@ -155,13 +283,20 @@ def start(self):
                 logger.warning(f"Watch folder does not exist: {folder}")
                 continue
 
-            self.observer.schedule(self.handler, str(folder), recursive=False)
-            logger.info(f"Watching folder: {folder}")
+            self.observer.schedule(self.handler, str(folder), recursive=self.recursive)
+            logger.info(f"Watching folder: {folder} (recursive={self.recursive})")
 
+        self.pipeline.start()
+        self.handler.tracker.start()
         self.observer.start()
         self._running = True
         logger.info("File watcher started")
 
+        if self.reconcile_on_start:
+            # Catch up on files changed while we were not running, without blocking startup
+            self._reconcile_thread = threading.Thread(target=self.reconcile, name="watch_reconcile", daemon=True)
+            self._reconcile_thread.start()
+
     def stop(self):
         """Stop watching folders"""
         if not self._running:
@@ -169,6 +304,13 @@ def stop(self):
 
         self.observer.stop()
         self.observer.join()
+        self.handler.tracker.stop()
+        if self._reconcile_thread:
+            self._reconcile_thread.join()
+            self._reconcile_thread = None
+        self.pipeline.stop(flush=True)
+        # watchdog observers are single-use threads; prepare a fresh one for restart
+        self.observer = Observer()
         self._running = False
         logger.info("File watcher stopped")
 
@@ -176,6 +318,43 @@ def is_running(self) -> bool:
         """Check if watcher is running"""
         return self._running
 
+    def reconcile(self) -> list[ReconcileReport]:
+        """
+        Reconcile every watch folder against the database
+
+        New files are queued on the watcher's ingest pipeline, changed files
+        are rehashed and vanished files are marked missing.
+
+        Returns:
+            One ReconcileReport per existing folder
+        """
+        reports = []
+        for folder in self.folders:
+            if not folder.exists():
+                continue
+            try:
+                pipeline = self.pipeline if self._running else None
+                reports.append(reconcile_folder(folder, pipeline=pipeline, recursive=self.recursive))
+            except Exception as e:
+                logger.error(f"Reconciliation failed for {folder}: {e}")
+        self.last_reconcile = reports
+        try:
+            # Images ingested before perceptual hashing existed
+            backfill_phashes()
+        except Exception as e:
+            logger.error(f"Perceptual hash backfill failed: {e}")
+        if settings.ingest_probe_metadata:
+            try:
+                # Assets ingested before metadata probing existed
+                backfill_media_metadata()
+            except Exception as e:
+                logger.error(f"Media metadata backfill failed: {e}")
+        return reports
+
+    def get_ingest_stats(self) -> dict[str, Any]:
+        """Get ingest throughput metrics (see IngestStats)"""
+        return self.pipeline.get_stats()
+
 
 # Global watcher instance (lazy-initialized)
 _watcher: FileWatcher | None = None
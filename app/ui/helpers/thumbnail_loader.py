@@ -0,0 +1,106 @@
+"""
+Thumbnail Loader
+Generates grid thumbnails on a background thread pool
+
+The grid shows placeholders immediately and asks the loader for its
+thumbnails; batches are decoded (or read from the pack) on a QThreadPool
+and each thumbnail is handed back to the UI thread via thumbnail_ready.
+Only as many batches as there are threads are in flight, so the grid can
+re-prioritize on scroll (see ThumbnailRequestQueue).
+"""
+
+import contextlib
+
+from PySide6.QtCore import QObject, QRunnable, QThreadPool, Signal
+
+from app.core.config import settings
+from app.core.logging import get_logger
+from app.core.thumbnails import load_thumbnail_page
+from app.ui.helpers.thumbnail_queue import ThumbnailRequestQueue
+
+logger = get_logger(__name__)
+
+
+class _ThumbnailBatchTask(QRunnable):
+    """Loads one batch of thumbnails off the UI thread"""
+
+    def __init__(self, loader: "ThumbnailLoader", generation: int, paths: list[str], size: int):
+        super().__init__()
+        self.loader = loader
+        self.generation = generation
+        self.paths = paths
+        self.size = size
+
+    def run(self):
+        """Load the batch and report back (queued to the loader's thread)"""
+        try:
+            thumbs = load_thumbnail_page(self.paths, self.size)
+        except Exception as e:
+            logger.error(f"Thumbnail batch failed: {e}")
+            thumbs = dict.fromkeys(self.paths, b"")  # Every card shows its failure state
+
+        with contextlib.suppress(RuntimeError):  # Loader deleted while the batch ran (grid closed)
+            self.loader.batch_done.emit(self.generation, thumbs)
+
+
+class ThumbnailLoader(QObject):
+    """
+    Background thumbnail loader for one grid
+
+    Signals:
+        thumbnail_ready: Emitted in the UI thread with (source_path, encoded image),
+            empty bytes if the thumbnail could not be loaded
+    """
+
+    thumbnail_ready = Signal(str, object)  # bytes (object: no QByteArray conversion)
+    batch_done = Signal(int, object)  # Internal: (generation, path -> bytes) from worker threads
+
+    def __init__(self, size: int, parent=None):
+        super().__init__(parent)
+        self.size = size
+        self.queue = ThumbnailRequestQueue()
+        self.pool = QThreadPool(self)
+        self.pool.setMaxThreadCount(max(1, settings.ui_thumbnail_workers))
+        self._in_flight = 0
+        self.batch_done.connect(self._on_batch_done)
+
+    def load(self, paths: list[str]):
+        """
+        Load thumbnails for a new grid (batches of the previous grid are dropped)
+
+        Args:
+            paths: Source paths in grid order
+        """
+        self.queue.reset(paths)
+        self._dispatch()
+
+    def set_visible(self, paths: list[str]):
+        """Load these paths next (cards currently on screen)"""
+        self.queue.set_visible(paths)
+        self._dispatch()
+
+    def cancel(self):
+        """Forget pending thumbnails; running batches finish but are ignored"""
+        self.queue.reset([])
+
+    def shutdown(self):
+        """Cancel and wait for running batches (on close)"""
+        self.cancel()
+        self.pool.waitForDone()
+
+    def _dispatch(self):
+        """Start batches until every pool thread is busy"""
+        while self._in_flight < self.pool.maxThreadCount():
+            paths = self.queue.next_batch()
+            if not paths:
+                return
+            self._in_flight += 1
+            self.pool.start(_ThumbnailBatchTask(self, self.queue.generation, paths, self.size))
+
+    def _on_batch_done(self, generation: int, thumbs: dict):
+        """Hand the batch to the grid and start the next one"""
+        self._in_flight -= 1
+        if generation == self.queue.generation:
+            for path, data in thumbs.items():
+                self.thumbnail_ready.emit(path, data)
+        self._dispatch()
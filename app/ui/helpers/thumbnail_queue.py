@@ -0,0 +1,67 @@
+"""
+Thumbnail Request Queue
+Decides which grid thumbnails the background loader fetches next
+
+Qt-free so the ordering can be tested without a display: thumbnails of
+cards currently on screen go first (in grid order), then the rest of the
+grid. A new grid (refresh, filter) starts a new generation, so results of
+batches still running for the old grid can be told apart and dropped.
+"""
+
+from collections.abc import Iterable
+
+# Paths per background task: small enough that visible cards fill in quickly,
+# large enough that a pack store (THUMB_STORE=pack) still batches its reads
+THUMB_BATCH_SIZE = 16
+
+
+class ThumbnailRequestQueue:
+    """Pending thumbnail paths, visible first"""
+
+    def __init__(self, batch_size: int = THUMB_BATCH_SIZE):
+        self.batch_size = batch_size
+        self.generation = 0
+        self._pending: dict[str, None] = {}  # Insertion-ordered set (grid order)
+        self._visible: set[str] = set()
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def reset(self, paths: Iterable[str]) -> int:
+        """
+        Replace the pending paths with a new grid
+
+        Args:
+            paths: Source paths in grid order
+
+        Returns:
+            New generation number
+        """
+        self.generation += 1
+        self._pending = dict.fromkeys(paths)
+        self._visible.clear()
+        return self.generation
+
+    def set_visible(self, paths: Iterable[str]):
+        """Mark the paths currently on screen (replaces the previous set)"""
+        self._visible = set(paths)
+
+    def next_batch(self) -> list[str]:
+        """
+        Take the next paths to load
+
+        Returns:
+            Up to batch_size pending paths, visible ones first (empty when done)
+        """
+        batch = [path for path in self._pending if path in self._visible][: self.batch_size]
+        if len(batch) < self.batch_size:
+            taken = set(batch)
+            for path in self._pending:
+                if len(batch) >= self.batch_size:
+                    break
+                if path not in taken:
+                    batch.append(path)
+
+        for path in batch:
+            del self._pending[path]
+        return batch
@@ -228,6 +228,10 @@ def closeEvent(self, event):
             except Exception as e:
                 logger.error(f"Failed to stop watcher on close: {e}")
 
+        # Let running thumbnail batches finish before their widgets go away
+        for grid in (self.images_grid, self.audio_grid, self.video_grid):
+            grid.thumb_loader.shutdown()
+
         self._save_window_state()
         event.accept()
 
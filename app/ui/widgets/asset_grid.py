@@ -2,11 +2,17 @@
 Asset Grid Widget - Grid/list view for assets
 
 STEP 5: Full implementation with database loading, thumbnails, and multi-select
+
+Cards are created with a placeholder and their thumbnails are loaded on a
+background thread pool (see app/ui/helpers/thumbnail_loader.py), cards on
+screen first, so refreshing a large grid never blocks the event loop. The
+near-duplicate filter runs its similarity lookup on the same pool.
 """
 
+import contextlib
 from pathlib import Path
 
-from PySide6.QtCore import Qt, Signal
+from PySide6.QtCore import QRect, QRunnable, Qt, QTimer, Signal
 from PySide6.QtGui import QPixmap
 from PySide6.QtWidgets import QGridLayout, QLabel, QMenu, QScrollArea, QVBoxLayout, QWidget
 from sqlmodel import Session, select
@@ -14,10 +20,40 @@
 from app.backend.models.entities import Asset, AssetType
 from app.core.db import get_engine
 from app.core.logging import get_logger
-from app.core.thumbnails import generate_thumbnail
+from app.core.phash import find_similar
+from app.ui.helpers.thumbnail_loader import ThumbnailLoader
 
 logger = get_logger(__name__)
 
+THUMB_GRID_SIZE = 128
+
+# Re-prioritize thumbnails this long after scrolling stops
+VISIBILITY_DEBOUNCE_MS = 50
+
+
+class _SimilarAssetsTask(QRunnable):
+    """Looks up near-duplicates off the UI thread (DB reads, first similarity index build)"""
+
+    def __init__(self, grid: "AssetGrid", generation: int, asset_id: int):
+        super().__init__()
+        self.grid = grid
+        self.generation = generation
+        self.asset_id = asset_id
+
+    def run(self):
+        """Query the asset and its matches and report back (queued to the grid's thread)"""
+        try:
+            with Session(get_engine()) as session:
+                query_asset = session.get(Asset, self.asset_id)
+            # The query asset first, then closest matches
+            assets = ([query_asset] if query_asset else []) + [a for a, _distance in find_similar(self.asset_id)]
+        except Exception as e:
+            logger.error(f"Failed to find assets similar to {self.asset_id}: {e}")
+            assets = []
+
+        with contextlib.suppress(RuntimeError):  # Grid deleted while the lookup ran
+            self.grid.similar_loaded.emit(self.generation, assets)
+
 
 class AssetCard(QWidget):
     """
@@ -49,19 +85,9 @@ def _init_ui(self):
         self.thumb_label.setScaledContents(True)
         self.thumb_label.setStyleSheet("border: 2px solid #444; border-radius: 4px;")
 
-        # Load thumbnail
-        try:
-            thumb_path = generate_thumbnail(self.asset.path, size=128)
-            pixmap = QPixmap(thumb_path)
-            if not pixmap.isNull():
-                self.thumb_label.setPixmap(pixmap)
-            else:
-                self.thumb_label.setText("?")
-                self.thumb_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
-        except Exception as e:
-            logger.error(f"Failed to load thumbnail for {self.asset.path}: {e}")
-            self.thumb_label.setText("?")
-            self.thumb_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        # Placeholder until the grid's loader delivers the thumbnail (set_thumbnail)
+        self.thumb_label.setText("…")
+        self.thumb_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
 
         layout.addWidget(self.thumb_label)
 
@@ -115,6 +141,15 @@ def _update_style(self):
             """
             )
 
+    def set_thumbnail(self, data: bytes):
+        """Show a loaded thumbnail (encoded image bytes)"""
+        pixmap = QPixmap()
+        if data and pixmap.loadFromData(data):
+            self.thumb_label.setPixmap(pixmap)
+        else:
+            logger.error(f"Failed to load thumbnail for {self.asset.path}")
+            self.thumb_label.setText("?")
+
     def set_selected(self, selected: bool):
         """Set selection state"""
         self.selected = selected
@@ -147,12 +182,26 @@ class AssetGrid(QWidget):
     """
 
     selection_changed = Signal(list)  # List of selected asset IDs
+    similar_loaded = Signal(int, object)  # Internal: (generation, assets) from _SimilarAssetsTask
 
     def __init__(self, asset_type: str = "image", parent=None):
         super().__init__(parent)
         self.asset_type = asset_type
         self.asset_cards: dict[int, AssetCard] = {}  # asset_id -> AssetCard
         self.selected_ids: set[int] = set()
+        self.similar_to: int | None = None  # Asset ID when filtered to near-duplicates
+        self._refresh_generation = 0  # Drops similarity results of an earlier refresh
+        self.similar_loaded.connect(self._on_similar_loaded)
+
+        # Background thumbnails, cards on screen first
+        self._cards_by_path: dict[str, list[AssetCard]] = {}
+        self.thumb_loader = ThumbnailLoader(THUMB_GRID_SIZE, parent=self)
+        self.thumb_loader.thumbnail_ready.connect(self._on_thumbnail_ready)
+        self._visibility_timer = QTimer(self)
+        self._visibility_timer.setSingleShot(True)
+        self._visibility_timer.setInterval(VISIBILITY_DEBOUNCE_MS)
+        self._visibility_timer.timeout.connect(self._update_visible_thumbnails)
+
         self._init_ui()
 
     def _init_ui(self):
@@ -165,6 +214,8 @@ def _init_ui(self):
         scroll.setWidgetResizable(True)
         scroll.setHorizontalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAsNeeded)
         scroll.setVerticalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAsNeeded)
+        scroll.verticalScrollBar().valueChanged.connect(self._visibility_timer.start)
+        self.scroll = scroll
 
         # Grid container
         self.grid_widget = QWidget()
@@ -185,6 +236,12 @@ def refresh(self):
         """Reload assets from database"""
         # Clear existing
         self.clear()
+        self._refresh_generation += 1
+
+        if self.similar_to is not None:
+            # Near-duplicate filter: cards are created once the lookup finishes (_on_similar_loaded)
+            self.thumb_loader.pool.start(_SimilarAssetsTask(self, self._refresh_generation, self.similar_to))
+            return
 
         # Load from DB
         engine = get_engine()
@@ -192,7 +249,10 @@ def refresh(self):
             with Session(engine) as session:
                 # Query assets by type
                 asset_type_enum = AssetType(self.asset_type.upper())
-                assets = session.exec(select(Asset).where(Asset.type == asset_type_enum)).all()
+                # Skip assets whose files were found missing by reconciliation
+                assets = session.exec(
+                    select(Asset).where(Asset.type == asset_type_enum, Asset.missing == False)  # noqa: E712
+                ).all()
 
                 logger.info(f"Loaded {len(assets)} {self.asset_type} assets from database")
 
@@ -212,9 +272,45 @@ def refresh(self):
 
                     self.asset_cards[asset.id] = card
 
+            self._load_thumbnails()
+
         except Exception as e:
             logger.error(f"Failed to load assets: {e}")
 
+    def _on_similar_loaded(self, generation: int, assets: list):
+        """Show the near-duplicates of the latest refresh"""
+        if generation != self._refresh_generation:
+            return
+        logger.info(f"Loaded {len(assets)} assets similar to {self.similar_to}")
+        self.load_assets(assets)
+
+    def _load_thumbnails(self):
+        """Start loading thumbnails for the current cards in the background"""
+        self._cards_by_path = {}
+        for card in self.asset_cards.values():
+            self._cards_by_path.setdefault(card.asset.path, []).append(card)
+        self.thumb_loader.load(list(self._cards_by_path))
+        self._visibility_timer.start()  # Once the layout has placed the cards
+
+    def _update_visible_thumbnails(self):
+        """Tell the loader which cards are on (or just below) the screen"""
+        viewport = self.scroll.viewport()
+        top = self.scroll.verticalScrollBar().value()
+        # Grid widget coordinates; half a screen of lookahead in the scroll direction
+        visible_rect = QRect(0, top, viewport.width(), viewport.height() + viewport.height() // 2)
+        visible = [card.asset.path for card in self.asset_cards.values() if card.geometry().intersects(visible_rect)]
+        self.thumb_loader.set_visible(visible)
+
+    def _on_thumbnail_ready(self, path: str, data: bytes):
+        """Swap a loaded thumbnail into its card(s)"""
+        for card in self._cards_by_path.get(path, []):
+            card.set_thumbnail(data)
+
+    def resizeEvent(self, event):  # noqa: N802
+        """Different cards are visible after a resize"""
+        super().resizeEvent(event)
+        self._visibility_timer.start()
+
     def _on_card_clicked(self, asset_id: int, modifiers: Qt.KeyboardModifiers):
         """Handle card click for multi-select"""
         if modifiers & Qt.KeyboardModifier.ControlModifier:
@@ -260,6 +356,11 @@ def _on_context_menu(self, asset_id: int, pos):
         menu.addAction("Tag...", lambda: self._tag_selected())
         menu.addAction("Move...", lambda: self._move_selected())
         menu.addAction("Rename...", lambda: self._rename_selected())
+        menu.addSeparator()
+        if self.asset_type == "image" and len(self.selected_ids) == 1:
+            menu.addAction("Show Similar", lambda: self.show_similar(asset_id))
+        if self.similar_to is not None:
+            menu.addAction("Show All", lambda: self.show_similar(None))
 
         menu.exec(pos)
 
@@ -287,6 +388,17 @@ def _rename_selected(self):
         if len(self.selected_ids) == 1:
             logger.info(f"Rename action triggered for asset {list(self.selected_ids)[0]}")
 
+    def show_similar(self, asset_id: int | None):
+        """
+        Filter the grid to near-duplicates of an asset
+
+        Args:
+            asset_id: Asset to compare against, or None to show all assets again
+        """
+        self.similar_to = asset_id
+        self.refresh()
+        self.selection_changed.emit([])
+
     def get_selected_ids(self) -> list[int]:
         """Get list of selected asset IDs"""
         return list(self.selected_ids)
@@ -307,6 +419,8 @@ def clear(self):
             if item.widget():
                 item.widget().deleteLater()
 
+        self.thumb_loader.cancel()
+        self._cards_by_path = {}
         self.asset_cards.clear()
         self.selected_ids.clear()
 
@@ -332,3 +446,5 @@ def load_assets(self, assets: list[Asset]):
             self.grid_layout.addWidget(card, row, col)
 
             self.asset_cards[asset.id] = card
+
+        self._load_thumbnails()
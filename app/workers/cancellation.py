@@ -0,0 +1,148 @@
+"""
+Job Cancellation
+
+Cooperative cancellation tokens and wall-clock deadlines for running jobs
+
+The queue creates one CancellationToken per running job and passes it to
+the job function (as `token=`). Job functions call token.check() between
+stages and run external tools through run_subprocess(), which kills the
+child process as soon as the job is cancelled or its deadline passes.
+"""
+
+import subprocess
+import threading
+import time
+from collections.abc import Sequence
+
+from app.core.logging import get_logger
+
+logger = get_logger(__name__)
+
+# How often blocking waits re-check the token
+POLL_INTERVAL_SEC = 0.2
+
+# Grace period between terminate() and kill() for external tools
+KILL_GRACE_SEC = 3.0
+
+
+class JobCancelledError(Exception):
+    """Raised inside a job when it was cancelled"""
+
+
+class JobTimeoutError(JobCancelledError):
+    """Raised inside a job when it ran past its deadline"""
+
+
+class CancellationToken:
+    """
+    Cancellation flag shared between the queue and one running job
+
+    Thread-safe. The deadline is checked lazily by check()/wait(), so no
+    timer thread is needed per job.
+    """
+
+    def __init__(self, timeout_sec: float | None = None):
+        self._event = threading.Event()
+        self.reason: str | None = None
+        self.timeout_sec = timeout_sec
+        self.deadline = time.monotonic() + timeout_sec if timeout_sec else None
+
+    def cancel(self, reason: str = "cancelled"):
+        """Request cancellation (idempotent; first reason wins)"""
+        if not self._event.is_set():
+            self.reason = reason
+            self._event.set()
+
+    @property
+    def expired(self) -> bool:
+        """True once the deadline has passed"""
+        return self.deadline is not None and time.monotonic() >= self.deadline
+
+    @property
+    def cancelled(self) -> bool:
+        """True if cancelled or timed out"""
+        if not self._event.is_set() and self.expired:
+            self.cancel("timeout")
+        return self._event.is_set()
+
+    def remaining(self) -> float | None:
+        """Seconds until the deadline (None if no deadline)"""
+        if self.deadline is None:
+            return None
+        return max(0.0, self.deadline - time.monotonic())
+
+    def check(self):
+        """
+        Raise if the job should stop
+
+        Raises:
+            JobTimeoutError: Deadline passed
+            JobCancelledError: Cancelled by the user
+        """
+        if not self.cancelled:
+            return
+        if self.reason == "timeout":
+            raise JobTimeoutError(f"Job exceeded its {self.timeout_sec:.0f}s time limit")
+        raise JobCancelledError(f"Job {self.reason}")
+
+    def wait(self, timeout: float) -> bool:
+        """Sleep up to `timeout` seconds, waking early on cancellation; returns cancelled"""
+        remaining = self.remaining()
+        if remaining is not None:
+            timeout = min(timeout, remaining)
+        self._event.wait(timeout)
+        return self.cancelled
+
+
+def run_subprocess(
+    cmd: Sequence[str],
+    token: CancellationToken | None = None,
+    timeout: float | None = None,
+) -> subprocess.CompletedProcess:
+    """
+    Run an external tool, killing it when the job is cancelled
+
+    Args:
+        cmd: Command line
+        token: Cancellation token of the calling job (None = not cancellable)
+        timeout: Per-call limit in seconds, on top of the job's deadline
+
+    Returns:
+        CompletedProcess with text stdout/stderr
+
+    Raises:
+        JobCancelledError: Job was cancelled or timed out (process killed)
+        subprocess.TimeoutExpired: `timeout` elapsed (process killed)
+    """
+    started = time.monotonic()
+    process = subprocess.Popen(
+        cmd,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        text=True,
+        creationflags=getattr(subprocess, "CREATE_NO_WINDOW", 0),
+    )
+    while True:
+        try:
+            stdout, stderr = process.communicate(timeout=POLL_INTERVAL_SEC)
+            return subprocess.CompletedProcess(cmd, process.returncode, stdout, stderr)
+        except subprocess.TimeoutExpired:
+            pass
+
+        if token is not None and token.cancelled:
+            _kill(process)
+            logger.info(f"Killed {cmd[0]} (pid {process.pid}): job {token.reason}")
+            token.check()
+        if timeout is not None and time.monotonic() - started > timeout:
+            _kill(process)
+            raise subprocess.TimeoutExpired(cmd, timeout)
+
+
+def _kill(process: subprocess.Popen):
+    """Terminate a child process, escalating to kill if it ignores SIGTERM"""
+    process.terminate()
+    try:
+        process.communicate(timeout=KILL_GRACE_SEC)
+    except subprocess.TimeoutExpired:
+        process.kill()
+        process.communicate()
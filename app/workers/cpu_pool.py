@@ -0,0 +1,227 @@
+"""
+CPU Worker Pool
+
+Runs CPU-bound job steps in worker processes when WORKER_BACKEND=processpool
+
+Job functions keep running on the queue's threads and own every database
+update (status, progress, results); only the pure compute step (rembg
+inference, waveform rendering) is shipped to a process via run_cpu_bound().
+Functions sent to the pool must be module-level, take and return picklable
+values (paths as str) and never touch the database. Worker processes are
+long-lived, so models cached at module level stay warm between jobs.
+
+Cancellation and time limits are enforced here: a step still running when
+its job is cancelled or times out is stopped by terminating the pool's
+worker processes (ProcessPoolExecutor cannot stop a single task). The job
+is only reported as stopped once they have exited. Steps of other jobs that
+lose their worker this way are submitted again to the fresh pool.
+
+With the threadpool backend a step runs in the job thread and cannot be
+interrupted: the job stops at its next token check after the step returns,
+holding its slot until then.
+"""
+
+import multiprocessing
+import threading
+from collections.abc import Callable, Iterator
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, TypeVar
+
+from app.core.config import settings
+from app.core.logging import get_logger
+from app.workers.cancellation import KILL_GRACE_SEC, POLL_INTERVAL_SEC, CancellationToken
+
+logger = get_logger(__name__)
+
+T = TypeVar("T")
+
+# Global process pool instance
+_executor: ProcessPoolExecutor | None = None
+_executor_lock = threading.Lock()
+
+
+def uses_process_pool() -> bool:
+    """True when CPU-bound steps should run in worker processes"""
+    return settings.worker_backend == "processpool"
+
+
+def get_cpu_executor() -> ProcessPoolExecutor:
+    """Get or create the global CPU process pool"""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            # spawn: forking while job/ingest threads hold locks can deadlock the child
+            _executor = ProcessPoolExecutor(
+                max_workers=max(1, settings.worker_processes), mp_context=multiprocessing.get_context("spawn")
+            )
+            logger.info(f"Initialized CPU worker pool with {settings.worker_processes} processes")
+        return _executor
+
+
+def shutdown_cpu_executor():
+    """Shutdown the CPU process pool (for testing/cleanup)"""
+    global _executor
+    with _executor_lock:
+        if _executor:
+            _executor.shutdown(wait=True)
+            _executor = None
+            logger.info("CPU worker pool shutdown")
+
+
+def recycle_cpu_executor(executor: ProcessPoolExecutor, reason: str):
+    """
+    Terminate a pool's worker processes and replace the pool on next use
+
+    Returns once the processes have exited, so the abandoned steps no longer
+    use CPU or memory. Other steps running in the pool fail with
+    BrokenProcessPool (run_cpu_bound()/map_cpu_bound() submit them again).
+
+    Args:
+        executor: Pool running the step to stop
+        reason: Logged cause (e.g. "job 12 timeout")
+    """
+    global _executor
+    with _executor_lock:
+        if _executor is executor:
+            _executor = None
+
+    # No public API to stop workers before Python 3.14 (terminate_workers)
+    processes = list((executor._processes or {}).values())
+    for process in processes:
+        process.terminate()
+    for process in processes:
+        process.join(KILL_GRACE_SEC)
+        if process.is_alive():
+            process.kill()
+            process.join()
+    executor.shutdown(wait=False, cancel_futures=True)
+    logger.warning(f"Recycled CPU worker pool ({len(processes)} processes terminated): {reason}")
+
+
+def _stop_step(future: Future, executor: ProcessPoolExecutor, token: CancellationToken):
+    """Drop a queued step, or kill the workers if it is already running"""
+    if not future.cancel():
+        recycle_cpu_executor(executor, f"job {token.reason}")
+
+
+def run_cpu_bound(func: Callable[..., T], *args: Any, token: CancellationToken | None = None) -> T:
+    """
+    Run a CPU-bound function, in a worker process if the backend allows
+
+    Blocks the calling job thread until the result is ready; exceptions
+    raised in the worker are re-raised here. With a token, the wait ends as
+    soon as the job is cancelled or times out: a step still queued is
+    dropped, one already running is stopped by recycling the pool.
+
+    Args:
+        func: Module-level function (must be importable by the worker)
+        *args: Picklable arguments
+        token: Cancellation token of the calling job
+
+    Returns:
+        The function's return value
+
+    Raises:
+        JobCancelledError: Job was cancelled or timed out (its step has stopped)
+        BrokenProcessPool: The worker died twice (e.g. crashed on this input)
+    """
+    if token is not None:
+        token.check()
+    if not uses_process_pool():
+        return func(*args)
+
+    retried = False
+    while True:
+        executor = get_cpu_executor()
+        future = executor.submit(func, *args)
+        try:
+            while True:
+                try:
+                    return future.result(timeout=POLL_INTERVAL_SEC)
+                except FutureTimeoutError:
+                    if token is not None and token.cancelled:
+                        _stop_step(future, executor, token)
+                        token.check()
+        except BrokenProcessPool:
+            # Pool recycled to stop another job's step (or a worker crashed): run again once
+            if token is not None:
+                token.check()
+            if retried:
+                raise
+            retried = True
+            logger.warning(f"CPU worker lost while running {func.__name__}; retrying on a fresh pool")
+
+
+def map_cpu_bound(
+    func: Callable[..., T],
+    items: list[tuple],
+    token: CancellationToken | None = None,
+    max_inflight: int | None = None,
+) -> Iterator[tuple[int, T | None, Exception | None]]:
+    """
+    Run a CPU-bound function over many argument tuples
+
+    With the processpool backend every worker process takes items (keeping
+    its own warm model), with at most `max_inflight` submitted at a time;
+    otherwise items run one after another in the calling thread. Results
+    are yielded as they complete, so the caller can report progress.
+
+    Args:
+        func: Module-level function (must be importable by the worker)
+        items: Argument tuples, one per call
+        token: Cancellation token of the calling job
+        max_inflight: Items submitted ahead (default: 2 per worker process)
+
+    Yields:
+        (index into items, result or None, exception or None)
+
+    Raises:
+        JobCancelledError: Job was cancelled or timed out (queued items are
+            dropped, running ones stopped by recycling the pool)
+    """
+    if not uses_process_pool():
+        for index, args in enumerate(items):
+            if token is not None:
+                token.check()
+            try:
+                yield index, func(*args), None
+            except Exception as e:
+                yield index, None, e
+        return
+
+    max_inflight = max_inflight or max(1, settings.worker_processes) * 2
+    pending: dict[Future, int] = {}
+    executors: dict[Future, ProcessPoolExecutor] = {}
+    retry: list[int] = []  # Items whose worker was lost to a pool recycle
+    retried: set[int] = set()
+    next_index = 0
+    while next_index < len(items) or pending or retry:
+        while (retry or next_index < len(items)) and len(pending) < max_inflight:
+            if retry:
+                index = retry.pop()
+            else:
+                index = next_index
+                next_index += 1
+            executor = get_cpu_executor()
+            future = executor.submit(func, *items[index])
+            pending[future] = index
+            executors[future] = executor
+
+        done, _ = wait(pending, timeout=POLL_INTERVAL_SEC, return_when=FIRST_COMPLETED)
+        if token is not None and token.cancelled:
+            running = {executors[future] for future in pending if not future.cancel()}
+            for executor in running:
+                recycle_cpu_executor(executor, f"job {token.reason}")
+            token.check()
+
+        for future in done:
+            index = pending.pop(future)
+            executors.pop(future)
+            error = future.exception()
+            if isinstance(error, BrokenProcessPool) and index not in retried:
+                retried.add(index)
+                retry.append(index)
+                continue
+            yield index, None if error else future.result(), error
@@ -0,0 +1,69 @@
+"""
+Job Event Log
+
+In-memory feed of job state transitions for streaming clients
+
+The queue publishes every transition it makes (enqueued, claimed, finished,
+cancelled, re-queued) with a sequence number. Readers such as the SSE
+endpoint keep the last sequence they saw and ask for newer events, so any
+number of clients can follow all jobs without querying SQLite. Only the
+most recent MAX_EVENTS are kept; a reader that falls further behind is told
+to resync from the database.
+"""
+
+import threading
+from collections import deque
+from typing import Any
+
+# Transitions kept for readers that poll (a few minutes of heavy batch work)
+MAX_EVENTS = 10000
+
+
+class JobEventLog:
+    """
+    Thread-safe ring buffer of job state changes
+
+    Events are dicts with at least "seq", "id" and "status".
+    """
+
+    def __init__(self, max_events: int = MAX_EVENTS):
+        self._lock = threading.Lock()
+        self._events: deque[dict[str, Any]] = deque(maxlen=max_events)
+        self._seq = 0
+
+    @property
+    def seq(self) -> int:
+        """Sequence number of the newest event"""
+        return self._seq
+
+    def publish(self, job_id: int, status: str, **fields: Any) -> int:
+        """
+        Record a transition
+
+        Args:
+            job_id: Job ID
+            status: New JobStatus value
+            **fields: Extra state (kind, progress, result_path, error_message, ...)
+
+        Returns:
+            Sequence number of the event
+        """
+        with self._lock:
+            self._seq += 1
+            self._events.append({"seq": self._seq, "id": job_id, "status": status, **fields})
+            return self._seq
+
+    def since(self, seq: int) -> tuple[int, list[dict[str, Any]], bool]:
+        """
+        Events newer than `seq`
+
+        Returns:
+            (newest seq, events in order, complete) - complete is False if
+            older events were already dropped and the reader must resync
+        """
+        with self._lock:
+            if not self._events or seq >= self._seq:
+                return self._seq, [], True
+            oldest = self._events[0]["seq"]
+            events = [event for event in self._events if event["seq"] > seq]
+            return self._seq, events, seq >= oldest - 1
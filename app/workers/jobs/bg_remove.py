@@ -5,31 +5,105 @@
 
 Uses rembg with U2Net model for background removal.
 Outputs to Work/edits/ with _nobg suffix.
+
+The inference step (remove_background) runs via run_cpu_bound(), i.e. in a
+worker process when WORKER_BACKEND=processpool. Each process keeps its rembg
+session loaded, so only the first job per process pays the model load.
+run_bg_remove_batch() streams a whole selection through those sessions as
+one job with shared progress and per-image results.
+
+Outputs are cached by content hash, model and rembg version (see
+app.core.artifacts), so repeating the job on the same image is instant.
 """
 
+import json
+import threading
 from pathlib import Path
+from typing import Any
 
 from PIL import Image
-from rembg import remove
-from sqlmodel import Session
+from sqlmodel import Session, select
 
-from app.backend.models.entities import Asset, Job
+from app.backend.models.entities import Asset, Job, JobKind
+from app.core.artifacts import artifact_key, artifact_output_path, lookup_artifact, package_version, store_artifact
+from app.core.config import settings
 from app.core.db import get_engine
+from app.core.dedup import find_reusable_output
 from app.core.logging import get_logger
-from app.workers.queue import update_job_progress
+from app.workers.cancellation import CancellationToken
+from app.workers.cpu_pool import map_cpu_bound, run_cpu_bound
+from app.workers.queue import set_job_results, update_job_progress
+from app.workers.scheduler import job_timeout
 
 logger = get_logger(__name__)
 
 # Output directory for edited assets
 WORK_DIR = Path("Work/edits")
 
+# Extra time limit per image of a batch job, on top of the BG_REMOVE limit
+BATCH_ITEM_TIMEOUT_SEC = 30
+
+# rembg sessions loaded in this process (model name -> session)
+_sessions: dict[str, Any] = {}
+_sessions_lock = threading.Lock()
+
+
+def _get_session(model_name: str):
+    """Load a rembg model once per process"""
+    with _sessions_lock:
+        if model_name not in _sessions:
+            # rembg + ONNX runtime imported on first use, not at server startup
+            from rembg import new_session
+
+            logger.info(f"Loading rembg model: {model_name}")
+            _sessions[model_name] = new_session(model_name)
+        return _sessions[model_name]
+
+
+def _tool_version() -> str:
+    """Producer of cut-outs, part of the artifact cache key"""
+    return f"rembg {package_version('rembg')}"
+
+
+def _artifact_key(content_hash: str) -> str:
+    """Cache key of the cut-out of this content with the configured model"""
+    return artifact_key(content_hash, JobKind.BG_REMOVE, None, {"model": settings.bg_remove_model}, _tool_version())
 
-def run_bg_remove_job(job_id: int) -> Path | None:
+
+def _store(key: str, content_hash: str, output_path: Path):
+    """Record a new cut-out in the artifact cache"""
+    store_artifact(key, content_hash, JobKind.BG_REMOVE, None, _tool_version(), output_path)
+
+
+def remove_background(input_path: str, output_path: str, model_name: str) -> str:
+    """
+    Remove the background of one image and save it as PNG
+
+    Pure compute step: safe to run in a worker process (no database access).
+
+    Args:
+        input_path: Source image
+        output_path: Destination PNG
+        model_name: rembg model (u2net, u2netp, u2net_human_seg)
+
+    Returns:
+        output_path
+    """
+    from rembg import remove
+
+    with Image.open(input_path) as input_image:
+        output_image = remove(input_image, session=_get_session(model_name))
+    output_image.save(output_path, "PNG")
+    return output_path
+
+
+def run_bg_remove_job(job_id: int, token: CancellationToken | None = None) -> Path | None:
     """
     Execute background removal job
 
     Args:
         job_id: Job ID from database
+        token: Cancellation token (checked before and after inference)
 
     Returns:
         Path to output file, or None if failed
@@ -61,33 +135,31 @@ def run_bg_remove_job(job_id: int) -> Path | None:
             input_path = Path(asset.path)
             if not input_path.exists():
                 raise FileNotFoundError(f"Input file not found: {input_path}")
+            asset_id = asset.id
+            content_hash = asset.hash
+
+        # Reuse the output already produced for identical content
+        key = _artifact_key(content_hash) if content_hash else None
+        reused = lookup_artifact(key) if key else find_reusable_output(asset_id, JobKind.BG_REMOVE)
+        if reused:
+            logger.info(f"[Job {job_id}] Reusing output of identical content: {reused}")
+            update_job_progress(job_id, 1.0)
+            return reused
 
         update_job_progress(job_id, 0.1)
 
-        # Load input image
-        logger.info(f"[Job {job_id}] Loading image: {input_path}")
-        input_image = Image.open(input_path)
+        # Cached outputs are named by key; unhashed assets fall back to a free name
+        if key:
+            output_path = artifact_output_path(WORK_DIR, input_path.stem, "nobg", key, ".png")
+        else:
+            output_path = _next_output_path(input_path, set())
         update_job_progress(job_id, 0.2)
 
-        # Run background removal
-        logger.info(f"[Job {job_id}] Running rembg background removal...")
-        output_image = remove(input_image)
-        update_job_progress(job_id, 0.8)
-
-        # Generate output path
-        output_filename = f"{input_path.stem}_nobg.png"
-        output_path = WORK_DIR / output_filename
-
-        # Handle collisions
-        counter = 1
-        while output_path.exists():
-            output_filename = f"{input_path.stem}_nobg_{counter}.png"
-            output_path = WORK_DIR / output_filename
-            counter += 1
-
-        # Save output
-        logger.info(f"[Job {job_id}] Saving output: {output_path}")
-        output_image.save(output_path, "PNG")
+        # Run background removal and save (in a worker process with the processpool backend)
+        logger.info(f"[Job {job_id}] Running rembg background removal: {input_path} -> {output_path}")
+        run_cpu_bound(remove_background, str(input_path), str(output_path), settings.bg_remove_model, token=token)
+        if key:
+            _store(key, content_hash, output_path)
         update_job_progress(job_id, 1.0)
 
         logger.info(f"[Job {job_id}] Background removal complete: {output_path}")
@@ -98,34 +170,129 @@ def run_bg_remove_job(job_id: int) -> Path | None:
         raise
 
 
-def run_bg_remove_batch(job_id: int, asset_ids: list[int]) -> list[Path]:
+def batch_timeout(count: int) -> int:
+    """Time limit for a batch job of `count` images"""
+    return job_timeout(JobKind.BG_REMOVE) + BATCH_ITEM_TIMEOUT_SEC * count
+
+
+def _next_output_path(input_path: Path, reserved: set[Path]) -> Path:
+    """Free {stem}_nobg[_n].png in WORK_DIR, also avoiding names reserved by this batch"""
+    output_path = WORK_DIR / f"{input_path.stem}_nobg.png"
+    counter = 1
+    while output_path.exists() or output_path in reserved:
+        output_path = WORK_DIR / f"{input_path.stem}_nobg_{counter}.png"
+        counter += 1
+    reserved.add(output_path)
+    return output_path
+
+
+def run_bg_remove_batch(
+    job_id: int, asset_ids: list[int] | None = None, token: CancellationToken | None = None
+) -> Path | None:
     """
     Execute batch background removal job
 
+    Streams all images through warm rembg sessions (one per worker process,
+    or one in this process with the threadpool backend) instead of paying
+    the model load per image. Identical content is processed once.
+
     Args:
         job_id: Job ID from database
-        asset_ids: List of asset IDs to process
+        asset_ids: List of asset IDs to process (default: params["asset_ids"])
+        token: Cancellation token (checked between images)
 
     Returns:
-        List of output file paths
+        Output directory; per-item results are stored with set_job_results()
+        as {"asset_id", "status": "done" | "reused" | "failed", "output" | "error"}
 
-    TODO: Implement batch processing with shared progress
+    Raises:
+        RuntimeError: No image could be processed
     """
+    engine = get_engine()
+    if asset_ids is None:
+        with Session(engine) as session:
+            job = session.get(Job, job_id)
+            params = json.loads(job.params_json) if job and job.params_json else {}
+        asset_ids = params.get("asset_ids", [])
+    asset_ids = list(dict.fromkeys(asset_ids))
     logger.info(f"[Job {job_id}] Starting batch background removal for {len(asset_ids)} assets")
-
-    output_paths = []
-    for idx, asset_id in enumerate(asset_ids):
-        try:
-            # Process each asset (reuse single asset logic)
-            # Update overall progress based on batch position
-            progress = (idx + 1) / len(asset_ids)
-            update_job_progress(job_id, progress)
-
-            # Note: This is simplified - ideally we'd create sub-jobs
-            logger.warning(f"Batch processing not fully implemented - processing asset {asset_id}")
-
-        except Exception as e:
-            logger.error(f"[Job {job_id}] Failed to process asset {asset_id}: {e}")
+    if not asset_ids:
+        raise ValueError("Batch has no assets")
+
+    WORK_DIR.mkdir(parents=True, exist_ok=True)
+
+    # Validate all assets with one query
+    with Session(engine) as session:
+        assets = {asset.id: asset for asset in session.exec(select(Asset).where(Asset.id.in_(asset_ids))).all()}
+
+    results: dict[int, dict[str, Any]] = {}
+    todo: list[int] = []
+    todo_keys: list[str | None] = []
+    work: list[tuple[str, str, str]] = []
+    first_by_hash: dict[str, int] = {}
+    same_content: dict[int, int] = {}  # asset_id -> asset processed for the same hash
+    reserved: set[Path] = set()
+
+    for asset_id in asset_ids:
+        asset = assets.get(asset_id)
+        if asset is None:
+            results[asset_id] = {"asset_id": asset_id, "status": "failed", "error": "Asset not found"}
+            continue
+        input_path = Path(asset.path)
+        if not input_path.exists():
+            results[asset_id] = {
+                "asset_id": asset_id,
+                "status": "failed",
+                "error": f"Input file not found: {input_path}",
+            }
             continue
 
-    return output_paths
+        if asset.hash and asset.hash in first_by_hash:
+            same_content[asset_id] = first_by_hash[asset.hash]
+            continue
+        key = _artifact_key(asset.hash) if asset.hash else None
+        reused = lookup_artifact(key) if key else find_reusable_output(asset_id, JobKind.BG_REMOVE)
+        if reused:
+            results[asset_id] = {"asset_id": asset_id, "status": "reused", "output": str(reused)}
+            continue
+        if asset.hash:
+            first_by_hash[asset.hash] = asset_id
+
+        if key:
+            output_path = artifact_output_path(WORK_DIR, input_path.stem, "nobg", key, ".png")
+        else:
+            output_path = _next_output_path(input_path, reserved)
+        todo.append(asset_id)
+        todo_keys.append(key)
+        work.append((str(input_path), str(output_path), settings.bg_remove_model))
+
+    total = len(asset_ids)
+    finished = len(results) + len(same_content)
+    update_job_progress(job_id, finished / total)
+
+    for index, output, error in map_cpu_bound(remove_background, work, token=token):
+        asset_id = todo[index]
+        if error is None:
+            results[asset_id] = {"asset_id": asset_id, "status": "done", "output": output}
+            if todo_keys[index]:
+                _store(todo_keys[index], assets[asset_id].hash, Path(output))
+        else:
+            logger.error(f"[Job {job_id}] Failed to process asset {asset_id}: {error}")
+            results[asset_id] = {"asset_id": asset_id, "status": "failed", "error": str(error)}
+        finished += 1
+        update_job_progress(job_id, finished / total)
+
+    for asset_id, source_id in same_content.items():
+        source = results[source_id]
+        results[asset_id] = {**source, "asset_id": asset_id}
+        if source["status"] == "done":
+            results[asset_id]["status"] = "reused"
+
+    ordered = [results[asset_id] for asset_id in asset_ids]
+    set_job_results(job_id, ordered)
+
+    failed = sum(1 for result in ordered if result["status"] == "failed")
+    logger.info(f"[Job {job_id}] Batch background removal complete: {total - failed}/{total} succeeded")
+    if failed == total:
+        raise RuntimeError(f"All {total} images failed")
+    return WORK_DIR
@@ -5,20 +5,30 @@
 
 - Video: Extract poster frame using ffmpeg
 - Audio: Generate waveform PNG (audiowaveform or matplotlib fallback)
+- Grid thumbnails: pre-render the WebP pyramid of images/videos (one decode)
+
+Waveform decoding/rendering and image pyramids are CPU-bound and go through
+run_cpu_bound(); ffmpeg already runs out of process, so video work stays on
+the job thread where cancellation can kill it.
+
+Outputs are cached by content hash and render settings (see
+app.core.artifacts); bump the *_VERSION constants when rendering changes.
 """
 
-import subprocess
 from pathlib import Path
 
-import numpy as np
 from PIL import Image, ImageDraw
-from pydub import AudioSegment
 from sqlmodel import Session
 
-from app.backend.models.entities import Asset, Job
+from app.backend.models.entities import Asset, AssetType, Job, JobKind
+from app.core.artifacts import artifact_key, artifact_output_path, lookup_artifact, store_artifact
 from app.core.db import get_engine
+from app.core.dedup import find_reusable_output
 from app.core.logging import get_logger
-from app.workers.queue import update_job_progress
+from app.core.thumbnails import generate_thumbnail_pyramid, pack_thumbnail_pyramid, use_thumbnail_pack
+from app.workers.cancellation import CancellationToken, run_subprocess
+from app.workers.cpu_pool import run_cpu_bound
+from app.workers.queue import set_job_results, update_job_progress
 
 logger = get_logger(__name__)
 
@@ -26,13 +36,77 @@
 VIDEO_POSTERS_DIR = Path("Work/posters")
 AUDIO_WAVEFORMS_DIR = Path("Work/waveforms")
 
+# Render settings and versions making up the artifact cache key
+POSTER_PARAMS = {"seek": "00:00:01", "quality": 2}
+POSTER_VERSION = "ffmpeg-poster 1"
+WAVEFORM_PARAMS = {"width": 800, "height": 200}
+WAVEFORM_VERSION = "waveform 1"
+
+
+def run_thumbnail_pyramid_job(job_id: int, token: CancellationToken | None = None) -> Path | None:
+    """
+    Pre-render the grid thumbnail pyramid of an image or video asset
+
+    Args:
+        job_id: Job ID from database
+        token: Cancellation token (checked before decoding; kills ffmpeg for videos)
 
-def run_video_poster_job(job_id: int) -> Path | None:
+    Returns:
+        Path to the largest level; every level is stored with set_job_results()
+        as {"size", "output"}. With THUMB_STORE=pack the levels go into the
+        pack, are recorded as {"size", "key"} and None is returned.
+    """
+    logger.info(f"[Job {job_id}] Starting thumbnail pyramid generation")
+
+    engine = get_engine()
+    with Session(engine) as session:
+        job = session.get(Job, job_id)
+        if not job or not job.asset_id:
+            raise ValueError("Job has no associated asset")
+
+        asset = session.get(Asset, job.asset_id)
+        if not asset:
+            raise ValueError(f"Asset {job.asset_id} not found")
+        if asset.type not in (AssetType.IMAGE, AssetType.VIDEO):
+            raise ValueError(f"Asset {asset.id} is {asset.type.value}; only images and videos have thumbnails")
+
+        input_path = Path(asset.path)
+        if not input_path.exists():
+            raise FileNotFoundError(f"Input file not found: {input_path}")
+        asset_type = asset.type
+
+    update_job_progress(job_id, 0.1)
+    if use_thumbnail_pack():
+        keys = _render_pyramid(pack_thumbnail_pyramid, input_path, asset_type, token)
+        set_job_results(job_id, [{"size": size, "key": key} for size, key in sorted(keys.items())])
+        update_job_progress(job_id, 1.0)
+        logger.info(f"[Job {job_id}] Thumbnail pyramid packed: {len(keys)} levels")
+        return None
+
+    levels = _render_pyramid(generate_thumbnail_pyramid, input_path, asset_type, token)
+    set_job_results(job_id, [{"size": size, "output": str(path)} for size, path in sorted(levels.items())])
+    update_job_progress(job_id, 1.0)
+
+    logger.info(f"[Job {job_id}] Thumbnail pyramid complete: {len(levels)} levels")
+    return levels[max(levels)]
+
+
+def _render_pyramid(render, input_path: Path, asset_type: AssetType, token: CancellationToken | None):
+    """Decode images on the CPU pool; videos are decoded by ffmpeg, which the token can kill"""
+    if asset_type == AssetType.VIDEO:
+        if token is not None:
+            token.check()
+        return render(input_path, asset_type, token)
+    return run_cpu_bound(render, input_path, asset_type, token=token)
+
+
+def run_video_poster_job(job_id: int, token: CancellationToken | None = None) -> Path | None:
     """
     Generate video poster frame using ffmpeg
 
     Args:
         job_id: Job ID from database
+        token: Cancellation token (kills ffmpeg when tripped)
 
     Returns:
         Path to output poster image
@@ -61,45 +135,64 @@ def run_video_poster_job(job_id: int) -> Path | None:
             input_path = Path(asset.path)
             if not input_path.exists():
                 raise FileNotFoundError(f"Input file not found: {input_path}")
+            asset_id = asset.id
+            content_hash = asset.hash
+
+        # Reuse the poster already extracted from identical content
+        key = (
+            artifact_key(content_hash, JobKind.THUMBNAIL, "video_poster", POSTER_PARAMS, POSTER_VERSION)
+            if content_hash
+            else None
+        )
+        reused = (
+            lookup_artifact(key) if key else find_reusable_output(asset_id, JobKind.THUMBNAIL, variant="video_poster")
+        )
+        if reused:
+            logger.info(f"[Job {job_id}] Reusing poster of identical content: {reused}")
+            update_job_progress(job_id, 1.0)
+            return reused
 
         update_job_progress(job_id, 0.2)
 
-        # Generate output path
-        output_filename = f"{input_path.stem}_poster.jpg"
-        output_path = VIDEO_POSTERS_DIR / output_filename
-
-        # Handle collisions
-        counter = 1
-        while output_path.exists():
-            output_filename = f"{input_path.stem}_poster_{counter}.jpg"
+        # Generate output path (named by cache key; free name for unhashed assets)
+        if key:
+            output_path = artifact_output_path(VIDEO_POSTERS_DIR, input_path.stem, "poster", key, ".jpg")
+        else:
+            output_filename = f"{input_path.stem}_poster.jpg"
             output_path = VIDEO_POSTERS_DIR / output_filename
-            counter += 1
+
+            # Handle collisions
+            counter = 1
+            while output_path.exists():
+                output_filename = f"{input_path.stem}_poster_{counter}.jpg"
+                output_path = VIDEO_POSTERS_DIR / output_filename
+                counter += 1
 
         # Extract frame using ffmpeg
         logger.info(f"[Job {job_id}] Extracting poster frame from: {input_path}")
         cmd = [
             "ffmpeg",
             "-ss",
-            "00:00:01",  # Seek to 1 second
+            POSTER_PARAMS["seek"],  # Seek to 1 second
             "-i",
             str(input_path),
             "-vframes",
             "1",  # Extract 1 frame
             "-q:v",
-            "2",  # Quality (2 is high)
+            str(POSTER_PARAMS["quality"]),  # Quality (2 is high)
             "-y",  # Overwrite
             str(output_path),
         ]
 
-        result = subprocess.run(
-            cmd, capture_output=True, text=True, timeout=30, creationflags=subprocess.CREATE_NO_WINDOW
-        )
+        result = run_subprocess(cmd, token, timeout=30)
 
         if result.returncode != 0:
             logger.warning(f"[Job {job_id}] ffmpeg stderr: {result.stderr}")
             if not output_path.exists():
                 raise RuntimeError(f"ffmpeg failed: {result.stderr}")
 
+        if key:
+            store_artifact(key, content_hash, JobKind.THUMBNAIL, "video_poster", POSTER_VERSION, output_path)
         update_job_progress(job_id, 1.0)
         logger.info(f"[Job {job_id}] Video poster complete: {output_path}")
         return output_path
@@ -109,12 +202,13 @@ def run_video_poster_job(job_id: int) -> Path | None:
         raise
 
 
-def run_audio_waveform_job(job_id: int) -> Path | None:
+def run_audio_waveform_job(job_id: int, token: CancellationToken | None = None) -> Path | None:
     """
     Generate audio waveform PNG
 
     Args:
         job_id: Job ID from database
+        token: Cancellation token (checked before rendering)
 
     Returns:
         Path to output waveform image
@@ -147,74 +241,56 @@ def run_audio_waveform_job(job_id: int) -> Path | None:
             input_path = Path(asset.path)
             if not input_path.exists():
                 raise FileNotFoundError(f"Input file not found: {input_path}")
+            asset_id = asset.id
+            content_hash = asset.hash
+
+        # Reuse the waveform already rendered for identical content
+        key = (
+            artifact_key(content_hash, JobKind.THUMBNAIL, "audio_waveform", WAVEFORM_PARAMS, WAVEFORM_VERSION)
+            if content_hash
+            else None
+        )
+        reused = (
+            lookup_artifact(key) if key else find_reusable_output(asset_id, JobKind.THUMBNAIL, variant="audio_waveform")
+        )
+        if reused:
+            logger.info(f"[Job {job_id}] Reusing waveform of identical content: {reused}")
+            update_job_progress(job_id, 1.0)
+            return reused
 
         update_job_progress(job_id, 0.1)
 
-        # Generate output path
-        output_filename = f"{input_path.stem}_waveform.png"
-        output_path = AUDIO_WAVEFORMS_DIR / output_filename
-
-        # Handle collisions
-        counter = 1
-        while output_path.exists():
-            output_filename = f"{input_path.stem}_waveform_{counter}.png"
+        # Generate output path (named by cache key; free name for unhashed assets)
+        if key:
+            output_path = artifact_output_path(AUDIO_WAVEFORMS_DIR, input_path.stem, "waveform", key, ".png")
+        else:
+            output_filename = f"{input_path.stem}_waveform.png"
             output_path = AUDIO_WAVEFORMS_DIR / output_filename
-            counter += 1
 
-        # Load audio file
-        logger.info(f"[Job {job_id}] Loading audio: {input_path}")
-        try:
-            audio = AudioSegment.from_file(str(input_path))
-        except Exception as e:
-            logger.error(f"[Job {job_id}] Failed to load audio with pydub: {e}")
-            # Create placeholder waveform
-            return _create_placeholder_waveform(output_path, input_path.stem)
+            # Handle collisions
+            counter = 1
+            while output_path.exists():
+                output_filename = f"{input_path.stem}_waveform_{counter}.png"
+                output_path = AUDIO_WAVEFORMS_DIR / output_filename
+                counter += 1
 
+        # Decode + render (in a worker process with the processpool backend)
+        logger.info(f"[Job {job_id}] Rendering waveform: {input_path}")
         update_job_progress(job_id, 0.3)
-
-        # Get audio samples (downsample for visualization)
-        samples = np.array(audio.get_array_of_samples())
-        channels = audio.channels
-
-        # If stereo, take mean of channels
-        if channels == 2:
-            samples = samples.reshape((-1, 2))
-            samples = samples.mean(axis=1)
-
-        update_job_progress(job_id, 0.5)
-
-        # Downsample for visualization (max 2000 points)
-        target_points = 2000
-        if len(samples) > target_points:
-            step = len(samples) // target_points
-            samples = samples[::step]
-
-        # Normalize to -1 to 1
-        samples = samples / np.max(np.abs(samples))
-
-        # Generate waveform image
-        logger.info(f"[Job {job_id}] Generating waveform PNG")
-        width = 800
-        height = 200
-        img = Image.new("RGB", (width, height), color=(30, 30, 30))
-        draw = ImageDraw.Draw(img)
-
-        # Draw waveform
-        center_y = height // 2
-        x_scale = width / len(samples)
-
-        for i in range(len(samples) - 1):
-            x1 = int(i * x_scale)
-            x2 = int((i + 1) * x_scale)
-            y1 = int(center_y - samples[i] * center_y * 0.9)
-            y2 = int(center_y - samples[i + 1] * center_y * 0.9)
-            draw.line([(x1, y1), (x2, y2)], fill=(100, 200, 100), width=1)
-
-        # Draw center line
-        draw.line([(0, center_y), (width, center_y)], fill=(50, 50, 50), width=1)
-
-        # Save image
-        img.save(output_path, "PNG")
+        if not run_cpu_bound(
+            render_waveform,
+            str(input_path),
+            str(output_path),
+            WAVEFORM_PARAMS["width"],
+            WAVEFORM_PARAMS["height"],
+            token=token,
+        ):
+            # Placeholder under a fixed, non-keyed name: never stored as an artifact,
+            # so a later run (e.g. once ffmpeg is installed) decodes the audio again
+            placeholder_path = AUDIO_WAVEFORMS_DIR / f"{input_path.stem}_waveform_placeholder.png"
+            return _create_placeholder_waveform(placeholder_path, input_path.stem)
+        if key:
+            store_artifact(key, content_hash, JobKind.THUMBNAIL, "audio_waveform", WAVEFORM_VERSION, output_path)
         update_job_progress(job_id, 1.0)
 
         logger.info(f"[Job {job_id}] Audio waveform complete: {output_path}")
@@ -225,6 +301,73 @@ def run_audio_waveform_job(job_id: int) -> Path | None:
         raise
 
 
+def render_waveform(input_path: str, output_path: str, width: int = 800, height: int = 200) -> bool:
+    """
+    Decode an audio file and draw its waveform as PNG
+
+    Pure compute step: safe to run in a worker process (no database access).
+
+    Args:
+        input_path: Source audio file
+        output_path: Destination PNG
+        width: Image width in pixels
+        height: Image height in pixels
+
+    Returns:
+        False if the audio could not be decoded (nothing written)
+    """
+    # Heavy audio stack imported on first use, not at server startup
+    import numpy as np
+    from pydub import AudioSegment
+
+    # Load audio file
+    try:
+        audio = AudioSegment.from_file(input_path)
+    except Exception as e:
+        logger.error(f"Failed to load audio with pydub: {input_path}: {e}")
+        return False
+
+    # Get audio samples (downsample for visualization)
+    samples = np.array(audio.get_array_of_samples())
+    channels = audio.channels
+
+    # If stereo, take mean of channels
+    if channels == 2:
+        samples = samples.reshape((-1, 2))
+        samples = samples.mean(axis=1)
+
+    # Downsample for visualization (max 2000 points)
+    target_points = 2000
+    if len(samples) > target_points:
+        step = len(samples) // target_points
+        samples = samples[::step]
+
+    # Normalize to -1 to 1
+    samples = samples / np.max(np.abs(samples))
+
+    # Generate waveform image
+    img = Image.new("RGB", (width, height), color=(30, 30, 30))
+    draw = ImageDraw.Draw(img)
+
+    # Draw waveform
+    center_y = height // 2
+    x_scale = width / len(samples)
+
+    for i in range(len(samples) - 1):
+        x1 = int(i * x_scale)
+        x2 = int((i + 1) * x_scale)
+        y1 = int(center_y - samples[i] * center_y * 0.9)
+        y2 = int(center_y - samples[i + 1] * center_y * 0.9)
+        draw.line([(x1, y1), (x2, y2)], fill=(100, 200, 100), width=1)
+
+    # Draw center line
+    draw.line([(0, center_y), (width, center_y)], fill=(50, 50, 50), width=1)
+
+    # Save image
+    img.save(output_path, "PNG")
+    return True
+
+
 def _create_placeholder_waveform(output_path: Path, filename: str) -> Path:
     """Create a placeholder waveform image when audio can't be loaded"""
     logger.warning(f"Creating placeholder waveform for {filename}")
@@ -0,0 +1,156 @@
+"""
+Job Progress Channel
+
+Coalesces job progress updates in memory and writes them in batches
+
+Job functions report progress many times per run; writing each report
+(open session, load Job, commit) makes SQLite the bottleneck with several
+workers. Reports only replace the job's value in memory; a flusher thread
+writes whatever changed since the last flush in one executemany UPDATE at
+most every JOB_PROGRESS_FLUSH_SEC. Readers get the live value via get().
+
+Pending values belong to the database they were reported against: call
+reset() when switching databases (the queue's channel is reset by
+reset_engine()).
+"""
+
+import threading
+from typing import Any
+
+from sqlalchemy import bindparam, update
+from sqlmodel import Session
+
+from app.backend.models.entities import Job, JobStatus
+from app.core.config import settings
+from app.core.db import get_engine
+from app.core.logging import get_logger
+
+logger = get_logger(__name__)
+
+
+class ProgressChannel:
+    """
+    In-memory progress of running jobs with rate-limited persistence
+
+    Thread-safe: report() is called from job threads, flush() from the
+    flusher thread (or directly, e.g. on shutdown).
+    """
+
+    def __init__(self, flush_interval: float | None = None):
+        self.flush_interval = flush_interval if flush_interval is not None else settings.job_progress_flush_sec
+        self._lock = threading.Lock()
+        self._live: dict[int, float] = {}  # job_id -> latest progress
+        self._dirty: dict[int, float] = {}  # job_id -> progress not yet written
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+        # Stats
+        self.reports = 0
+        self.rows_written = 0
+        self.flushes = 0
+
+    def start(self):
+        """Start the flusher thread (idempotent)"""
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="job_progress", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        """Stop the flusher thread and write pending values"""
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+        self.flush()
+
+    def report(self, job_id: int, progress: float):
+        """
+        Record a job's progress (cheap; no database access)
+
+        Args:
+            job_id: Job ID
+            progress: Progress value (clamped to 0.0 - 1.0)
+        """
+        progress = max(0.0, min(1.0, progress))
+        with self._lock:
+            self._live[job_id] = progress
+            self._dirty[job_id] = progress
+            self.reports += 1
+        if self._thread is None:
+            self.start()
+
+    def get(self, job_id: int) -> float | None:
+        """Latest reported progress of a job (None if not reported)"""
+        return self._live.get(job_id)
+
+    def snapshot(self) -> dict[int, float]:
+        """Latest progress of every tracked job"""
+        with self._lock:
+            return dict(self._live)
+
+    def discard(self, job_id: int):
+        """Forget a finished job (its final state is written by the queue)"""
+        with self._lock:
+            self._live.pop(job_id, None)
+            self._dirty.pop(job_id, None)
+
+    def reset(self):
+        """Write pending values to the current database, then forget every job"""
+        self.flush()
+        with self._lock:
+            self._live.clear()
+            self._dirty.clear()
+
+    def flush(self) -> int:
+        """
+        Write coalesced progress of running jobs in one transaction
+
+        Rows that are no longer RUNNING (completed, cancelled) are skipped,
+        so a late flush never overwrites a final state.
+
+        Returns:
+            Number of jobs in the batch
+        """
+        with self._lock:
+            batch, self._dirty = self._dirty, {}
+        if not batch:
+            return 0
+
+        stmt = (
+            update(Job)
+            .where(Job.id == bindparam("b_id"), Job.status == JobStatus.RUNNING)
+            .values(progress=bindparam("b_progress"))
+        )
+        try:
+            with Session(get_engine()) as session:
+                session.connection().execute(
+                    stmt, [{"b_id": job_id, "b_progress": progress} for job_id, progress in batch.items()]
+                )
+                session.commit()
+        except Exception as e:
+            logger.error(f"Failed to write progress of {len(batch)} jobs: {e}")
+            with self._lock:
+                # Keep newer reports made meanwhile
+                self._dirty = {**batch, **self._dirty}
+            return 0
+
+        self.flushes += 1
+        self.rows_written += len(batch)
+        return len(batch)
+
+    def get_stats(self) -> dict[str, Any]:
+        """Reports received vs. rows written"""
+        return {
+            "tracked_jobs": len(self._live),
+            "reports": self.reports,
+            "rows_written": self.rows_written,
+            "flushes": self.flushes,
+        }
+
+    def _run(self):
+        """Flusher thread loop"""
+        while not self._stop.wait(self.flush_interval):
+            self.flush()
@@ -4,68 +4,211 @@
 STEP 6: ThreadPool-based job queue for background processing
 
 Uses ThreadPoolExecutor by default; RQ optional with Redis
+
+The `jobs` table is the queue: enqueue_job() only inserts a PENDING row and a
+dispatcher thread claims rows atomically (UPDATE ... RETURNING), so jobs
+survive backend restarts. Claimed jobs hold a lease that a heartbeat thread
+keeps extending; RUNNING rows whose lease expired (crashed process) are put
+back to PENDING on startup and periodically afterwards. Handlers are looked
+up by JobKind (and params["type"]) in JOB_HANDLERS, never passed around as
+Python callables, so any process can resume any job.
+
+Each running job gets a CancellationToken (passed as `token=` to handlers
+that accept it) carrying its kind's time limit; cancel_job() and the
+heartbeat (for cancellations made by other processes) trip it.
+
+Progress reports go through a ProgressChannel: kept in memory, coalesced
+and written in batches; get_job_status() returns the live value.
+
+Every transition made here is published to a JobEventLog (get_job_events())
+so streaming clients can follow jobs without polling the database.
+
+Pending jobs are claimed by priority (INTERACTIVE before BATCH) and only
+when the SlotScheduler admits their kind, so heavy batches cannot take every
+worker thread from the jobs the UI is waiting on.
 """
 
+import importlib
+import inspect
 import json
+import os
+import socket
+import threading
+import uuid
 from collections.abc import Callable
 from concurrent.futures import Future, ThreadPoolExecutor
-from datetime import UTC, datetime
+from datetime import UTC, datetime, timedelta
 from typing import Any
 
+from sqlalchemy import func, insert, update
 from sqlmodel import Session, select
 
-from app.backend.models.entities import Job, JobKind, JobStatus
-from app.core.db import get_engine
+from app.backend.models.entities import Asset, Job, JobKind, JobPriority, JobStatus
+from app.core.config import settings
+from app.core.db import chunked, get_engine, on_engine_reset
 from app.core.logging import get_logger
+from app.workers.cancellation import CancellationToken, JobCancelledError, JobTimeoutError
+from app.workers.cpu_pool import shutdown_cpu_executor
+from app.workers.job_events import JobEventLog
+from app.workers.progress import ProgressChannel
+from app.workers.scheduler import SlotScheduler, default_priority, job_timeout
 
 logger = get_logger(__name__)
 
 # Global executor instance
 _executor: ThreadPoolExecutor | None = None
 _active_jobs: dict[int, Future] = {}  # job_id -> Future
-
-# Default settings
-MAX_WORKERS = 4  # Can be overridden by settings in future
+_active_kinds: dict[int, JobKind] = {}  # job_id -> kind holding scheduler slots
+_tokens: dict[int, CancellationToken] = {}  # job_id -> token of the running job
+_progress = ProgressChannel()
+on_engine_reset(_progress.reset)  # Never flush one database's progress into the next
+_events = JobEventLog()
+_scheduler: SlotScheduler | None = None
+
+# Pending rows inspected per dispatch round when picking admissible jobs
+CLAIM_LOOKAHEAD = 64
+
+# Identifies this process's claims in jobs.worker_id
+WORKER_ID = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+# (kind, params["type"]) -> "module:function"; None matches jobs without a type
+JOB_HANDLERS: dict[tuple[JobKind, str | None], str] = {
+    (JobKind.BG_REMOVE, None): "app.workers.jobs.bg_remove:run_bg_remove_job",
+    (JobKind.BG_REMOVE, "batch"): "app.workers.jobs.bg_remove:run_bg_remove_batch",
+    (JobKind.THUMBNAIL, "video_poster"): "app.workers.jobs.thumbnails:run_video_poster_job",
+    (JobKind.THUMBNAIL, "audio_waveform"): "app.workers.jobs.thumbnails:run_audio_waveform_job",
+    (JobKind.THUMBNAIL, "pyramid"): "app.workers.jobs.thumbnails:run_thumbnail_pyramid_job",
+}
+
+# Handlers passed to enqueue_job(job_func=...) by older callers (this process only)
+_inline_handlers: dict[int, Callable] = {}
+
+# Dispatcher state
+_dispatcher: threading.Thread | None = None
+_heartbeat: threading.Thread | None = None
+_stop = threading.Event()
+_wakeup = threading.Event()
+_state_lock = threading.Lock()
+_active_lock = threading.Lock()  # Dispatch registers a job atomically w.r.t. its cleanup in _run_job
 
 
 def get_executor() -> ThreadPoolExecutor:
     """Get or create the global thread pool executor"""
     global _executor
     if _executor is None:
-        _executor = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix="job_worker")
-        logger.info(f"Initialized job executor with {MAX_WORKERS} workers")
+        _executor = ThreadPoolExecutor(max_workers=settings.worker_threads, thread_name_prefix="job_worker")
+        logger.info(f"Initialized job executor with {settings.worker_threads} workers")
     return _executor
 
 
+def get_scheduler() -> SlotScheduler:
+    """Get or create the admission scheduler (probes hardware on first use)"""
+    global _scheduler
+    if _scheduler is None:
+        _scheduler = SlotScheduler.from_hardware()
+    return _scheduler
+
+
+def set_scheduler(scheduler: SlotScheduler | None):
+    """Replace the admission scheduler (None re-derives it from hardware)"""
+    global _scheduler
+    _scheduler = scheduler
+
+
 def shutdown_executor():
     """Shutdown the executor (for testing/cleanup)"""
     global _executor
+    stop_queue()
     if _executor:
         _executor.shutdown(wait=True)
         _executor = None
         logger.info("Job executor shutdown")
+    shutdown_cpu_executor()
+    _progress.stop()
+
+
+def resolve_handler(kind: JobKind, params: dict[str, Any] | None = None) -> Callable:
+    """
+    Look up the function that runs a job
+
+    Args:
+        kind: Job kind
+        params: Job parameters (params["type"] selects a variant)
+
+    Returns:
+        Handler accepting job_id as first argument
+
+    Raises:
+        LookupError: No handler registered for this kind/variant
+    """
+    variant = (params or {}).get("type")
+    target = JOB_HANDLERS.get((kind, variant)) or JOB_HANDLERS.get((kind, None))
+    if target is None:
+        raise LookupError(f"No handler registered for job kind {kind.value} (type={variant})")
+    module_name, func_name = target.split(":")
+    return getattr(importlib.import_module(module_name), func_name)
+
+
+def start_queue():
+    """
+    Start the dispatcher and heartbeat threads (idempotent)
+
+    Recovers jobs orphaned by a previous run before claiming anything.
+    """
+    global _dispatcher, _heartbeat
+    with _state_lock:
+        if _dispatcher is not None and _dispatcher.is_alive():
+            return
+        _stop.clear()
+        recover_stale_jobs()
+        _dispatcher = threading.Thread(target=_dispatch_loop, name="job_dispatcher", daemon=True)
+        _heartbeat = threading.Thread(target=_heartbeat_loop, name="job_heartbeat", daemon=True)
+        _dispatcher.start()
+        _heartbeat.start()
+    logger.info(f"Job queue started (worker={WORKER_ID}, lease={settings.job_lease_seconds}s)")
+
+
+def stop_queue():
+    """Stop claiming new jobs (running jobs finish on the executor)"""
+    global _dispatcher, _heartbeat
+    with _state_lock:
+        if _dispatcher is None:
+            return
+        _stop.set()
+        _wakeup.set()
+        _dispatcher.join()
+        if _heartbeat:
+            _heartbeat.join()
+        _dispatcher = _heartbeat = None
+    logger.info("Job queue stopped")
 
 
 def enqueue_job(
     kind: JobKind,
-    job_func: Callable,
+    job_func: Callable | None = None,
     asset_id: int | None = None,
     pack_id: int | None = None,
     params: dict[str, Any] | None = None,
+    priority: JobPriority | None = None,
 ) -> int:
     """
     Enqueue a background job
 
     Args:
         kind: Type of job (JobKind enum)
-        job_func: Function to execute (must accept job_id as first arg)
+        job_func: Deprecated; handlers are resolved from JOB_HANDLERS by kind/params["type"].
+            If given, it is used for this job while this process is alive.
         asset_id: Optional asset ID being processed
         pack_id: Optional pack ID being processed
         params: Optional job parameters
+        priority: Claim priority (defaults per kind: thumbnails are INTERACTIVE)
 
     Returns:
         job_id: ID of the created job
     """
+    if job_func is None:
+        resolve_handler(kind, params)  # Fail fast on unknown kinds
+
     engine = get_engine()
 
     # Create job record in database
@@ -74,80 +217,410 @@ def enqueue_job(
             kind=kind,
             asset_id=asset_id,
             pack_id=pack_id,
+            priority=priority if priority is not None else default_priority(kind),
             params_json=json.dumps(params) if params else None,
             status=JobStatus.PENDING,
             progress=0.0,
         )
         session.add(job)
-        session.commit()
-        session.refresh(job)
+        session.flush()
         job_id = job.id
+        if job_id is None:
+            raise ValueError("Failed to create job - no ID returned")
 
-    if job_id is None:
-        raise ValueError("Failed to create job - no ID returned")
+        # Registered before the row is visible, so no dispatcher can claim it with the generic handler
+        if job_func is not None:
+            _inline_handlers[job_id] = job_func
+        try:
+            session.commit()
+        except Exception:
+            _inline_handlers.pop(job_id, None)
+            raise
+        session.refresh(job)
 
-    logger.info(f"Enqueued job {job_id}: {kind.value} (asset={asset_id}, pack={pack_id})")
+    _events.publish(job_id, JobStatus.PENDING.value, kind=kind.value, progress=0.0)
+    logger.info(f"Enqueued job {job_id}: {kind.value} (asset={asset_id}, pack={pack_id}, priority={job.priority})")
 
-    # Submit to thread pool
-    executor = get_executor()
-    future = executor.submit(_run_job, job_id, job_func)
-    _active_jobs[job_id] = future
+    # The row is the queue entry; make sure a dispatcher will pick it up
+    start_queue()
+    _wakeup.set()
 
     return job_id
 
 
-def _run_job(job_id: int, job_func: Callable):
+def enqueue_jobs(
+    kind: JobKind,
+    asset_ids: list[int],
+    params: dict[str, Any] | None = None,
+    priority: JobPriority | None = None,
+) -> tuple[str, list[int], list[int]]:
     """
-    Internal wrapper to run a job function with error handling
+    Enqueue one job per asset in a single transaction
 
-    Updates job status in database during execution
+    Asset IDs are validated up front (one IN query per SQL_IN_CHUNK IDs);
+    unknown ones are skipped instead of becoming jobs that fail later. All
+    created jobs share a batch ID for get_batch_status()/cancel_batch().
+
+    Args:
+        kind: Type of job (JobKind enum)
+        asset_ids: Assets to process (duplicates are ignored)
+        params: Parameters shared by all jobs; "asset_id" is added per job
+        priority: Claim priority (defaults per kind)
+
+    Returns:
+        (batch_id, created job IDs in asset order, skipped asset IDs)
+    """
+    resolve_handler(kind, params)  # Fail fast on unknown kinds
+
+    asset_ids = list(dict.fromkeys(asset_ids))
+    batch_id = uuid.uuid4().hex
+    priority = priority if priority is not None else default_priority(kind)
+    now = datetime.now(UTC)
+
+    engine = get_engine()
+    with Session(engine) as session:
+        existing: set[int] = set()
+        for chunk in chunked(asset_ids):
+            existing.update(session.exec(select(Asset.id).where(Asset.id.in_(chunk))).all())
+        valid = [asset_id for asset_id in asset_ids if asset_id in existing]
+        skipped = [asset_id for asset_id in asset_ids if asset_id not in existing]
+
+        rows = [
+            {
+                "kind": kind,
+                "asset_id": asset_id,
+                "priority": priority,
+                "batch_id": batch_id,
+                "params_json": json.dumps({**(params or {}), "asset_id": asset_id}),
+                "status": JobStatus.PENDING,
+                "progress": 0.0,
+                "attempts": 0,
+                "created_at": now,
+            }
+            for asset_id in valid
+        ]
+        job_ids: list[int] = []
+        if rows:
+            stmt = insert(Job).returning(Job.id, sort_by_parameter_order=True)
+            job_ids = list(session.connection().execute(stmt, rows).scalars().all())
+        session.commit()
+
+    for job_id in job_ids:
+        _events.publish(job_id, JobStatus.PENDING.value, kind=kind.value, progress=0.0, batch_id=batch_id)
+    logger.info(f"Enqueued batch {batch_id}: {len(job_ids)} {kind.value} jobs ({len(skipped)} unknown assets skipped)")
+
+    if job_ids:
+        start_queue()
+        _wakeup.set()
+
+    return batch_id, job_ids, skipped
+
+
+def _claim_where(*criteria) -> list[int]:
+    """Move matching PENDING rows to RUNNING under this worker's lease"""
+    now = datetime.now(UTC)
+    stmt = (
+        update(Job)
+        .where(*criteria, Job.status == JobStatus.PENDING)
+        .values(
+            status=JobStatus.RUNNING,
+            worker_id=WORKER_ID,
+            started_at=now,
+            heartbeat_at=now,
+            lease_expires_at=now + timedelta(seconds=settings.job_lease_seconds),
+            attempts=Job.attempts + 1,
+        )
+        .returning(Job.id)
+    )
+
+    engine = get_engine()
+    with Session(engine) as session:
+        claimed = sorted(session.exec(stmt).scalars().all())
+        session.commit()
+
+    for job_id in claimed:
+        _events.publish(job_id, JobStatus.RUNNING.value, progress=0.0)
+    return claimed
+
+
+def claim_jobs(limit: int) -> list[int]:
     """
+    Atomically claim up to `limit` pending jobs for this process
+
+    A single UPDATE ... RETURNING moves rows from PENDING to RUNNING, so two
+    processes sharing the database never claim the same job. Rows are taken
+    by priority, then age; admission limits are not applied.
+
+    Returns:
+        Claimed job IDs (ascending)
+    """
+    if limit <= 0:
+        return []
+
+    next_ids = (
+        select(Job.id)
+        .where(Job.status == JobStatus.PENDING)
+        .order_by(Job.priority, Job.id)
+        .limit(limit)
+        .scalar_subquery()
+    )
+    return _claim_where(Job.id.in_(next_ids))
+
+
+def claim_admitted_jobs(scheduler: SlotScheduler) -> list[tuple[int, JobKind]]:
+    """
+    Claim the pending jobs the scheduler has room for
+
+    Looks at the next CLAIM_LOOKAHEAD rows by priority and skips kinds that
+    are at their limit, so a backlog of heavy jobs does not block cheaper
+    ones queued behind it. Slots reserved for rows another process claimed
+    first are released again.
+
+    Returns:
+        (job_id, kind) for each claimed job; each holds a scheduler slot
+    """
+    if scheduler.free_slots() <= 0:
+        return []
+
     engine = get_engine()
+    with Session(engine) as session:
+        candidates = session.exec(
+            select(Job.id, Job.kind, Job.priority)
+            .where(Job.status == JobStatus.PENDING)
+            .order_by(Job.priority, Job.id)
+            .limit(CLAIM_LOOKAHEAD)
+        ).all()
+
+    admitted: dict[int, JobKind] = {}
+    for job_id, kind, priority in candidates:
+        if scheduler.free_slots() <= 0:
+            break
+        if scheduler.acquire(kind, priority):
+            admitted[job_id] = kind
+
+    if not admitted:
+        return []
+
+    claimed = set(_claim_where(Job.id.in_(list(admitted))))
+    for job_id, kind in admitted.items():
+        if job_id not in claimed:
+            scheduler.release(kind)
+    return [(job_id, kind) for job_id, kind in admitted.items() if job_id in claimed]
+
+
+def recover_stale_jobs() -> int:
+    """
+    Re-queue RUNNING jobs whose lease expired (owner crashed or was killed)
+
+    Jobs that already used settings.job_max_attempts are failed instead.
 
+    Returns:
+        Number of jobs put back to PENDING
+    """
+    now = datetime.now(UTC)
+    stale = (
+        Job.status == JobStatus.RUNNING,
+        (Job.lease_expires_at.is_(None)) | (Job.lease_expires_at < now),
+    )
+
+    engine = get_engine()
+    with Session(engine) as session:
+        error_message = f"Abandoned after {settings.job_max_attempts} attempts (worker lease expired)"
+        failed = (
+            session.exec(
+                update(Job)
+                .where(*stale, Job.attempts >= settings.job_max_attempts)
+                .values(
+                    status=JobStatus.FAILED,
+                    error_message=error_message,
+                    completed_at=now,
+                    worker_id=None,
+                    lease_expires_at=None,
+                )
+                .returning(Job.id)
+            )
+            .scalars()
+            .all()
+        )
+        requeued = (
+            session.exec(
+                update(Job)
+                .where(*stale)
+                .values(status=JobStatus.PENDING, progress=0.0, worker_id=None, lease_expires_at=None)
+                .returning(Job.id)
+            )
+            .scalars()
+            .all()
+        )
+        session.commit()
+
+    for job_id in failed:
+        _events.publish(job_id, JobStatus.FAILED.value, error_message=error_message)
+    for job_id in requeued:
+        _events.publish(job_id, JobStatus.PENDING.value, progress=0.0)
+
+    if requeued or failed:
+        logger.warning(f"Recovered stale jobs: {len(requeued)} re-queued, {len(failed)} failed after max attempts")
+    return len(requeued)
+
+
+def _dispatch_loop():
+    """Claim pending jobs whenever a worker slot is free"""
+    last_recovery = datetime.now(UTC)
+    while not _stop.is_set():
+        try:
+            for job_id, kind in claim_admitted_jobs(get_scheduler()):
+                with _active_lock:
+                    _active_kinds[job_id] = kind
+                    _active_jobs[job_id] = get_executor().submit(_run_job, job_id)
+
+            # Another process may have died holding jobs
+            if datetime.now(UTC) - last_recovery > timedelta(seconds=settings.job_lease_seconds):
+                recover_stale_jobs()
+                last_recovery = datetime.now(UTC)
+        except Exception as e:
+            logger.error(f"Job dispatcher error: {e}")
+
+        _wakeup.wait(timeout=settings.job_poll_interval_sec)
+        _wakeup.clear()
+
+
+def _heartbeat_loop():
+    """Extend the lease of every job this process is running"""
+    interval = max(settings.job_lease_seconds / 3, 0.1)
+    while not _stop.wait(interval):
+        job_ids = list(_active_jobs)
+        if not job_ids:
+            continue
+        now = datetime.now(UTC)
+        try:
+            with Session(get_engine()) as session:
+                session.exec(
+                    update(Job)
+                    .where(Job.id.in_(job_ids), Job.worker_id == WORKER_ID, Job.status == JobStatus.RUNNING)
+                    .values(heartbeat_at=now, lease_expires_at=now + timedelta(seconds=settings.job_lease_seconds))
+                )
+                session.commit()
+
+                # Cancelled through another process (e.g. API server vs. worker)
+                cancelled = session.exec(
+                    select(Job.id).where(Job.id.in_(job_ids), Job.status == JobStatus.CANCELLED)
+                ).all()
+        except Exception as e:
+            logger.error(f"Job heartbeat failed: {e}")
+            continue
+
+        for job_id in cancelled:
+            token = _tokens.get(job_id)
+            if token:
+                token.cancel()
+
+
+def _finish_job(job_id: int, **values):
+    """Record a job's outcome unless it was cancelled or re-claimed meanwhile"""
+    engine = get_engine()
+    with Session(engine) as session:
+        updated = session.exec(
+            update(Job)
+            .where(Job.id == job_id, Job.worker_id == WORKER_ID, Job.status == JobStatus.RUNNING)
+            .values(completed_at=datetime.now(UTC), lease_expires_at=None, **values)
+        ).rowcount
+        session.commit()
+
+    if updated:
+        status = values.pop("status")
+        _events.publish(job_id, status.value, **values)
+
+
+def _accepts_token(job_func: Callable) -> bool:
+    """True if the handler takes a `token` argument (older handlers don't)"""
     try:
-        # Mark as running
-        with Session(engine) as session:
+        return "token" in inspect.signature(job_func).parameters
+    except (TypeError, ValueError):
+        return False
+
+
+def _run_job(job_id: int, job_func: Callable | None = None):
+    """
+    Internal wrapper to run a claimed job with error handling
+
+    Updates job status in database during execution
+    """
+    try:
+        with Session(get_engine()) as session:
             job = session.get(Job, job_id)
-            if job:
-                job.status = JobStatus.RUNNING
-                job.started_at = datetime.now(UTC)
-                session.add(job)
-                session.commit()
+            if job is None:
+                return
+            kind = job.kind
+            params = json.loads(job.params_json) if job.params_json else None
+
+        job_func = job_func or _inline_handlers.pop(job_id, None) or resolve_handler(kind, params)
+        # Batch jobs size their own limit (params["timeout_sec"])
+        token = CancellationToken(timeout_sec=(params or {}).get("timeout_sec") or job_timeout(kind))
+        _tokens[job_id] = token
 
-        logger.info(f"Job {job_id} started")
+        logger.info(f"Job {job_id} started (time limit {token.timeout_sec}s)")
 
         # Execute job function
-        result_path = job_func(job_id)
+        result_path = job_func(job_id, token=token) if _accepts_token(job_func) else job_func(job_id)
+        token.check()
 
         # Mark as completed
-        with Session(engine) as session:
-            job = session.get(Job, job_id)
-            if job:
-                job.status = JobStatus.COMPLETED
-                job.progress = 1.0
-                job.result_path = str(result_path) if result_path else None
-                job.completed_at = datetime.now(UTC)
-                session.add(job)
-                session.commit()
+        _finish_job(
+            job_id,
+            status=JobStatus.COMPLETED,
+            progress=1.0,
+            result_path=str(result_path) if result_path else None,
+        )
 
         logger.info(f"Job {job_id} completed successfully")
 
+    except JobTimeoutError as e:
+        logger.warning(f"Job {job_id} timed out: {e}")
+        _finish_job(job_id, status=JobStatus.FAILED, error_message=str(e))
+
+    except JobCancelledError:
+        # Row is normally already CANCELLED; this only frees the worker
+        logger.info(f"Job {job_id} stopped after cancellation")
+        _finish_job(job_id, status=JobStatus.CANCELLED)
+
     except Exception as e:
         # Mark as failed
         logger.error(f"Job {job_id} failed: {e}", exc_info=True)
-        with Session(engine) as session:
-            job = session.get(Job, job_id)
-            if job:
-                job.status = JobStatus.FAILED
-                job.error_message = str(e)
-                job.completed_at = datetime.now(UTC)
-                session.add(job)
-                session.commit()
+        _finish_job(job_id, status=JobStatus.FAILED, error_message=str(e))
 
     finally:
-        # Cleanup
-        if job_id in _active_jobs:
-            del _active_jobs[job_id]
+        # Cleanup (frees the job's scheduler slots)
+        _progress.discard(job_id)
+        _tokens.pop(job_id, None)
+        with _active_lock:
+            _active_jobs.pop(job_id, None)
+            slot_kind = _active_kinds.pop(job_id, None)
+        if slot_kind is not None and _scheduler is not None:
+            _scheduler.release(slot_kind)
+        _wakeup.set()
+
+
+def _job_to_dict(job: Job, live: dict[int, float]) -> dict[str, Any]:
+    """Serialize a job, using in-memory progress while it runs"""
+    progress = job.progress
+    if job.status == JobStatus.RUNNING:
+        progress = live.get(job.id, progress)
+
+    return {
+        "id": job.id,
+        "kind": job.kind.value,
+        "priority": job.priority,
+        "batch_id": job.batch_id,
+        "status": job.status.value,
+        "progress": progress,
+        "result_path": job.result_path,
+        "results": json.loads(job.result_json) if job.result_json else None,
+        "error_message": job.error_message,
+        "created_at": job.created_at.isoformat() if job.created_at else None,
+        "started_at": job.started_at.isoformat() if job.started_at else None,
+        "completed_at": job.completed_at.isoformat() if job.completed_at else None,
+    }
 
 
 def get_job_status(job_id: int) -> dict[str, Any] | None:
@@ -163,44 +636,100 @@ def get_job_status(job_id: int) -> dict[str, Any] | None:
         job = session.get(Job, job_id)
         if not job:
             return None
+        return _job_to_dict(job, _progress.snapshot())
 
-        return {
-            "id": job.id,
-            "kind": job.kind.value,
-            "status": job.status.value,
-            "progress": job.progress,
-            "result_path": job.result_path,
-            "error_message": job.error_message,
-            "created_at": job.created_at.isoformat() if job.created_at else None,
-            "started_at": job.started_at.isoformat() if job.started_at else None,
-            "completed_at": job.completed_at.isoformat() if job.completed_at else None,
-        }
+
+def list_jobs(
+    ids: list[int] | None = None,
+    statuses: list[JobStatus] | None = None,
+    kinds: list[JobKind] | None = None,
+    batch_id: str | None = None,
+    offset: int = 0,
+    limit: int = 100,
+) -> tuple[int, list[dict[str, Any]]]:
+    """
+    Get many jobs in one query
+
+    Args:
+        ids: Only these job IDs
+        statuses: Only jobs in these states
+        kinds: Only these job kinds
+        batch_id: Only jobs created by this enqueue_jobs() call
+        offset: Rows to skip (ordered by job ID)
+        limit: Maximum rows to return
+
+    Returns:
+        (total matching jobs, page of job dicts as in get_job_status)
+    """
+    criteria = []
+    if ids is not None:
+        criteria.append(Job.id.in_(ids))
+    if statuses:
+        criteria.append(Job.status.in_(statuses))
+    if kinds:
+        criteria.append(Job.kind.in_(kinds))
+    if batch_id is not None:
+        criteria.append(Job.batch_id == batch_id)
+
+    engine = get_engine()
+    with Session(engine) as session:
+        total = session.exec(select(func.count()).select_from(Job).where(*criteria)).one()
+        jobs = session.exec(select(Job).where(*criteria).order_by(Job.id).offset(offset).limit(limit)).all()
+        live = _progress.snapshot()
+        return total, [_job_to_dict(job, live) for job in jobs]
+
+
+def get_job_events() -> JobEventLog:
+    """Feed of job transitions made by this process"""
+    return _events
+
+
+def get_live_progress() -> dict[int, float]:
+    """In-memory progress of running jobs (job_id -> progress)"""
+    return _progress.snapshot()
 
 
 def update_job_progress(job_id: int, progress: float):
     """
     Update job progress (called by job functions)
 
+    Cheap: the value is visible to get_job_status() at once and written to
+    the database with other jobs' progress in the next batched flush.
+
     Args:
         job_id: Job ID
         progress: Progress value (0.0 to 1.0)
     """
+    _progress.report(job_id, progress)
+
+
+def set_job_results(job_id: int, results: list[dict[str, Any]]):
+    """
+    Store per-item results of a batch job (called by job functions)
+
+    Args:
+        job_id: Job ID
+        results: One dict per item, e.g. {"asset_id", "status", "output" | "error"}
+    """
     engine = get_engine()
     with Session(engine) as session:
-        job = session.get(Job, job_id)
-        if job:
-            job.progress = max(0.0, min(1.0, progress))
-            session.add(job)
-            session.commit()
+        session.exec(update(Job).where(Job.id == job_id).values(result_json=json.dumps(results)))
+        session.commit()
+
+
+def get_progress_stats() -> dict[str, Any]:
+    """Progress channel counters (reports received vs. rows written)"""
+    return _progress.get_stats()
 
 
 def cancel_job(job_id: int) -> bool:
     """
     Cancel a pending or running job
 
-    Note: ThreadPool doesn't support true cancellation,
-    so this just marks the job as cancelled in DB.
-    The actual function may continue running.
+    Pending jobs are never claimed once cancelled. A running job in this
+    process has its token tripped: it stops at its next check and any
+    external tool it runs is killed. Handlers that ignore the token keep
+    running, but their result is discarded.
 
     Returns:
         True if job was cancelled, False if not found or already complete
@@ -213,13 +742,79 @@ def cancel_job(job_id: int) -> bool:
 
         job.status = JobStatus.CANCELLED
         job.completed_at = datetime.now(UTC)
+        job.lease_expires_at = None
         session.add(job)
         session.commit()
 
+    _inline_handlers.pop(job_id, None)
+    _events.publish(job_id, JobStatus.CANCELLED.value)
+    token = _tokens.get(job_id)
+    if token:
+        token.cancel()
     logger.info(f"Job {job_id} cancelled")
     return True
 
 
+def cancel_batch(batch_id: str) -> int:
+    """
+    Cancel every pending or running job of a batch in one UPDATE
+
+    Running jobs in this process have their tokens tripped, as in cancel_job().
+
+    Returns:
+        Number of jobs cancelled
+    """
+    engine = get_engine()
+    with Session(engine) as session:
+        stmt = (
+            update(Job)
+            .where(Job.batch_id == batch_id, Job.status.in_([JobStatus.PENDING, JobStatus.RUNNING]))
+            .values(status=JobStatus.CANCELLED, completed_at=datetime.now(UTC), lease_expires_at=None)
+            .returning(Job.id)
+        )
+        job_ids = list(session.exec(stmt).scalars().all())
+        session.commit()
+
+    for job_id in job_ids:
+        _inline_handlers.pop(job_id, None)
+        _events.publish(job_id, JobStatus.CANCELLED.value, batch_id=batch_id)
+        token = _tokens.get(job_id)
+        if token:
+            token.cancel()
+    logger.info(f"Batch {batch_id}: {len(job_ids)} jobs cancelled")
+    return len(job_ids)
+
+
+def get_batch_status(batch_id: str) -> dict[str, Any] | None:
+    """
+    Aggregate state of a batch
+
+    Returns:
+        dict with total, per-status counts and mean progress
+        None if no job has this batch ID
+    """
+    engine = get_engine()
+    with Session(engine) as session:
+        rows = session.exec(select(Job.id, Job.status, Job.progress).where(Job.batch_id == batch_id)).all()
+    if not rows:
+        return None
+
+    live = _progress.snapshot()
+    counts = {status.value: 0 for status in JobStatus}
+    progress = 0.0
+    for job_id, status, stored in rows:
+        counts[status.value] += 1
+        progress += live.get(job_id, stored) if status == JobStatus.RUNNING else stored
+
+    return {
+        "batch_id": batch_id,
+        "total": len(rows),
+        "counts": counts,
+        "progress": progress / len(rows),
+        "done": counts[JobStatus.PENDING.value] == 0 and counts[JobStatus.RUNNING.value] == 0,
+    }
+
+
 def get_active_jobs() -> list[dict[str, Any]]:
     """Get list of all active (pending/running) jobs"""
     engine = get_engine()
@@ -227,13 +822,14 @@ def get_active_jobs() -> list[dict[str, Any]]:
         # Query jobs with PENDING or RUNNING status
         statement = select(Job).where((Job.status == JobStatus.PENDING) | (Job.status == JobStatus.RUNNING))
         jobs = session.exec(statement).all()
+        live = _progress.snapshot()
 
         return [
             {
                 "id": job.id,
                 "kind": job.kind.value,
                 "status": job.status.value,
-                "progress": job.progress,
+                "progress": live.get(job.id, job.progress) if job.status == JobStatus.RUNNING else job.progress,
                 "created_at": job.created_at.isoformat() if job.created_at else None,
             }
             for job in jobs
@@ -0,0 +1,211 @@
+"""
+Job Scheduler - Admission Control
+
+Weighted worker slots per JobKind so heavy jobs cannot starve cheap ones
+
+Every job kind has a cost (CPU slots, estimated peak RAM). A job is admitted
+only while its kind is under its concurrency limit and the running jobs fit
+in the CPU/RAM budget derived from probe_hardware(). A few worker threads are
+reserved for INTERACTIVE jobs, so a 500-image BG_REMOVE batch still leaves
+room for the thumbnails the UI is waiting on.
+"""
+
+import threading
+from dataclasses import dataclass
+from typing import Any
+
+from app.backend.models.entities import JobKind, JobPriority
+from app.core.config import settings
+from app.core.logging import get_logger
+
+logger = get_logger(__name__)
+
+
+@dataclass(frozen=True)
+class JobCost:
+    """Resources one running job of a kind is expected to use"""
+
+    cpu: int  # Cores kept busy
+    ram_gb: float  # Peak resident memory
+
+
+JOB_COSTS: dict[JobKind, JobCost] = {
+    JobKind.BG_REMOVE: JobCost(cpu=2, ram_gb=1.5),  # ONNX session + full-size RGBA buffers
+    JobKind.UPSCALE: JobCost(cpu=2, ram_gb=2.0),
+    JobKind.TRANSCODE: JobCost(cpu=2, ram_gb=0.5),  # ffmpeg is multithreaded
+    JobKind.NORMALIZE_AUDIO: JobCost(cpu=1, ram_gb=0.25),
+    JobKind.THUMBNAIL: JobCost(cpu=1, ram_gb=0.1),
+    JobKind.EXPORT_PACK: JobCost(cpu=1, ram_gb=0.25),
+}
+
+# Wall-clock limit per running job (seconds); JOB_TIMEOUTS overrides
+JOB_TIMEOUTS: dict[JobKind, int] = {
+    JobKind.BG_REMOVE: 600,
+    JobKind.UPSCALE: 1800,
+    JobKind.TRANSCODE: 3600,
+    JobKind.NORMALIZE_AUDIO: 600,
+    JobKind.THUMBNAIL: 120,
+    JobKind.EXPORT_PACK: 1800,
+}
+
+# Kinds claimed ahead of batch work when no priority is given
+DEFAULT_PRIORITIES: dict[JobKind, JobPriority] = {
+    JobKind.THUMBNAIL: JobPriority.INTERACTIVE,
+}
+
+
+def default_priority(kind: JobKind) -> JobPriority:
+    """Priority used when enqueue_job() is not given one"""
+    return DEFAULT_PRIORITIES.get(kind, JobPriority.BATCH)
+
+
+def job_timeout(kind: JobKind) -> int:
+    """Wall-clock limit in seconds for one run of a job kind"""
+    overrides = parse_kind_limits(settings.job_timeouts)
+    return overrides.get(kind, JOB_TIMEOUTS.get(kind, 600))
+
+
+def parse_kind_limits(value: str) -> dict[JobKind, int]:
+    """
+    Parse a "kind=value,kind=value" override string
+
+    Args:
+        value: e.g. "bg_remove=1,upscale=1"
+
+    Returns:
+        Per-kind integer values (unknown kinds are ignored with a warning)
+    """
+    limits: dict[JobKind, int] = {}
+    for item in value.split(","):
+        if not item.strip():
+            continue
+        name, _, limit = item.partition("=")
+        try:
+            limits[JobKind(name.strip())] = max(1, int(limit))
+        except ValueError:
+            logger.warning(f"Ignoring invalid job kind limit: {item.strip()!r}")
+    return limits
+
+
+class SlotScheduler:
+    """
+    Tracks running jobs and decides whether another one may start
+
+    Thread-safe: acquire() runs on the dispatcher thread, release() on the
+    worker thread that finished the job.
+    """
+
+    def __init__(
+        self,
+        total_slots: int,
+        cpu_budget: int,
+        ram_budget_gb: float,
+        interactive_reserve: int = 1,
+        kind_limits: dict[JobKind, int] | None = None,
+    ):
+        self.total_slots = max(1, total_slots)
+        self.cpu_budget = max(1, cpu_budget)
+        self.ram_budget_gb = ram_budget_gb
+        self.interactive_reserve = min(interactive_reserve, self.total_slots - 1)
+
+        self.kind_limits: dict[JobKind, int] = {}
+        for kind, cost in JOB_COSTS.items():
+            by_cpu = self.cpu_budget // cost.cpu
+            by_ram = int(ram_budget_gb // cost.ram_gb)
+            self.kind_limits[kind] = max(1, min(self.total_slots, by_cpu, by_ram))
+        self.kind_limits.update(kind_limits or {})
+
+        self._lock = threading.Lock()
+        self._running: dict[JobKind, int] = dict.fromkeys(JobKind, 0)
+        self._cpu_used = 0
+        self._ram_used = 0.0
+
+    @classmethod
+    def from_hardware(cls, hardware: dict[str, Any] | None = None) -> "SlotScheduler":
+        """
+        Build admission limits from the machine's cores and free RAM
+
+        Args:
+            hardware: probe_hardware() result (probed if omitted)
+        """
+        if hardware is None:
+            from app.core.probe import probe_hardware
+
+            hardware = probe_hardware()
+
+        scheduler = cls(
+            total_slots=settings.worker_threads,
+            cpu_budget=hardware["cpu_cores_physical"],
+            ram_budget_gb=hardware["ram_available_gb"] * settings.job_ram_fraction,
+            interactive_reserve=settings.job_interactive_slots,
+            kind_limits=parse_kind_limits(settings.job_kind_limits),
+        )
+        limits = {kind.value: limit for kind, limit in scheduler.kind_limits.items()}
+        logger.info(
+            f"Job scheduler: {scheduler.total_slots} slots, {scheduler.cpu_budget} cores, "
+            f"{scheduler.ram_budget_gb:.1f} GB RAM; limits={limits}"
+        )
+        return scheduler
+
+    @property
+    def running(self) -> int:
+        """Number of admitted jobs"""
+        return sum(self._running.values())
+
+    def free_slots(self, priority: int = JobPriority.INTERACTIVE) -> int:
+        """Worker threads still available to jobs of this priority"""
+        reserve = 0 if priority <= JobPriority.INTERACTIVE else self.interactive_reserve
+        return max(0, self.total_slots - reserve - self.running)
+
+    def acquire(self, kind: JobKind, priority: int = JobPriority.BATCH) -> bool:
+        """
+        Reserve resources for one job
+
+        The first job always fits, so a kind costing more than the whole
+        budget still makes progress (one at a time). INTERACTIVE jobs only
+        need a free thread and kind slot; they are not held back by batch
+        jobs occupying the CPU/RAM budget.
+
+        Returns:
+            True if the job may start (call release() when it ends)
+        """
+        cost = JOB_COSTS.get(kind, JobCost(cpu=1, ram_gb=0.25))
+        with self._lock:
+            if self.free_slots(priority) <= 0:
+                return False
+            if self._running[kind] >= self.kind_limits.get(kind, self.total_slots):
+                return False
+            if (
+                priority > JobPriority.INTERACTIVE
+                and self.running
+                and (self._cpu_used + cost.cpu > self.cpu_budget or self._ram_used + cost.ram_gb > self.ram_budget_gb)
+            ):
+                return False
+
+            self._running[kind] += 1
+            self._cpu_used += cost.cpu
+            self._ram_used += cost.ram_gb
+            return True
+
+    def release(self, kind: JobKind):
+        """Return the resources of a finished (or unclaimed) job"""
+        cost = JOB_COSTS.get(kind, JobCost(cpu=1, ram_gb=0.25))
+        with self._lock:
+            if self._running[kind] == 0:
+                return
+            self._running[kind] -= 1
+            self._cpu_used -= cost.cpu
+            self._ram_used = max(0.0, self._ram_used - cost.ram_gb)
+
+    def get_stats(self) -> dict[str, Any]:
+        """Current usage for diagnostics"""
+        with self._lock:
+            return {
+                "total_slots": self.total_slots,
+                "running": {kind.value: count for kind, count in self._running.items() if count},
+                "cpu_used": self._cpu_used,
+                "cpu_budget": self.cpu_budget,
+                "ram_used_gb": round(self._ram_used, 2),
+                "ram_budget_gb": round(self.ram_budget_gb, 2),
+                "kind_limits": {kind.value: limit for kind, limit in self.kind_limits.items()},
+            }
@@ -0,0 +1,98 @@
+"""
+SQLite Commit Throughput Benchmark
+Compare the default SQLite setup with the tuned profile from app/core/db.py
+
+Simulates the app's write pattern: several threads (job workers, watcher,
+API) each committing small transactions (job progress updates) against one
+database file, while one thread keeps reading (UI grid refresh).
+
+To run:
+    python -m benchmarks.bench_db_commits --threads 6 --commits 300
+"""
+
+import argparse
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from sqlalchemy.exc import OperationalError
+from sqlmodel import Session, SQLModel, select, update
+
+from app.backend.models.entities import Asset, AssetType, Job, JobKind
+from app.core.db import create_sqlite_engine, sqlite_pragmas
+
+
+def _run(db_path: Path, pragmas: dict | None, threads: int, commits: int) -> dict:
+    """Run the mixed workload once and return throughput metrics"""
+    engine = create_sqlite_engine(db_path, pragmas=pragmas)
+    SQLModel.metadata.create_all(engine)
+
+    with Session(engine) as session:
+        session.add_all(Asset(path=f"/bench/{idx}.png", type=AssetType.IMAGE) for idx in range(2000))
+        jobs = [Job(kind=JobKind.THUMBNAIL) for _ in range(threads)]
+        session.add_all(jobs)
+        session.commit()
+        job_ids = [job.id for job in jobs]
+
+    locked = 0
+    done = threading.Event()
+    lock = threading.Lock()
+
+    def writer(job_id: int):
+        nonlocal locked
+        for step in range(commits):
+            try:
+                with Session(engine) as session:
+                    session.exec(update(Job).where(Job.id == job_id).values(progress=step / commits))
+                    session.commit()
+            except OperationalError:
+                with lock:
+                    locked += 1
+
+    def reader():
+        while not done.is_set():
+            with Session(engine) as session:
+                session.exec(select(Asset).where(Asset.type == AssetType.IMAGE).limit(500)).all()
+
+    reader_thread = threading.Thread(target=reader)
+    reader_thread.start()
+    started = time.perf_counter()
+    writers = [threading.Thread(target=writer, args=(job_id,)) for job_id in job_ids]
+    for thread in writers:
+        thread.start()
+    for thread in writers:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    done.set()
+    reader_thread.join()
+    engine.dispose()
+
+    total = threads * commits
+    return {
+        "commits": total - locked,
+        "locked_errors": locked,
+        "seconds": round(elapsed, 3),
+        "commits_per_sec": round((total - locked) / elapsed, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--threads", type=int, default=6, help="Concurrent writer threads")
+    parser.add_argument("--commits", type=int, default=300, help="Commits per writer thread")
+    args = parser.parse_args()
+
+    profiles = {
+        # Before: rollback journal, synchronous=FULL, sqlite3's 5s lock wait
+        "default": None,
+        "tuned": sqlite_pragmas(),
+    }
+    for name, pragmas in profiles.items():
+        with tempfile.TemporaryDirectory() as tmpdir:
+            result = _run(Path(tmpdir) / "bench.db", pragmas, args.threads, args.commits)
+        print(f"{name:>8}: {result}")
+
+
+if __name__ == "__main__":
+    main()
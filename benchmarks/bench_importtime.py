@@ -0,0 +1,92 @@
+"""
+Import-Time Regression Benchmark
+Measure cold import cost of the app entry points and catch eager heavy imports
+
+Each module is imported in a fresh interpreter with `python -X importtime`.
+Reports the cumulative import time and fails if a heavy optional dependency
+(rembg, onnxruntime, cv2, pydub, numpy) is loaded at import, or if the import
+took longer than --max-ms.
+
+To run:
+    python -m benchmarks.bench_importtime
+    python -m benchmarks.bench_importtime --max-ms 1500 --runs 5
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+ENTRY_POINTS = ["app.backend.server", "app.ui.app"]
+
+# Must only be imported when a job actually needs them
+HEAVY_MODULES = ["rembg", "onnxruntime", "cv2", "pydub", "numpy"]
+
+
+def measure(module: str) -> dict:
+    """
+    Import a module in a fresh interpreter
+
+    Runs from an empty temp directory so any import-time file creation
+    (database, cache folders) shows up in `created_files`.
+
+    Returns:
+        Dict with total_ms, heavy (eagerly imported heavy modules),
+        created_files and error (if the import failed)
+    """
+    probe = f"import sys; import {module}; print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+    with tempfile.TemporaryDirectory() as workdir:
+        env = {**os.environ, "PYTHONPATH": str(REPO_ROOT), "DB_PATH": str(Path(workdir) / "podstudio.db")}
+        result = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", probe],
+            cwd=workdir,
+            env=env,
+            capture_output=True,
+            text=True,
+        )
+        created = sorted(p.name for p in Path(workdir).iterdir())
+
+    if result.returncode != 0:
+        return {"error": result.stderr.strip().splitlines()[-1] if result.stderr else "import failed"}
+
+    total_us = 0
+    for line in result.stderr.splitlines():
+        # "import time:  self [us] | cumulative | imported package"
+        parts = line.split("|")
+        if len(parts) == 3 and parts[2].strip() == module:
+            total_us = int(parts[1])
+    heavy = [m for m in result.stdout.strip().split(",") if m]
+    return {"total_ms": total_us / 1000, "heavy": heavy, "created_files": created}
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("modules", nargs="*", default=ENTRY_POINTS, help="Modules to import")
+    parser.add_argument("--runs", type=int, default=3, help="Fresh-interpreter runs per module (median reported)")
+    parser.add_argument("--max-ms", type=float, default=None, help="Fail if the median import exceeds this")
+    args = parser.parse_args()
+
+    failed = False
+    for module in args.modules:
+        runs = [measure(module) for _ in range(args.runs)]
+        if "error" in runs[0]:
+            print(f"{module:>22}: skipped ({runs[0]['error']})")
+            continue
+
+        median_ms = statistics.median(r["total_ms"] for r in runs)
+        heavy, created = runs[0]["heavy"], runs[0]["created_files"]
+        print(f"{module:>22}: {median_ms:8.1f} ms  heavy={heavy or '-'}  created={created or '-'}")
+
+        if heavy or created or (args.max_ms is not None and median_ms > args.max_ms):
+            failed = True
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
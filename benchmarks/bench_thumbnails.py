@@ -0,0 +1,121 @@
+"""
+Thumbnail Decode Benchmark
+Compare full-size decoding with the reduced-size loader in app/core/thumbnails.py
+
+Builds a corpus of large generator-style outputs (8K JPEG, RGB and RGBA PNG)
+and thumbnails every file with each strategy. Each strategy runs in a fresh
+process so its peak RSS is not inflated by the other.
+
+"full_decode" decodes every file at full size and resamples once (no draft,
+no reduce), "previous" is the old generate_image_thumbnail() (split() of
+every band to flatten alpha), "reduced" is load_thumbnail().
+
+To run:
+    python -m benchmarks.bench_thumbnails --count 4 --width 7680 --height 4320
+"""
+
+import argparse
+import multiprocessing
+import tempfile
+import time
+from pathlib import Path
+
+from PIL import Image
+
+from app.core.thumbnails import THUMB_SIZE, load_thumbnail
+
+
+def _peak_rss_mb() -> float:
+    """Peak resident set size of this process in MB"""
+    try:
+        import resource
+
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024  # KB on Linux
+    except ImportError:
+        import psutil
+
+        return psutil.Process().memory_info().peak_wset / 1024 / 1024  # Windows
+
+
+def _full_decode(img: Image.Image, size: tuple[int, int]) -> Image.Image:
+    """Reference: full-size decode, single LANCZOS resample"""
+    img.load()
+    img.thumbnail(size, Image.Resampling.LANCZOS, reducing_gap=None)
+    return img
+
+
+def _previous(img: Image.Image, size: tuple[int, int]) -> Image.Image:
+    """Previous generate_image_thumbnail(): alpha flattened via split()"""
+    if img.mode in ("RGBA", "LA", "P"):
+        background = Image.new("RGB", img.size, (255, 255, 255))
+        if img.mode == "P":
+            img = img.convert("RGBA")
+        background.paste(img, mask=img.split()[-1] if img.mode in ("RGBA", "LA") else None)
+        img = background
+    img.thumbnail(size, Image.Resampling.LANCZOS)
+    return img
+
+
+STRATEGIES = {"full_decode": _full_decode, "previous": _previous, "reduced": load_thumbnail}
+
+
+def _make_corpus(directory: Path, count: int, width: int, height: int) -> list[Path]:
+    """Write noisy large images (noise defeats PNG compression like real renders)"""
+    base = Image.effect_noise((width, height), 64).convert("RGB")
+    paths = []
+    for idx in range(count):
+        jpeg = directory / f"render_{idx}.jpg"
+        base.save(jpeg, "JPEG", quality=92)
+        png = directory / f"render_{idx}.png"
+        base.save(png, "PNG", compress_level=1)
+        rgba = directory / f"cutout_{idx}.png"
+        cutout = base.copy()
+        cutout.putalpha(Image.linear_gradient("L").resize((width, height)))
+        cutout.save(rgba, "PNG", compress_level=1)
+        paths += [jpeg, png, rgba]
+    return paths
+
+
+def _run(strategy: str, paths: list[str]) -> dict:
+    """Thumbnail every file with one strategy (runs in a child process)"""
+    rss_before = _peak_rss_mb()  # Interpreter + imports
+    thumb = STRATEGIES[strategy]
+    per_format: dict[str, float] = {}
+    started = time.perf_counter()
+    for path in paths:
+        file_started = time.perf_counter()
+        with Image.open(path) as img:
+            key = f"{img.format}/{img.mode}"
+            thumb(img, THUMB_SIZE).convert("RGB")
+        per_format[key] = per_format.get(key, 0.0) + time.perf_counter() - file_started
+    return {
+        "seconds": round(time.perf_counter() - started, 3),
+        "peak_rss_mb": round(_peak_rss_mb(), 1),
+        "decode_rss_mb": round(_peak_rss_mb() - rss_before, 1),
+        "seconds_by_format": {key: round(value, 3) for key, value in sorted(per_format.items())},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--count", type=int, default=4, help="Images per format")
+    parser.add_argument("--width", type=int, default=7680)
+    parser.add_argument("--height", type=int, default=4320)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        # Everything runs in children: Linux keeps a process's peak RSS across the fork/exec of spawn
+        context = multiprocessing.get_context("spawn")
+        with context.Pool(1) as pool:
+            paths = pool.apply(_make_corpus, (Path(tmpdir), args.count, args.width, args.height))
+        paths = [str(path) for path in paths]
+        print(f"corpus: {len(paths)} files at {args.width}x{args.height}")
+
+        for strategy in STRATEGIES:
+            with context.Pool(1) as pool:
+                result = pool.apply(_run, (strategy, paths))
+            print(f"{strategy:>11}: {result}")
+
+
+if __name__ == "__main__":
+    main()
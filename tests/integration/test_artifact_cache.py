@@ -0,0 +1,142 @@
+"""
+Integration tests for the derived artifact cache
+
+Tests key sensitivity, LRU eviction by size and that a repeated background
+removal reuses its cached output (rembg is replaced by a fast stand-in)
+"""
+
+import tempfile
+from pathlib import Path
+
+import pytest
+from PIL import Image
+from sqlmodel import Session
+
+from app.backend.models.entities import Asset, AssetType, Job, JobKind
+from app.core.artifacts import artifact_key, evict_artifacts, get_artifact_stats, lookup_artifact, store_artifact
+from app.core.db import create_db_and_tables, get_engine, reset_engine
+from app.workers.jobs import bg_remove
+
+calls: list[str] = []
+
+
+def _fake_remove_background(input_path: str, output_path: str, model_name: str) -> str:  # noqa: ARG001
+    calls.append(input_path)
+    with Image.open(input_path) as img:
+        img.convert("RGBA").save(output_path, "PNG")
+    return output_path
+
+
+@pytest.fixture
+def temp_workspace(monkeypatch):
+    """Create temporary workspace with database, Work dir and fake rembg"""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        workspace = Path(tmpdir)
+
+        from app.core import config
+
+        monkeypatch.setattr(config.settings, "db_path", str(workspace / "test.db"))
+        monkeypatch.setattr(bg_remove, "WORK_DIR", workspace / "Work" / "edits")
+        monkeypatch.setattr(bg_remove, "remove_background", _fake_remove_background)
+        reset_engine()
+        create_db_and_tables()
+        calls.clear()
+
+        yield workspace
+
+        reset_engine()
+
+
+def _write(path: Path, size: int) -> Path:
+    path.write_bytes(b"x" * size)
+    return path
+
+
+def test_key_covers_params_and_version():
+    """Test that any input to the key changes it"""
+    base = artifact_key("abc", JobKind.THUMBNAIL, "audio_waveform", {"width": 800}, "v1")
+
+    assert base == artifact_key("abc", JobKind.THUMBNAIL, "audio_waveform", {"width": 800}, "v1")
+    assert base != artifact_key("abd", JobKind.THUMBNAIL, "audio_waveform", {"width": 800}, "v1")
+    assert base != artifact_key("abc", JobKind.THUMBNAIL, "video_poster", {"width": 800}, "v1")
+    assert base != artifact_key("abc", JobKind.THUMBNAIL, "audio_waveform", {"width": 400}, "v1")
+    assert base != artifact_key("abc", JobKind.THUMBNAIL, "audio_waveform", {"width": 800}, "v2")
+
+
+def test_lookup_store_and_lru_eviction(temp_workspace):
+    """Test hits, dropping vanished files and evicting least recently used first"""
+    keys = [artifact_key(f"hash-{i}", JobKind.BG_REMOVE, None, None, "v1") for i in range(3)]
+    paths = [_write(temp_workspace / f"out{i}.png", 100) for i in range(3)]
+    for i, (key, path) in enumerate(zip(keys, paths, strict=True)):
+        store_artifact(key, f"hash-{i}", JobKind.BG_REMOVE, None, "v1", path)
+
+    assert lookup_artifact(keys[0]) == paths[0]  # Now most recently used
+    assert lookup_artifact("missing") is None
+
+    assert evict_artifacts(max_bytes=200) == 1
+    assert not paths[1].exists()
+    assert lookup_artifact(keys[1]) is None
+    assert lookup_artifact(keys[0]) == paths[0]
+
+    paths[2].unlink()
+    assert lookup_artifact(keys[2]) is None
+    stats = get_artifact_stats()
+    assert stats["artifacts"] == 1
+    assert stats["size_bytes"] == 100
+
+
+def test_repeated_bg_remove_reuses_output(temp_workspace):
+    """Test that a second job on identical content does no work and no _1 file"""
+    image = temp_workspace / "red.png"
+    Image.new("RGB", (16, 16), "red").save(image)
+    copy = temp_workspace / "red_copy.png"
+    Image.new("RGB", (16, 16), "red").save(copy)
+
+    with Session(get_engine()) as session:
+        assets = [
+            Asset(path=str(image), type=AssetType.IMAGE, hash="hash-red"),
+            Asset(path=str(copy), type=AssetType.IMAGE, hash="hash-red"),
+        ]
+        session.add_all(assets)
+        session.commit()
+        jobs = [Job(kind=JobKind.BG_REMOVE, asset_id=asset.id) for asset in (*assets, assets[0])]
+        session.add_all(jobs)
+        session.commit()
+        job_ids = [job.id for job in jobs]
+
+    outputs = [bg_remove.run_bg_remove_job(job_id) for job_id in job_ids]
+
+    assert len(calls) == 1
+    assert outputs[0] == outputs[1] == outputs[2]
+    assert list(bg_remove.WORK_DIR.iterdir()) == [outputs[0]]
+
+
+def test_model_change_does_not_reuse_old_output(temp_workspace, monkeypatch):
+    """Test that a completed job made with another model is not served"""
+    from app.backend.models.entities import JobStatus
+    from app.core import config
+
+    image = temp_workspace / "blue.png"
+    Image.new("RGB", (16, 16), "blue").save(image)
+    with Session(get_engine()) as session:
+        asset = Asset(path=str(image), type=AssetType.IMAGE, hash="hash-blue")
+        session.add(asset)
+        session.commit()
+        jobs = [Job(kind=JobKind.BG_REMOVE, asset_id=asset.id) for _ in range(2)]
+        session.add_all(jobs)
+        session.commit()
+        job_ids = [job.id for job in jobs]
+
+    first = bg_remove.run_bg_remove_job(job_ids[0])
+    with Session(get_engine()) as session:
+        job = session.get(Job, job_ids[0])
+        job.status = JobStatus.COMPLETED
+        job.result_path = str(first)
+        session.add(job)
+        session.commit()
+
+    monkeypatch.setattr(config.settings, "bg_remove_model", "isnet-general-use")
+    second = bg_remove.run_bg_remove_job(job_ids[1])
+
+    assert len(calls) == 2
+    assert second != first
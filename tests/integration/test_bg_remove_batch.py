@@ -0,0 +1,109 @@
+"""
+Integration tests for batch background removal
+
+Tests per-item results, in-batch content dedup and dispatch through the
+queue (rembg itself is replaced by a fast stand-in)
+"""
+
+import tempfile
+import time
+from pathlib import Path
+
+import pytest
+from PIL import Image
+from sqlmodel import Session
+
+from app.backend.models.entities import Asset, AssetType, Job, JobKind
+from app.core.db import create_db_and_tables, get_engine, reset_engine
+from app.workers import queue
+from app.workers.jobs import bg_remove
+from app.workers.queue import enqueue_job, get_job_status
+from app.workers.scheduler import SlotScheduler
+
+calls: list[str] = []
+
+
+def _fake_remove_background(input_path: str, output_path: str, model_name: str) -> str:  # noqa: ARG001
+    calls.append(input_path)
+    if "broken" in input_path:
+        raise OSError("cannot identify image file")
+    with Image.open(input_path) as img:
+        img.convert("RGBA").save(output_path, "PNG")
+    return output_path
+
+
+@pytest.fixture
+def temp_workspace(monkeypatch):
+    """Create temporary workspace with database, Work dir and fake rembg"""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        workspace = Path(tmpdir)
+
+        from app.core import config
+
+        monkeypatch.setattr(config.settings, "db_path", str(workspace / "test.db"))
+        monkeypatch.setattr(config.settings, "job_poll_interval_sec", 0.05)
+        monkeypatch.setattr(bg_remove, "WORK_DIR", workspace / "Work" / "edits")
+        monkeypatch.setattr(bg_remove, "remove_background", _fake_remove_background)
+        queue.set_scheduler(SlotScheduler(total_slots=2, cpu_budget=4, ram_budget_gb=8.0))
+        reset_engine()
+        create_db_and_tables()
+        calls.clear()
+
+        yield workspace
+
+        queue.shutdown_executor()
+        queue.set_scheduler(None)
+        reset_engine()
+
+
+def _add_asset(workspace: Path, name: str, color: str, content_hash: str | None) -> int:
+    path = workspace / name
+    if color:
+        Image.new("RGB", (16, 16), color).save(path)
+    with Session(get_engine()) as session:
+        asset = Asset(path=str(path), type=AssetType.IMAGE, hash=content_hash)
+        session.add(asset)
+        session.commit()
+        return asset.id
+
+
+def test_batch_reports_per_item_results(temp_workspace):
+    """Test that one batch job processes every image and records each outcome"""
+    red = _add_asset(temp_workspace, "red.png", "red", "hash-red")
+    red_copy = _add_asset(temp_workspace, "red_copy.png", "red", "hash-red")
+    blue = _add_asset(temp_workspace, "blue.png", "blue", "hash-blue")
+    broken = _add_asset(temp_workspace, "broken.png", "green", "hash-broken")
+    gone = _add_asset(temp_workspace, "gone.png", "", "hash-gone")
+    asset_ids = [red, red_copy, blue, broken, gone, 999]
+
+    with Session(get_engine()) as session:
+        job = Job(kind=JobKind.BG_REMOVE, params_json='{"type": "batch"}')
+        session.add(job)
+        session.commit()
+        job_id = job.id
+
+    bg_remove.run_bg_remove_batch(job_id, asset_ids)
+
+    results = get_job_status(job_id)["results"]
+    assert [result["asset_id"] for result in results] == asset_ids
+    assert [result["status"] for result in results] == ["done", "reused", "done", "failed", "failed", "failed"]
+    assert results[1]["output"] == results[0]["output"]
+    assert Path(results[2]["output"]).exists()
+    assert "not found" in results[5]["error"]
+    assert len(calls) == 3  # Duplicate content processed once, missing files never
+
+
+def test_batch_job_runs_through_queue(temp_workspace):
+    """Test that the batch variant is dispatched by the registry"""
+    asset_ids = [_add_asset(temp_workspace, f"img{idx}.png", "red", f"hash-{idx}") for idx in range(5)]
+
+    job_id = enqueue_job(kind=JobKind.BG_REMOVE, params={"type": "batch", "asset_ids": asset_ids, "timeout_sec": 60})
+
+    deadline = time.monotonic() + 10
+    while get_job_status(job_id)["status"] != "completed" and time.monotonic() < deadline:
+        time.sleep(0.05)
+
+    status = get_job_status(job_id)
+    assert status["status"] == "completed"
+    assert status["progress"] == 1.0
+    assert [result["status"] for result in status["results"]] == ["done"] * 5
@@ -221,3 +221,80 @@ def test_server_startup_creates_database(monkeypatch):
             assert "assets" in table_names
             assert "packs" in table_names
             assert "jobs" in table_names
+
+
+def test_connections_use_sqlite_profile(temp_db_path, monkeypatch):
+    """Test that every pooled connection gets the configured pragmas"""
+    from app.core import config
+    from app.core.db import read_pragmas
+
+    monkeypatch.setattr(config.settings, "db_path", str(temp_db_path))
+    monkeypatch.setattr(config.settings, "db_busy_timeout_ms", 1234)
+    reset_engine()
+    create_db_and_tables()
+
+    pragmas = read_pragmas(["journal_mode", "synchronous", "busy_timeout", "cache_size"])
+    assert pragmas["journal_mode"] == "wal"
+    assert pragmas["synchronous"] == 1  # NORMAL
+    assert pragmas["busy_timeout"] == 1234
+    assert pragmas["cache_size"] == -config.settings.db_cache_size_mb * 1024
+
+    # A second concurrently checked-out connection is configured too
+    engine = get_engine()
+    with engine.connect() as first, engine.connect() as second:
+        assert first.exec_driver_sql("PRAGMA busy_timeout").scalar() == 1234
+        assert second.exec_driver_sql("PRAGMA busy_timeout").scalar() == 1234
+    reset_engine()
+
+
+# Schema of the first release (before columns were added to assets and jobs)
+BASELINE_SCHEMA = """
+CREATE TABLE assets (
+    id INTEGER NOT NULL, path VARCHAR NOT NULL, type VARCHAR(5) NOT NULL, hash VARCHAR,
+    width INTEGER, height INTEGER, duration FLOAT, samplerate INTEGER, theme VARCHAR, source VARCHAR,
+    provenance VARCHAR(13) NOT NULL, approved BOOLEAN NOT NULL, created_at DATETIME NOT NULL,
+    updated_at DATETIME NOT NULL, PRIMARY KEY (id)
+);
+CREATE UNIQUE INDEX ix_assets_path ON assets (path);
+CREATE TABLE jobs (
+    id INTEGER NOT NULL, kind VARCHAR(15) NOT NULL, asset_id INTEGER, pack_id INTEGER, params_json VARCHAR,
+    status VARCHAR(9) NOT NULL, progress FLOAT NOT NULL, result_path VARCHAR, error_message VARCHAR,
+    created_at DATETIME NOT NULL, started_at DATETIME, completed_at DATETIME, PRIMARY KEY (id)
+);
+INSERT INTO assets VALUES (1, '/old/a.png', 'IMAGE', 'abc', 10, 10, NULL, NULL, NULL, NULL,
+    'UNKNOWN', 0, '2024-01-01 00:00:00', '2024-01-01 00:00:00');
+INSERT INTO jobs VALUES (1, 'BG_REMOVE', 1, NULL, NULL, 'PENDING', 0.0, NULL, NULL,
+    '2024-01-01 00:00:00', NULL, NULL);
+"""
+
+
+def test_existing_database_is_upgraded(temp_db_path, monkeypatch):
+    """Test that a database from an older release gains the new columns and indexes"""
+    import sqlite3
+
+    from app.backend.models.entities import JobPriority
+    from app.core import config
+    from app.core.db import migrate_schema
+
+    connection = sqlite3.connect(temp_db_path)
+    connection.executescript(BASELINE_SCHEMA)
+    connection.close()
+
+    monkeypatch.setattr(config.settings, "db_path", str(temp_db_path))
+    reset_engine()
+    create_db_and_tables()
+    engine = get_engine()
+
+    with Session(engine) as session:
+        asset = session.exec(select(Asset)).one()
+        assert (asset.path, asset.missing, asset.quick_hash) == ("/old/a.png", False, None)
+        job = session.exec(select(Job)).one()
+        assert (job.priority, job.attempts, job.worker_id) == (JobPriority.BATCH, 0, None)
+
+        session.add(Job(kind=job.kind, asset_id=asset.id))
+        session.commit()
+
+    indexes = {index["name"] for index in inspect(engine).get_indexes("jobs")}
+    assert {"ix_jobs_priority", "ix_jobs_batch_id", "ix_jobs_worker_id"} <= indexes
+    assert migrate_schema(engine) == []  # Idempotent
+    reset_engine()
@@ -0,0 +1,186 @@
+"""
+Integration tests for content-hash deduplication
+
+Tests canonical linking at ingest, deferred full hashing of large files and
+output reuse across duplicate assets
+"""
+
+import tempfile
+import threading
+import time
+from datetime import UTC, datetime
+from pathlib import Path
+
+import pytest
+from sqlmodel import Session, select
+
+from app.backend.models.entities import Asset, AssetType, Job, JobKind, JobStatus
+from app.core.db import create_db_and_tables, get_engine, reset_engine
+from app.core.dedup import find_reusable_output, get_duplicates, rebuild_dedup_index
+from app.core.ingest import IngestPipeline
+
+# Image files need a real signature to be detected as images
+PNG = b"\x89PNG\r\n\x1a\n"
+
+
+@pytest.fixture
+def temp_workspace(monkeypatch):
+    """Create temporary workspace with database and two asset folders"""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        workspace = Path(tmpdir)
+        (workspace / "a").mkdir()
+        (workspace / "b").mkdir()
+
+        from app.core import config
+
+        monkeypatch.setattr(config.settings, "db_path", str(workspace / "test.db"))
+        reset_engine()
+        create_db_and_tables()
+
+        yield workspace
+
+
+def _ingest(*paths: Path):
+    pipeline = IngestPipeline(batch_size=10, batch_window=10.0)
+    pipeline.submit_many(paths)
+    return pipeline.flush()
+
+
+def test_copies_link_to_canonical_asset(temp_workspace):
+    """Test that identical content in two folders is linked at ingest"""
+    first = temp_workspace / "a" / "dragon.png"
+    first.write_bytes(PNG + b"same pixels")
+    unique = temp_workspace / "a" / "knight.png"
+    unique.write_bytes(PNG + b"other pixels")
+    assert _ingest(first, unique) == 2
+
+    copy = temp_workspace / "b" / "dragon_copy.png"
+    copy.write_bytes(PNG + b"same pixels")
+    assert _ingest(copy) == 1
+
+    with Session(get_engine()) as session:
+        by_name = {Path(a.path).name: a for a in session.exec(select(Asset)).all()}
+
+    assert by_name["dragon.png"].canonical_id is None
+    assert by_name["knight.png"].canonical_id is None
+    assert by_name["dragon_copy.png"].canonical_id == by_name["dragon.png"].id
+
+    duplicates = get_duplicates(by_name["dragon_copy.png"].id)
+    assert [a.id for a in duplicates] == [by_name["dragon.png"].id]
+
+
+def test_large_files_hash_only_on_fingerprint_collision(temp_workspace, monkeypatch):
+    """Test that files above the full-hash limit are only fully hashed when a copy appears"""
+    from app.core import config
+
+    monkeypatch.setattr(config.settings, "ingest_full_hash_max_mb", 0)
+
+    first = temp_workspace / "a" / "render.mp4"
+    first.write_bytes(b"frames" * 100)
+    unique = temp_workspace / "a" / "other.mp4"
+    unique.write_bytes(b"other frames" * 100)
+    assert _ingest(first, unique) == 2
+
+    with Session(get_engine()) as session:
+        rows = session.exec(select(Asset)).all()
+    assert all(a.quick_hash for a in rows)
+    assert all(a.hash is None for a in rows)
+
+    copy = temp_workspace / "b" / "render_copy.mp4"
+    copy.write_bytes(b"frames" * 100)
+    assert _ingest(copy) == 1
+
+    with Session(get_engine()) as session:
+        by_name = {Path(a.path).name: a for a in session.exec(select(Asset)).all()}
+
+    assert by_name["render.mp4"].hash == by_name["render_copy.mp4"].hash is not None
+    assert by_name["render_copy.mp4"].canonical_id == by_name["render.mp4"].id
+    assert by_name["other.mp4"].hash is None
+
+
+def test_collision_hashing_does_not_block_ingest(temp_workspace, monkeypatch):
+    """Test that full hashes of colliding large files are computed on the hash pool"""
+    from app.core import config, ingest
+
+    monkeypatch.setattr(config.settings, "ingest_full_hash_max_mb", 0)
+    release = threading.Event()
+    threads = []
+    resolve = ingest.resolve_quick_hash_collisions
+
+    def slow_resolve(quick_hashes):
+        threads.append(threading.current_thread().name)
+        release.wait(timeout=10)
+        return resolve(quick_hashes)
+
+    monkeypatch.setattr(ingest, "resolve_quick_hash_collisions", slow_resolve)
+
+    first = temp_workspace / "a" / "render.mp4"
+    copy = temp_workspace / "b" / "render_copy.mp4"
+    for path in (first, copy):
+        path.write_bytes(b"frames" * 100)
+
+    pipeline = IngestPipeline(batch_size=1, batch_window=0.01, hash_workers=3)
+    pipeline.start()
+    pipeline.submit_many([first, copy])
+    deadline = time.monotonic() + 5
+    while pipeline.get_stats()["files_inserted"] < 2 and time.monotonic() < deadline:
+        time.sleep(0.02)
+
+    stats = pipeline.get_stats()
+    release.set()
+    pipeline.stop()
+
+    assert stats["files_inserted"] == 2  # Both batches committed while hashing was stalled
+    assert stats["collision_checks"] >= 1
+    assert threads and all(name.startswith("ingest_hash") for name in threads)
+    with Session(get_engine()) as session:
+        original, duplicate = session.exec(select(Asset).order_by(Asset.id)).all()  # Either file may commit first
+    assert original.hash == duplicate.hash is not None
+    assert (original.canonical_id, duplicate.canonical_id) == (None, original.id)
+
+
+def test_rebuild_index_links_existing_rows(temp_workspace):
+    """Test that rows inserted without links are fixed by a rebuild"""
+    with Session(get_engine()) as session:
+        for name in ("x.png", "y.png", "z.png"):
+            session.add(Asset(path=str(temp_workspace / name), type=AssetType.IMAGE, hash="h1"))
+        session.commit()
+
+    assert rebuild_dedup_index() == 2
+
+    with Session(get_engine()) as session:
+        assets = session.exec(select(Asset).order_by(Asset.id)).all()
+        assert assets[0].canonical_id is None
+        assert {a.canonical_id for a in assets[1:]} == {assets[0].id}
+
+
+def test_reusable_output_found_for_duplicate(temp_workspace):
+    """Test that a completed job's output is offered to identical content"""
+    output = temp_workspace / "dragon_nobg.png"
+    output.write_bytes(b"cut out")
+
+    with Session(get_engine()) as session:
+        original = Asset(path=str(temp_workspace / "a" / "dragon.png"), type=AssetType.IMAGE, hash="same")
+        copy = Asset(path=str(temp_workspace / "b" / "dragon.png"), type=AssetType.IMAGE, hash="same")
+        other = Asset(path=str(temp_workspace / "a" / "knight.png"), type=AssetType.IMAGE, hash="other")
+        session.add_all([original, copy, other])
+        session.commit()
+        session.add(
+            Job(
+                kind=JobKind.BG_REMOVE,
+                asset_id=original.id,
+                status=JobStatus.COMPLETED,
+                result_path=str(output),
+                completed_at=datetime.now(UTC),
+            )
+        )
+        session.commit()
+        copy_id, other_id = copy.id, other.id
+
+    assert find_reusable_output(copy_id, JobKind.BG_REMOVE) == output
+    assert find_reusable_output(other_id, JobKind.BG_REMOVE) is None
+    assert find_reusable_output(copy_id, JobKind.THUMBNAIL, variant="video_poster") is None
+
+    # Output deleted from Work/: nothing to reuse
+    output.unlink()
+    assert find_reusable_output(copy_id, JobKind.BG_REMOVE) is None
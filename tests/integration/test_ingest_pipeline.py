@@ -0,0 +1,244 @@
+"""
+Integration tests for the batched ingest pipeline
+
+Tests that watcher events are coalesced and inserted in bulk transactions
+"""
+
+import tempfile
+from pathlib import Path
+
+import pytest
+from sqlmodel import Session, select
+
+from app.backend.models.entities import Asset, AssetProvenance, AssetType
+from app.core.db import create_db_and_tables, get_engine, reset_engine
+from app.core.ingest import IngestPipeline
+
+# Image files need a real signature to be detected as images
+PNG = b"\x89PNG\r\n\x1a\n"
+JPEG = b"\xff\xd8\xff"
+
+
+@pytest.fixture
+def temp_workspace(monkeypatch):
+    """Create temporary workspace with database and watch folder"""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        workspace = Path(tmpdir)
+        watch_folder = workspace / "watch"
+        watch_folder.mkdir()
+
+        from app.core import config
+
+        monkeypatch.setattr(config.settings, "db_path", str(workspace / "test.db"))
+        reset_engine()
+        create_db_and_tables()
+
+        yield watch_folder
+
+
+def test_flush_inserts_batch(temp_workspace):
+    """Test that a flushed batch inserts every new file"""
+    pipeline = IngestPipeline(batch_size=50, batch_window=10.0)
+
+    for idx in range(120):
+        path = temp_workspace / f"image_{idx:03d}.png"
+        path.write_bytes(PNG + f"png {idx}".encode())
+        pipeline.submit(path)
+
+    assert pipeline.pending_count() == 120
+    assert pipeline.flush() == 120
+    assert pipeline.pending_count() == 0
+
+    stats = pipeline.get_stats()
+    assert stats["files_inserted"] == 120
+    assert stats["batches_committed"] == 3  # 50 + 50 + 20
+
+    with Session(get_engine()) as session:
+        assets = session.exec(select(Asset)).all()
+        assert len(assets) == 120
+        assert all(asset.type == AssetType.IMAGE for asset in assets)
+        assert all(asset.hash is not None for asset in assets)
+
+
+def test_duplicate_events_are_coalesced(temp_workspace):
+    """Test that repeated events for one path produce a single insert"""
+    pipeline = IngestPipeline(batch_size=10, batch_window=10.0)
+    path = temp_workspace / "audio.wav"
+    path.write_bytes(b"wav data")
+
+    for _ in range(5):
+        pipeline.submit(path)
+
+    assert pipeline.flush() == 1
+    stats = pipeline.get_stats()
+    assert stats["events_received"] == 5
+    assert stats["events_coalesced"] == 4
+
+
+def test_existing_and_vanished_paths_are_skipped(temp_workspace):
+    """Test that known paths and deleted files are not inserted"""
+    existing = temp_workspace / "existing.png"
+    existing.write_bytes(PNG + b"existing")
+    with Session(get_engine()) as session:
+        session.add(Asset(path=str(existing), type=AssetType.IMAGE, provenance=AssetProvenance.UNKNOWN))
+        session.commit()
+
+    fresh = temp_workspace / "fresh.mp4"
+    fresh.write_bytes(b"mp4")
+
+    pipeline = IngestPipeline(batch_size=10, batch_window=10.0)
+    pipeline.submit_many([existing, fresh, temp_workspace / "vanished.png"])
+
+    assert pipeline.flush() == 1
+    assert pipeline.get_stats()["files_skipped"] == 2
+
+    with Session(get_engine()) as session:
+        assert len(session.exec(select(Asset)).all()) == 2
+
+
+def test_only_inserted_rows_are_probed(temp_workspace):
+    """Test that a row skipped on conflict (inserted concurrently) is not probed again"""
+    raced = temp_workspace / "raced.png"
+    raced.write_bytes(PNG + b"raced")
+    fresh = temp_workspace / "fresh.png"
+    fresh.write_bytes(PNG + b"fresh")
+
+    pipeline = IngestPipeline(batch_size=10, batch_window=10.0)
+    rows = [pipeline._build_row(raced), pipeline._build_row(fresh)]
+    with Session(get_engine()) as session:
+        session.add(Asset(path=str(raced), type=AssetType.IMAGE))  # e.g. by a reconcile scan
+        session.commit()
+
+    assert pipeline._commit(rows) == 1
+    assert pipeline.prober.queued_count() == 1
+    assert pipeline.prober._take_batch() == [(str(fresh), AssetType.IMAGE.value)]
+
+
+def test_background_thread_flushes_after_window(temp_workspace):
+    """Test that a partial batch is flushed once the window expires"""
+    import time
+
+    pipeline = IngestPipeline(batch_size=1000, batch_window=0.1)
+    pipeline.start()
+    try:
+        path = temp_workspace / "late.jpg"
+        path.write_bytes(JPEG + b"jpg")
+        pipeline.submit(path)
+
+        deadline = time.time() + 5
+        while time.time() < deadline and pipeline.get_stats()["files_inserted"] == 0:
+            time.sleep(0.05)
+
+        assert pipeline.get_stats()["files_inserted"] == 1
+    finally:
+        pipeline.stop()
+
+
+def test_reconcile_ingests_updates_and_marks_missing(temp_workspace):
+    """Test that reconciliation syncs the assets table with the folder"""
+    from app.core.reconcile import reconcile_folder
+
+    kept = temp_workspace / "kept.png"
+    kept.write_bytes(PNG + b"kept")
+    changed = temp_workspace / "changed.png"
+    changed.write_bytes(PNG + b"before")
+    gone = temp_workspace / "gone.png"
+    gone.write_bytes(PNG + b"gone")
+
+    first = reconcile_folder(temp_workspace)
+    assert first.scanned == 3
+    assert first.inserted == 3
+
+    # Simulate activity while the app was closed
+    changed.write_bytes(PNG + b"after edit")
+    gone.unlink()
+    (temp_workspace / "new.wav").write_bytes(b"new")
+
+    second = reconcile_folder(temp_workspace)
+    assert second.scanned == 3
+    assert second.inserted == 1
+    assert second.updated == 1
+    assert second.missing == 1
+
+    with Session(get_engine()) as session:
+        by_name = {Path(a.path).name: a for a in session.exec(select(Asset)).all()}
+        assert by_name["gone.png"].missing is True
+        assert by_name["kept.png"].missing is False
+        assert by_name["changed.png"].size_bytes == len(PNG + b"after edit")
+
+    # Restored file is un-marked instead of being inserted again
+    gone.write_bytes(PNG + b"gone")
+    third = reconcile_folder(temp_workspace)
+    assert third.restored == 1
+    assert third.inserted == 0
+
+
+def test_bounded_hash_pool_ingests_everything(temp_workspace):
+    """Test that a saturated hash pool still ingests every file exactly once"""
+    pipeline = IngestPipeline(batch_size=16, batch_window=10.0, hash_workers=3, max_inflight=4)
+
+    for idx in range(60):
+        path = temp_workspace / f"clip_{idx:02d}.mp4"
+        path.write_bytes(bytes(idx + 1) * 1024)
+    pipeline.submit_many(sorted(temp_workspace.iterdir()))
+
+    assert pipeline.flush() == 60
+    stats = pipeline.get_stats()
+    assert stats["hashing"] == 0
+    assert stats["ready"] == 0
+
+    with Session(get_engine()) as session:
+        assert len(session.exec(select(Asset)).all()) == 60
+
+
+def test_flush_probes_image_dimensions(temp_workspace):
+    """Test that ingest fills image metadata from headers in bulk"""
+    from PIL import Image
+
+    Image.new("RGB", (640, 360), "white").save(temp_workspace / "banner.png")
+    frames = [Image.new("RGB", (32, 48), color) for color in ("red", "green", "blue")]
+    frames[0].save(temp_workspace / "spinner.gif", save_all=True, append_images=frames[1:], duration=100)
+    (temp_workspace / "broken.png").write_bytes(PNG + b"not an image")  # Truncated
+
+    pipeline = IngestPipeline(batch_size=10, batch_window=10.0)
+    pipeline.submit_many(temp_workspace.iterdir())
+    assert pipeline.flush() == 3
+    assert pipeline.get_stats()["probe"]["files_probed"] == 2
+
+    with Session(get_engine()) as session:
+        by_name = {Path(a.path).name: a for a in session.exec(select(Asset)).all()}
+
+    assert (by_name["banner.png"].width, by_name["banner.png"].height) == (640, 360)
+    assert by_name["banner.png"].probed_at is not None
+    assert (by_name["spinner.gif"].width, by_name["spinner.gif"].height) == (32, 48)
+    assert by_name["spinner.gif"].duration == pytest.approx(0.3)
+    assert by_name["broken.png"].width is None
+    assert by_name["broken.png"].probed_at is not None  # Attempted: not retried by the backfill
+    assert pipeline.get_stats()["probe"]["files_failed"] == 1
+
+
+def test_backfill_probes_in_batches_once(temp_workspace, monkeypatch):
+    """Test that the startup backfill is chunked and does not retry failed probes"""
+    from PIL import Image
+
+    from app.core import config, media_probe
+
+    monkeypatch.setattr(config.settings, "ingest_probe_metadata", False)
+    monkeypatch.setattr(config.settings, "probe_batch_size", 2)
+    for idx in range(3):
+        Image.new("RGB", (16 + idx, 16), "white").save(temp_workspace / f"tile_{idx}.png")
+    (temp_workspace / "broken.png").write_bytes(PNG + b"not an image")
+    pipeline = IngestPipeline(batch_size=10, batch_window=10.0)
+    pipeline.submit_many(temp_workspace.iterdir())
+    assert pipeline.flush() == 4
+
+    batches = []
+    probe_batch = media_probe._probe_batch
+    monkeypatch.setattr(
+        media_probe, "_probe_batch", lambda items, *args: batches.append(items) or probe_batch(items, *args)
+    )
+
+    assert media_probe.backfill_media_metadata() == 3
+    assert [len(batch) for batch in batches] == [2, 2]
+    assert media_probe.backfill_media_metadata() == 0
+    assert len(batches) == 2
@@ -0,0 +1,98 @@
+"""
+Integration tests for bulk job creation
+
+Tests enqueue_jobs() (one transaction, asset validation, batch ID) and the
+batch status/cancel endpoints; the dispatcher is not started so jobs stay
+pending
+"""
+
+import json
+import tempfile
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlmodel import Session, select
+
+from app.backend.models.entities import Asset, AssetType, Job, JobKind, JobPriority, JobStatus
+from app.backend.server import app
+from app.core.db import create_db_and_tables, get_engine, reset_engine
+from app.workers import queue
+from app.workers.queue import enqueue_jobs
+
+client = TestClient(app)
+
+
+@pytest.fixture
+def temp_workspace(monkeypatch):
+    """Create temporary workspace with database and an idle queue"""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        workspace = Path(tmpdir)
+
+        from app.core import config
+
+        monkeypatch.setattr(config.settings, "db_path", str(workspace / "test.db"))
+        monkeypatch.setattr(queue, "start_queue", lambda: None)
+        reset_engine()
+        create_db_and_tables()
+
+        yield workspace
+
+        reset_engine()
+
+
+def _add_assets(count: int) -> list[int]:
+    with Session(get_engine()) as session:
+        assets = [Asset(path=f"/tmp/asset_{i}.png", type=AssetType.IMAGE) for i in range(count)]
+        session.add_all(assets)
+        session.commit()
+        return [asset.id for asset in assets]
+
+
+def test_enqueue_jobs_creates_batch(temp_workspace):  # noqa: ARG001
+    """Test that one call creates a job per valid asset with a shared batch ID"""
+    asset_ids = _add_assets(600)  # More than one IN chunk
+    requested = [*asset_ids, 99999, asset_ids[0]]
+
+    batch_id, job_ids, skipped = enqueue_jobs(JobKind.THUMBNAIL, requested, params={"type": "video_poster"})
+
+    assert len(job_ids) == 600
+    assert skipped == [99999]
+    with Session(get_engine()) as session:
+        jobs = session.exec(select(Job).where(Job.batch_id == batch_id).order_by(Job.id)).all()
+    assert [job.id for job in jobs] == job_ids
+    assert [job.asset_id for job in jobs] == asset_ids
+    assert all(job.status == JobStatus.PENDING and job.priority == JobPriority.INTERACTIVE for job in jobs)
+    assert json.loads(jobs[5].params_json) == {"type": "video_poster", "asset_id": asset_ids[5]}
+
+
+def test_batch_routes(temp_workspace):  # noqa: ARG001
+    """Test creating, inspecting and cancelling a batch over HTTP"""
+    asset_ids = _add_assets(3)
+
+    response = client.post("/api/jobs/bg-remove", json={"asset_ids": [*asset_ids, 99999]})
+    assert response.status_code == 201
+    data = response.json()
+    batch_id = data["batch_id"]
+    assert len(data["job_ids"]) == 3
+    assert data["skipped_asset_ids"] == [99999]
+
+    status = client.get(f"/api/jobs/batches/{batch_id}").json()
+    assert status["total"] == 3
+    assert status["counts"]["pending"] == 3
+    assert not status["done"]
+
+    listed = client.get("/api/jobs", params={"batch_id": batch_id}).json()
+    assert [job["id"] for job in listed["jobs"]] == data["job_ids"]
+
+    assert client.post(f"/api/jobs/batches/{batch_id}/cancel").json()["cancelled"] == 3
+    status = client.get(f"/api/jobs/batches/{batch_id}").json()
+    assert status["counts"]["cancelled"] == 3
+    assert status["done"]
+
+
+def test_batch_routes_reject_unknown(temp_workspace):  # noqa: ARG001
+    """Test 422 when no asset exists and 404 for unknown batches"""
+    assert client.post("/api/jobs/audio-waveform", json={"asset_ids": [99999]}).status_code == 422
+    assert client.get("/api/jobs/batches/nope").status_code == 404
+    assert client.post("/api/jobs/batches/nope/cancel").status_code == 404
@@ -0,0 +1,128 @@
+"""
+Integration tests for coalesced job progress reporting
+
+Tests that progress reports are served from memory, written in batches
+and never overwrite a job's final state
+"""
+
+import tempfile
+from pathlib import Path
+
+import pytest
+from sqlmodel import Session
+
+from app.backend.models.entities import Job, JobKind, JobStatus
+from app.core.db import create_db_and_tables, get_engine, reset_engine
+from app.workers.progress import ProgressChannel
+
+
+@pytest.fixture
+def temp_workspace(monkeypatch):
+    """Create temporary workspace with database"""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        workspace = Path(tmpdir)
+
+        from app.core import config
+
+        monkeypatch.setattr(config.settings, "db_path", str(workspace / "test.db"))
+        reset_engine()
+        create_db_and_tables()
+
+        yield workspace
+
+        reset_engine()
+
+
+@pytest.fixture
+def channel():
+    """Channel with a long interval so only explicit flushes write"""
+    progress = ProgressChannel(flush_interval=60)
+    yield progress
+    progress.stop()
+
+
+def _add_jobs(count: int, status: JobStatus = JobStatus.RUNNING) -> list[int]:
+    with Session(get_engine()) as session:
+        jobs = [Job(kind=JobKind.THUMBNAIL, status=status) for _ in range(count)]
+        session.add_all(jobs)
+        session.commit()
+        return [job.id for job in jobs]
+
+
+def _stored_progress(job_id: int) -> float:
+    with Session(get_engine()) as session:
+        return session.get(Job, job_id).progress
+
+
+def test_reports_are_coalesced_into_one_batch(temp_workspace, channel):  # noqa: ARG001
+    """Test that many reports for many jobs become one row per job"""
+    job_ids = _add_jobs(10)
+    for step in range(1, 51):
+        for job_id in job_ids:
+            channel.report(job_id, step / 50)
+
+    assert channel.get(job_ids[0]) == 1.0
+    assert _stored_progress(job_ids[0]) == 0.0  # Nothing written yet
+
+    assert channel.flush() == 10
+    assert all(_stored_progress(job_id) == 1.0 for job_id in job_ids)
+    assert channel.get_stats()["reports"] == 500
+    assert channel.get_stats()["rows_written"] == 10
+    assert channel.flush() == 0
+
+
+def test_flush_skips_finished_jobs(temp_workspace, channel):  # noqa: ARG001
+    """Test that a late flush does not overwrite a completed job"""
+    (running,) = _add_jobs(1)
+    (completed,) = _add_jobs(1, status=JobStatus.COMPLETED)
+    channel.report(running, 0.4)
+    channel.report(completed, 0.4)
+
+    channel.flush()
+
+    assert _stored_progress(running) == 0.4
+    assert _stored_progress(completed) == 0.0
+
+
+def test_values_are_clamped_and_discarded(temp_workspace, channel):  # noqa: ARG001
+    """Test clamping and forgetting finished jobs"""
+    (job_id,) = _add_jobs(1)
+    channel.report(job_id, 1.7)
+    assert channel.get(job_id) == 1.0
+
+    channel.discard(job_id)
+    assert channel.get(job_id) is None
+    assert channel.flush() == 0
+
+
+def test_queue_serves_live_progress(temp_workspace):  # noqa: ARG001
+    """Test that get_job_status returns the in-memory value of a running job"""
+    from app.workers import queue
+    from app.workers.queue import get_job_status, get_progress_stats, update_job_progress
+
+    (job_id,) = _add_jobs(1)
+    before = get_progress_stats()["reports"]
+
+    update_job_progress(job_id, 0.25)
+
+    assert get_job_status(job_id)["progress"] == 0.25
+    assert get_progress_stats()["reports"] == before + 1
+    queue._progress.discard(job_id)
+
+
+def test_engine_reset_flushes_and_clears_queue_progress(temp_workspace):
+    """Test that pending progress is written to its own database, never the next one"""
+    from app.core import config
+    from app.workers.queue import get_job_status, update_job_progress
+
+    (job_id,) = _add_jobs(1)
+    update_job_progress(job_id, 0.6)
+
+    reset_engine()
+    assert _stored_progress(job_id) == 0.6
+
+    config.settings.db_path = str(temp_workspace / "next.db")
+    reset_engine()
+    create_db_and_tables()
+    assert _add_jobs(1) == [job_id]  # Ids restart at 1 in a new database
+    assert get_job_status(job_id)["progress"] == 0.0
@@ -0,0 +1,256 @@
+"""
+Integration tests for the durable job queue
+
+Tests atomic claiming from the jobs table, lease-based recovery of jobs
+orphaned by a crashed worker and dispatch through the JobKind registry
+"""
+
+import tempfile
+import threading
+import time
+from datetime import UTC, datetime, timedelta
+from pathlib import Path
+
+import pytest
+from sqlmodel import Session
+
+from app.backend.models.entities import Job, JobKind, JobPriority, JobStatus
+from app.core.db import create_db_and_tables, get_engine, reset_engine
+from app.workers import queue
+from app.workers.cancellation import CancellationToken
+from app.workers.queue import (
+    cancel_job,
+    claim_admitted_jobs,
+    claim_jobs,
+    enqueue_job,
+    get_job_status,
+    recover_stale_jobs,
+)
+from app.workers.scheduler import SlotScheduler
+
+_release = threading.Event()
+
+
+def _echo_handler(job_id: int) -> str:
+    return f"/out/{job_id}.png"
+
+
+def _blocking_handler(job_id: int) -> str:
+    _release.wait(timeout=10)
+    return f"/out/{job_id}.png"
+
+
+def _cooperative_handler(job_id: int, token: CancellationToken) -> str:
+    while not token.wait(0.02):
+        pass
+    token.check()
+    return f"/out/{job_id}.png"
+
+
+@pytest.fixture
+def temp_workspace(monkeypatch):
+    """Create temporary workspace with database and test job handlers"""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        workspace = Path(tmpdir)
+
+        from app.core import config
+
+        monkeypatch.setattr(config.settings, "db_path", str(workspace / "test.db"))
+        monkeypatch.setattr(config.settings, "job_poll_interval_sec", 0.05)
+        monkeypatch.setitem(queue.JOB_HANDLERS, (JobKind.THUMBNAIL, "echo"), f"{__name__}:_echo_handler")
+        monkeypatch.setitem(queue.JOB_HANDLERS, (JobKind.THUMBNAIL, "block"), f"{__name__}:_blocking_handler")
+        monkeypatch.setitem(queue.JOB_HANDLERS, (JobKind.THUMBNAIL, "loop"), f"{__name__}:_cooperative_handler")
+        queue.set_scheduler(SlotScheduler(total_slots=4, cpu_budget=4, ram_budget_gb=8.0))
+        reset_engine()
+        create_db_and_tables()
+        _release.clear()
+
+        yield workspace
+
+        _release.set()
+        queue.shutdown_executor()
+        queue.set_scheduler(None)
+        reset_engine()
+
+
+def _add_jobs(count: int, kind: JobKind = JobKind.THUMBNAIL, **fields) -> list[int]:
+    with Session(get_engine()) as session:
+        jobs = [Job(kind=kind, params_json='{"type": "echo"}', **fields) for _ in range(count)]
+        session.add_all(jobs)
+        session.commit()
+        return [job.id for job in jobs]
+
+
+def _wait_for(job_id: int, status: str, timeout: float = 5.0) -> dict:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        job = get_job_status(job_id)
+        if job and job["status"] == status:
+            return job
+        time.sleep(0.02)
+    raise AssertionError(f"Job {job_id} never reached {status}: {get_job_status(job_id)}")
+
+
+@pytest.mark.usefixtures("temp_workspace")
+def test_claim_is_atomic_across_threads():
+    """Test that concurrent claimers never receive the same job"""
+    job_ids = _add_jobs(60)
+    claimed: list[int] = []
+    lock = threading.Lock()
+
+    def claimer():
+        while batch := claim_jobs(3):
+            with lock:
+                claimed.extend(batch)
+
+    threads = [threading.Thread(target=claimer) for _ in range(6)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert sorted(claimed) == job_ids
+
+    with Session(get_engine()) as session:
+        job = session.get(Job, job_ids[0])
+        assert job.status == JobStatus.RUNNING
+        assert job.worker_id == queue.WORKER_ID
+        assert job.attempts == 1
+        assert job.lease_expires_at is not None
+
+
+@pytest.mark.usefixtures("temp_workspace")
+def test_stale_running_jobs_are_recovered():
+    """Test that expired leases are re-queued and exhausted jobs fail"""
+    expired = datetime.now(UTC) - timedelta(minutes=5)
+    (orphan,) = _add_jobs(1, status=JobStatus.RUNNING, worker_id="dead:1", lease_expires_at=expired, attempts=1)
+    (exhausted,) = _add_jobs(1, status=JobStatus.RUNNING, worker_id="dead:1", lease_expires_at=expired, attempts=3)
+    (alive,) = _add_jobs(
+        1, status=JobStatus.RUNNING, worker_id="other:2", lease_expires_at=datetime.now(UTC) + timedelta(minutes=5)
+    )
+
+    assert recover_stale_jobs() == 1
+
+    with Session(get_engine()) as session:
+        assert session.get(Job, orphan).status == JobStatus.PENDING
+        assert session.get(Job, orphan).worker_id is None
+        assert session.get(Job, exhausted).status == JobStatus.FAILED
+        assert session.get(Job, alive).status == JobStatus.RUNNING
+
+    assert claim_jobs(5) == [orphan]
+
+
+@pytest.mark.usefixtures("temp_workspace")
+def test_registry_dispatch_runs_pending_jobs():
+    """Test that jobs are resolved by kind/type and run without a callable"""
+    job_id = enqueue_job(kind=JobKind.THUMBNAIL, params={"type": "echo"})
+
+    job = _wait_for(job_id, "completed")
+    assert job["result_path"] == f"/out/{job_id}.png"
+    assert job["progress"] == 1.0
+
+
+@pytest.mark.usefixtures("temp_workspace")
+def test_pending_rows_resume_after_restart():
+    """Test that rows left by a previous process run once the queue starts"""
+    job_ids = _add_jobs(3)
+
+    queue.start_queue()
+
+    for job_id in job_ids:
+        _wait_for(job_id, "completed")
+
+
+@pytest.mark.usefixtures("temp_workspace")
+def test_cancel_is_not_overwritten_by_result():
+    """Test that a job cancelled while running stays cancelled"""
+    job_id = enqueue_job(kind=JobKind.THUMBNAIL, params={"type": "block"})
+    _wait_for(job_id, "running")
+
+    assert cancel_job(job_id)
+    _release.set()
+    time.sleep(0.2)
+
+    assert get_job_status(job_id)["status"] == "cancelled"
+
+
+@pytest.mark.usefixtures("temp_workspace")
+def test_unknown_kind_is_rejected():
+    """Test that enqueueing a kind without a handler fails fast"""
+    with pytest.raises(LookupError):
+        enqueue_job(kind=JobKind.EXPORT_PACK)
+
+
+@pytest.mark.usefixtures("temp_workspace")
+def test_inline_handler_is_registered_before_commit():
+    """Test that a dispatcher can never see the row without the caller's handler"""
+    from sqlalchemy import event
+
+    caller = threading.get_ident()
+    handlers_at_commit = []
+
+    def _on_commit(_connection):
+        if threading.get_ident() == caller and not handlers_at_commit:
+            handlers_at_commit.append(set(queue._inline_handlers))
+
+    event.listen(get_engine(), "commit", _on_commit)
+    try:
+        job_id = enqueue_job(kind=JobKind.THUMBNAIL, job_func=_echo_handler)
+    finally:
+        event.remove(get_engine(), "commit", _on_commit)
+
+    assert job_id in handlers_at_commit[0]
+    assert _wait_for(job_id, "completed")["result_path"] == f"/out/{job_id}.png"
+
+
+@pytest.mark.usefixtures("temp_workspace")
+def test_interactive_jobs_are_claimed_first():
+    """Test that claim order is priority first, then age"""
+    batch = _add_jobs(3, priority=JobPriority.BATCH)
+    interactive = _add_jobs(2, priority=JobPriority.INTERACTIVE)
+
+    assert claim_jobs(2) == interactive
+    assert claim_jobs(5) == batch
+
+
+@pytest.mark.usefixtures("temp_workspace")
+def test_heavy_backlog_does_not_block_thumbnails():
+    """Test that kinds at their limit are skipped, not waited on"""
+    scheduler = SlotScheduler(total_slots=4, cpu_budget=4, ram_budget_gb=8.0, kind_limits={JobKind.BG_REMOVE: 1})
+    bg_remove = _add_jobs(20, kind=JobKind.BG_REMOVE)
+    (thumbnail,) = _add_jobs(1, priority=JobPriority.INTERACTIVE)
+
+    claimed = claim_admitted_jobs(scheduler)
+
+    assert claimed == [(thumbnail, JobKind.THUMBNAIL), (bg_remove[0], JobKind.BG_REMOVE)]
+    assert claim_admitted_jobs(scheduler) == []
+
+    scheduler.release(JobKind.BG_REMOVE)
+    assert claim_admitted_jobs(scheduler) == [(bg_remove[1], JobKind.BG_REMOVE)]
+
+
+@pytest.mark.usefixtures("temp_workspace")
+def test_cancel_stops_running_job():
+    """Test that cancelling trips the token and frees the worker"""
+    job_id = enqueue_job(kind=JobKind.THUMBNAIL, params={"type": "loop"})
+    _wait_for(job_id, "running")
+
+    assert cancel_job(job_id)
+
+    deadline = time.monotonic() + 5
+    while job_id in queue._active_jobs and time.monotonic() < deadline:
+        time.sleep(0.02)
+    assert job_id not in queue._active_jobs
+    assert get_job_status(job_id)["status"] == "cancelled"
+
+
+@pytest.mark.usefixtures("temp_workspace")
+def test_kind_timeout_fails_job(monkeypatch):
+    """Test that a job running past its kind's time limit is failed"""
+    from app.core import config
+
+    monkeypatch.setattr(config.settings, "job_timeouts", "thumbnail=1")
+    job_id = enqueue_job(kind=JobKind.THUMBNAIL, params={"type": "loop"})
+
+    job = _wait_for(job_id, "failed")
+    assert "time limit" in job["error_message"]
@@ -0,0 +1,118 @@
+"""
+Integration tests for bulk job status and the job event stream
+
+Tests GET /api/jobs filtering/pagination and the server-sent event
+generator fed from the queue's in-memory state
+"""
+
+import asyncio
+import json
+import tempfile
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlmodel import Session
+
+from app.backend.models.entities import Job, JobKind, JobStatus
+from app.backend.routes.jobs import stream_job_events
+from app.backend.server import app
+from app.core.db import create_db_and_tables, get_engine, reset_engine
+from app.workers import queue
+
+client = TestClient(app)
+
+
+@pytest.fixture
+def temp_workspace(monkeypatch):
+    """Create temporary workspace with database"""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        workspace = Path(tmpdir)
+
+        from app.core import config
+
+        monkeypatch.setattr(config.settings, "db_path", str(workspace / "test.db"))
+        reset_engine()
+        create_db_and_tables()
+
+        yield workspace
+
+        reset_engine()
+
+
+def _add_jobs(count: int, status: JobStatus = JobStatus.PENDING) -> list[int]:
+    with Session(get_engine()) as session:
+        jobs = [Job(kind=JobKind.THUMBNAIL, status=status) for _ in range(count)]
+        session.add_all(jobs)
+        session.commit()
+        return [job.id for job in jobs]
+
+
+def _parse(chunk: str) -> list[tuple[str, dict]]:
+    events = []
+    for block in chunk.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in block.splitlines())
+        events.append((lines["event"], json.loads(lines["data"])))
+    return events
+
+
+def test_bulk_status_filters_and_paginates(temp_workspace):  # noqa: ARG001
+    """Test that many jobs are fetched with one request"""
+    pending = _add_jobs(5)
+    running = _add_jobs(2, status=JobStatus.RUNNING)
+
+    response = client.get("/api/jobs", params={"status": "pending", "offset": 1, "limit": 2})
+    assert response.status_code == 200
+    data = response.json()
+    assert data["total"] == 5
+    assert [job["id"] for job in data["jobs"]] == pending[1:3]
+
+    ids = ",".join(str(job_id) for job_id in [pending[0], *running])
+    data = client.get("/api/jobs", params={"ids": ids, "status": "running,pending"}).json()
+    assert data["total"] == 3
+    assert {job["status"] for job in data["jobs"]} == {"pending", "running"}
+
+
+def test_bulk_status_rejects_bad_filters(temp_workspace):  # noqa: ARG001
+    """Test that malformed filters return 422"""
+    assert client.get("/api/jobs", params={"ids": "1,x"}).status_code == 422
+    assert client.get("/api/jobs", params={"status": "sleeping"}).status_code == 422
+    assert client.get("/api/jobs", params={"limit": 0}).status_code == 422
+
+
+def test_stream_pushes_transitions_and_progress(temp_workspace):  # noqa: ARG001
+    """Test snapshot, then transitions and live progress for watched jobs"""
+    watched, other = _add_jobs(2, status=JobStatus.RUNNING)
+
+    async def collect() -> list[tuple[str, dict]]:
+        disconnected = False
+
+        async def is_disconnected() -> bool:
+            return disconnected
+
+        stream = stream_job_events(is_disconnected, ids=[watched], poll_interval=0.01)
+        received = _parse(await anext(stream))
+
+        queue._events.publish(other, "completed")
+        queue._progress.report(watched, 0.5)
+        queue._events.publish(watched, "completed", progress=1.0)
+        received += _parse(await anext(stream))
+
+        disconnected = True
+        with pytest.raises(StopAsyncIteration):
+            await anext(stream)
+        return received
+
+    try:
+        events = asyncio.run(collect())
+    finally:
+        queue._progress.discard(watched)
+
+    kind, snapshot = events[0]
+    assert kind == "snapshot"
+    assert [job["id"] for job in snapshot["jobs"]] == [watched]
+
+    assert events[1:] == [
+        ("progress", {"id": watched, "progress": 0.5}),
+        ("job", {"seq": queue._events.seq, "id": watched, "status": "completed", "progress": 1.0}),
+    ]
@@ -0,0 +1,108 @@
+"""
+Integration tests for near-duplicate image lookup
+
+Tests perceptual hashes at ingest and the /api/assets/{id}/similar route
+"""
+
+import tempfile
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+from PIL import Image, ImageDraw
+from sqlmodel import Session, select
+
+from app.backend.models.entities import Asset
+from app.backend.server import app
+from app.core.db import create_db_and_tables, get_engine, reset_engine
+from app.core.ingest import IngestPipeline
+from app.core.phash import find_similar, invalidate_similarity_index
+
+
+@pytest.fixture
+def temp_workspace(monkeypatch):
+    """Create temporary workspace with database and a fresh similarity index"""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        workspace = Path(tmpdir)
+
+        from app.core import config
+
+        monkeypatch.setattr(config.settings, "db_path", str(workspace / "test.db"))
+        reset_engine()
+        create_db_and_tables()
+        invalidate_similarity_index()
+
+        yield workspace
+
+        invalidate_similarity_index()
+
+
+def _scene(path: Path, size: int, dot: tuple[int, int]):
+    img = Image.new("RGB", (size, size), "white")
+    draw = ImageDraw.Draw(img)
+    draw.rectangle((size * 0.1, size * 0.1, size * 0.45, size * 0.9), fill="teal")
+    x, y = dot
+    draw.ellipse((x * size // 100, y * size // 100, (x + 30) * size // 100, (y + 30) * size // 100), fill="orange")
+    img.save(path)
+
+
+def _ingest(*paths: Path):
+    pipeline = IngestPipeline(batch_size=10, batch_window=10.0)
+    pipeline.submit_many(paths)
+    return pipeline.flush()
+
+
+def test_variations_are_found_and_unrelated_images_are_not(temp_workspace):
+    """Test that resized variations are near-duplicates of the original"""
+    _scene(temp_workspace / "dragon.png", 256, (55, 30))
+    _scene(temp_workspace / "dragon_small.jpg", 128, (55, 30))
+    unrelated = Image.new("RGB", (256, 256), "black")
+    ImageDraw.Draw(unrelated).rectangle((150, 10, 250, 120), fill="yellow")
+    unrelated.save(temp_workspace / "knight.png")
+    (temp_workspace / "theme.mp3").write_bytes(b"audio")
+
+    assert _ingest(*temp_workspace.iterdir()) == 4
+
+    with Session(get_engine()) as session:
+        by_name = {Path(a.path).name: a for a in session.exec(select(Asset)).all()}
+    assert by_name["theme.mp3"].phash is None
+    assert all(by_name[n].phash for n in ("dragon.png", "dragon_small.jpg", "knight.png"))
+
+    similar = find_similar(by_name["dragon.png"].id)
+    assert [a.id for a, _distance in similar] == [by_name["dragon_small.jpg"].id]
+
+    # Assets ingested after the index was built are picked up incrementally
+    _scene(temp_workspace / "dragon_copy.png", 300, (55, 30))
+    assert _ingest(temp_workspace / "dragon_copy.png") == 1
+    assert len(find_similar(by_name["dragon.png"].id)) == 2
+
+
+def test_similar_route(temp_workspace):
+    """Test the backend route for near-duplicate lookup"""
+    _scene(temp_workspace / "a.png", 256, (55, 30))
+    _scene(temp_workspace / "b.png", 200, (55, 30))
+    (temp_workspace / "song.wav").write_bytes(b"audio")
+    assert _ingest(*temp_workspace.iterdir()) == 3
+
+    with Session(get_engine()) as session:
+        ids = {Path(a.path).name: a.id for a in session.exec(select(Asset)).all()}
+
+    client = TestClient(app)
+    response = client.get(f"/api/assets/{ids['a.png']}/similar")
+    assert response.status_code == 200
+    data = response.json()
+    assert [item["id"] for item in data] == [ids["b.png"]]
+    assert data[0]["distance"] <= 8
+
+    assert client.get(f"/api/assets/{ids['a.png']}/similar", params={"max_distance": 0}).status_code == 200
+    assert client.get(f"/api/assets/{ids['song.wav']}/similar").status_code == 422
+    assert client.get("/api/assets/9999/similar").status_code == 404
+
+
+def test_similar_route_runs_in_threadpool():
+    """Test that the blocking lookup is not declared async (it would run on the event loop)"""
+    import inspect
+
+    from app.backend.routes.assets import get_similar_assets
+
+    assert not inspect.iscoroutinefunction(get_similar_assets)
@@ -0,0 +1,114 @@
+"""
+Integration tests for the thumbnail pyramid job
+
+Tests that one job caches every level of an image asset and that later
+grid requests at any size are served from the cache
+"""
+
+import subprocess
+import tempfile
+from pathlib import Path
+
+import pytest
+from PIL import Image
+from sqlmodel import Session
+
+from app.backend.models.entities import Asset, AssetType, Job, JobKind
+from app.core import thumbnails
+from app.core.db import create_db_and_tables, get_engine, reset_engine
+from app.workers.cancellation import CancellationToken, JobCancelledError
+from app.workers.jobs.thumbnails import run_thumbnail_pyramid_job
+from app.workers.queue import get_job_status
+
+
+@pytest.fixture
+def temp_workspace(monkeypatch):
+    """Create temporary workspace with database and thumbnail cache"""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        workspace = Path(tmpdir)
+
+        from app.core import config
+
+        monkeypatch.setattr(config.settings, "db_path", str(workspace / "test.db"))
+        monkeypatch.setattr(config.settings, "cache_root", str(workspace / "Cache"))
+        thumbnails.reset_thumbnail_cache()
+        reset_engine()
+        create_db_and_tables()
+
+        yield workspace
+
+        reset_engine()
+        thumbnails.reset_thumbnail_cache()
+
+
+def _add_job(path: Path, asset_type: AssetType) -> int:
+    with Session(get_engine()) as session:
+        asset = Asset(path=str(path), type=asset_type)
+        session.add(asset)
+        session.commit()
+        job = Job(kind=JobKind.THUMBNAIL, asset_id=asset.id, params_json='{"type": "pyramid"}')
+        session.add(job)
+        session.commit()
+        return job.id
+
+
+def test_pyramid_job_prerenders_all_levels(temp_workspace):
+    """Test that after the job no grid size decodes the original again"""
+    source = temp_workspace / "render.png"
+    Image.new("RGBA", (2048, 1024), (0, 128, 255, 255)).save(source)
+    job_id = _add_job(source, AssetType.IMAGE)
+
+    top = run_thumbnail_pyramid_job(job_id)
+
+    results = get_job_status(job_id)["results"]
+    assert [result["size"] for result in results] == [64, 128, 256, 512]
+    assert results[-1]["output"] == str(top)
+    with Image.open(top) as img:
+        assert (img.format, img.size) == ("WEBP", (512, 256))
+
+    misses = thumbnails.get_thumbnail_cache_stats()["misses"]
+    served = {thumbnails.generate_thumbnail(str(source), size=size) for size in (48, 100, 128, 256, 300)}
+    assert served <= {result["output"] for result in results}
+    assert thumbnails.get_thumbnail_cache_stats()["misses"] == misses
+
+
+def test_pyramid_job_rejects_audio(temp_workspace):
+    """Test that audio assets fail with a clear error"""
+    source = temp_workspace / "tone.wav"
+    source.write_bytes(b"RIFF")
+    job_id = _add_job(source, AssetType.AUDIO)
+
+    with pytest.raises(ValueError, match="only images and videos"):
+        run_thumbnail_pyramid_job(job_id)
+
+
+def test_video_pyramid_runs_ffmpeg_with_job_token(temp_workspace, monkeypatch):
+    """Test that ffmpeg is started through run_subprocess with the job's token and a private frame file"""
+    calls = []
+
+    def fake_ffmpeg(cmd, token=None, timeout=None):
+        calls.append((cmd, token, timeout))
+        Image.new("RGB", (512, 288), "red").save(cmd[-1], "PNG")
+        return subprocess.CompletedProcess(cmd, 0, "", "")
+
+    monkeypatch.setattr(thumbnails, "run_subprocess", fake_ffmpeg)
+    sources = [temp_workspace / name / "clip.mp4" for name in ("a", "b")]
+    token = CancellationToken()
+    for source in sources:
+        source.parent.mkdir()
+        source.write_bytes(b"\x00\x00\x00\x18ftypisom")
+        top = run_thumbnail_pyramid_job(_add_job(source, AssetType.VIDEO), token=token)
+        with Image.open(top) as img:
+            assert img.size == (512, 288)
+
+    (first_cmd, first_token, _), (second_cmd, _, _) = calls
+    assert first_token is token
+    assert first_cmd[-1] != second_cmd[-1]  # Same stem, different frame files
+    assert not any(Path(cmd[-1]).exists() for cmd, _, _ in calls)
+
+    later = temp_workspace / "later.mp4"
+    later.write_bytes(sources[0].read_bytes())
+    token.cancel()
+    with pytest.raises(JobCancelledError):
+        run_thumbnail_pyramid_job(_add_job(later, AssetType.VIDEO), token=token)
+    assert len(calls) == 2
@@ -12,9 +12,13 @@
 from sqlmodel import Session, select
 
 from app.backend.models.entities import Asset, AssetProvenance, AssetType
-from app.core.db import create_db_and_tables, get_engine
+from app.core.db import create_db_and_tables, get_engine, reset_engine
 from app.core.watcher import FileWatcher
 
+# Image files need a real signature to be detected as images
+PNG = b"\x89PNG\r\n\x1a\n"
+JPEG = b"\xff\xd8\xff"
+
 
 @pytest.fixture
 def temp_workspace():
@@ -25,6 +29,9 @@ def temp_workspace():
         watch_folder = workspace / "watch"
         watch_folder.mkdir()
 
+        # Drop any engine bound to a previous test's database
+        reset_engine()
+
         yield {
             "workspace": workspace,
             "db_path": db_path,
@@ -53,7 +60,7 @@ def test_watcher_detects_image_file(temp_workspace, monkeypatch):
 
         # Create test image file
         test_file = watch_folder / "test_image.png"
-        test_file.write_bytes(b"fake png data")
+        test_file.write_bytes(PNG + b"fake png data")
 
         # Wait for watcher to process file (debounce + processing time)
         time.sleep(3)
@@ -204,8 +211,8 @@ def test_watcher_handles_multiple_files(temp_workspace, monkeypatch):
         time.sleep(0.5)
 
         # Create multiple files
-        (watch_folder / "image1.png").write_bytes(b"png 1")
-        (watch_folder / "image2.jpg").write_bytes(b"jpg 2")
+        (watch_folder / "image1.png").write_bytes(PNG + b"png 1")
+        (watch_folder / "image2.jpg").write_bytes(JPEG + b"jpg 2")
         (watch_folder / "audio1.wav").write_bytes(b"wav 1")
 
         time.sleep(5)  # Wait for all files to be processed
@@ -238,7 +245,7 @@ def test_watcher_deduplicates_existing_file(temp_workspace, monkeypatch):
 
     # Create file before starting watcher
     test_file = watch_folder / "existing.png"
-    test_file.write_bytes(b"existing png")
+    test_file.write_bytes(PNG + b"existing png")
 
     # Manually insert asset for this file
     engine = get_engine()
@@ -261,7 +268,7 @@ def test_watcher_deduplicates_existing_file(temp_workspace, monkeypatch):
         time.sleep(0.5)
 
         # Modify existing file (simulates re-save)
-        test_file.write_bytes(b"modified png data")
+        test_file.write_bytes(PNG + b"modified png data")
 
         time.sleep(3)
 
@@ -303,7 +310,7 @@ def test_watcher_stop_and_restart(temp_workspace, monkeypatch):
 
         # Create file after restart
         test_file = watch_folder / "after_restart.png"
-        test_file.write_bytes(b"png after restart")
+        test_file.write_bytes(PNG + b"png after restart")
 
         time.sleep(3)
 
@@ -315,3 +322,39 @@ def test_watcher_stop_and_restart(temp_workspace, monkeypatch):
 
     finally:
         watcher.stop()
+
+
+def test_watcher_detects_file_in_subfolder(temp_workspace, monkeypatch):
+    """Test that watcher picks up files written into nested (dated) subfolders"""
+    from app.core import config
+
+    db_path = temp_workspace["db_path"]
+    watch_folder = temp_workspace["watch_folder"]
+
+    # Setup database
+    monkeypatch.setattr(config.settings, "db_path", str(db_path))
+    create_db_and_tables()
+
+    # Start watcher
+    watcher = FileWatcher([str(watch_folder)])
+    watcher.start()
+
+    try:
+        time.sleep(0.5)
+
+        # Generator output lands in a dated subfolder created after start
+        dated = watch_folder / "2025-10-22" / "batch_01"
+        dated.mkdir(parents=True)
+        test_file = dated / "render.png"
+        test_file.write_bytes(PNG + b"png in subfolder")
+
+        time.sleep(3)
+
+        engine = get_engine()
+        with Session(engine) as session:
+            assets = session.exec(select(Asset)).all()
+            assert len(assets) == 1
+            assert assets[0].path == str(test_file)
+
+    finally:
+        watcher.stop()
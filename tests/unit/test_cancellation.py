@@ -0,0 +1,62 @@
+"""
+Unit tests for cooperative job cancellation
+
+Tests token deadlines and killing external tools on cancel
+"""
+
+import sys
+import threading
+import time
+
+import pytest
+
+from app.workers.cancellation import CancellationToken, JobCancelledError, JobTimeoutError, run_subprocess
+
+SLEEP_CMD = [sys.executable, "-c", "import time; time.sleep(30)"]
+
+
+def test_token_deadline_raises_timeout():
+    """Test that an expired deadline trips the token"""
+    token = CancellationToken(timeout_sec=0.05)
+    token.check()
+
+    assert token.wait(1.0)
+    with pytest.raises(JobTimeoutError):
+        token.check()
+
+
+def test_cancel_keeps_first_reason():
+    """Test that a user cancel is not reported as a timeout"""
+    token = CancellationToken(timeout_sec=60)
+    token.cancel()
+    token.cancel("timeout")
+
+    with pytest.raises(JobCancelledError) as exc_info:
+        token.check()
+    assert not isinstance(exc_info.value, JobTimeoutError)
+
+
+def test_run_subprocess_completes():
+    """Test that a finished tool returns its output"""
+    result = run_subprocess([sys.executable, "-c", "print('ok')"], CancellationToken())
+
+    assert result.returncode == 0
+    assert result.stdout.strip() == "ok"
+
+
+def test_cancel_kills_subprocess():
+    """Test that cancelling the job kills a long-running tool promptly"""
+    token = CancellationToken()
+    threading.Timer(0.3, token.cancel).start()
+
+    started = time.monotonic()
+    with pytest.raises(JobCancelledError):
+        run_subprocess(SLEEP_CMD, token)
+
+    assert time.monotonic() - started < 5
+
+
+def test_job_deadline_kills_subprocess():
+    """Test that the job's time limit applies to the tool it runs"""
+    with pytest.raises(JobTimeoutError):
+        run_subprocess(SLEEP_CMD, CancellationToken(timeout_sec=0.3))
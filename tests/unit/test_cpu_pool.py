@@ -0,0 +1,125 @@
+"""
+Unit tests for the CPU worker process pool
+
+Tests backend selection, worker reuse, running a real job step
+(waveform rendering) in a worker process and stopping steps on timeout
+"""
+
+import math
+import os
+import struct
+import threading
+import time
+import wave
+
+import pytest
+from PIL import Image
+
+from app.workers.cancellation import CancellationToken, JobTimeoutError
+from app.workers.cpu_pool import map_cpu_bound, run_cpu_bound, shutdown_cpu_executor
+from app.workers.jobs.thumbnails import render_waveform
+
+
+@pytest.fixture
+def processpool(monkeypatch):
+    """Switch to the processpool backend with a single warm worker"""
+    from app.core import config
+
+    monkeypatch.setattr(config.settings, "worker_backend", "processpool")
+    monkeypatch.setattr(config.settings, "worker_processes", 1)
+    shutdown_cpu_executor()
+    yield
+    shutdown_cpu_executor()
+
+
+def test_threadpool_runs_inline():
+    """Test that the default backend calls the function in this process"""
+    assert run_cpu_bound(os.getpid) == os.getpid()
+
+
+def test_processpool_reuses_worker(processpool):  # noqa: ARG001
+    """Test that steps run in one long-lived worker process"""
+    first = run_cpu_bound(os.getpid)
+    second = run_cpu_bound(os.getpid)
+
+    assert first != os.getpid()
+    assert first == second
+
+
+def test_processpool_propagates_errors(processpool):  # noqa: ARG001
+    """Test that a worker exception is raised in the job thread"""
+    with pytest.raises(ValueError):
+        run_cpu_bound(int, "not a number")
+
+
+def test_waveform_renders_in_worker(processpool, tmp_path):  # noqa: ARG001
+    """Test that the waveform step runs out of process and writes the PNG"""
+    audio_path = tmp_path / "tone.wav"
+    with wave.open(str(audio_path), "wb") as out:
+        out.setnchannels(1)
+        out.setsampwidth(2)
+        out.setframerate(8000)
+        out.writeframes(b"".join(struct.pack("<h", int(10000 * math.sin(i / 10))) for i in range(8000)))
+    output_path = tmp_path / "tone.png"
+
+    assert run_cpu_bound(render_waveform, str(audio_path), str(output_path))
+
+    with Image.open(output_path) as img:
+        assert img.size == (800, 200)
+
+
+def test_map_yields_results_and_errors(processpool):  # noqa: ARG001
+    """Test that a batch reports each item's result or exception"""
+    results = {index: (value, error) for index, value, error in map_cpu_bound(pow, [(2, 3), (2, "x"), (3, 2)])}
+
+    assert results[0] == (8, None)
+    assert isinstance(results[1][1], TypeError)
+    assert results[2] == (9, None)
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    return True
+
+
+def test_timeout_stops_running_step(processpool):  # noqa: ARG001
+    """Test that a timed-out step is killed before the timeout is reported"""
+    worker = run_cpu_bound(os.getpid)
+    started = time.monotonic()
+
+    with pytest.raises(JobTimeoutError):
+        run_cpu_bound(time.sleep, 30, token=CancellationToken(timeout_sec=0.5))
+
+    assert time.monotonic() - started < 10
+    assert not _pid_alive(worker)
+    assert run_cpu_bound(os.getpid) not in (worker, os.getpid())  # Fresh pool
+
+
+def test_other_jobs_step_survives_recycle(processpool, monkeypatch):  # noqa: ARG001
+    """Test that a step lost to another job's cancellation runs again"""
+    from app.core import config
+
+    monkeypatch.setattr(config.settings, "worker_processes", 2)
+    shutdown_cpu_executor()
+    run_cpu_bound(os.getpid)  # Start the pool
+
+    outcome = []
+
+    def _bystander():
+        try:
+            outcome.append(run_cpu_bound(time.sleep, 1.5))  # Still running when the pool is recycled
+        except Exception as e:
+            outcome.append(e)
+
+    bystander = threading.Thread(target=_bystander)
+    bystander.start()
+    token = CancellationToken()
+    threading.Timer(0.5, token.cancel).start()
+    with pytest.raises(Exception, match="cancelled"):
+        run_cpu_bound(time.sleep, 30, token=token)
+    bystander.join(timeout=30)
+
+    assert outcome == [None]
@@ -0,0 +1,123 @@
+"""
+Unit tests for content-based file type detection
+
+Tests magic signatures overriding extensions and the (path, size, mtime) cache
+"""
+
+import os
+import struct
+
+import pytest
+from PIL import Image
+
+from app.backend.models.entities import AssetType
+from app.core import filetypes
+from app.core.filetypes import clear_detection_cache, detect_asset_type, detect_file_type, sniff_signature
+
+
+@pytest.fixture(autouse=True)
+def _fresh_cache():
+    clear_detection_cache()
+    yield
+    clear_detection_cache()
+
+
+def _wav_bytes() -> bytes:
+    return b"RIFF" + struct.pack("<I", 36) + b"WAVEfmt " + b"\x00" * 24
+
+
+@pytest.mark.parametrize(
+    ("head", "fmt", "types"),
+    [
+        (b"\x89PNG\r\n\x1a\n" + b"\x00" * 8, "png", {AssetType.IMAGE}),
+        (b"\xff\xd8\xff\xe0" + b"\x00" * 8, "jpeg", {AssetType.IMAGE}),
+        (b"RIFF\x00\x00\x00\x00WEBPVP8 ", "webp", {AssetType.IMAGE}),
+        (b"RIFF\x00\x00\x00\x00WAVEfmt ", "wav", {AssetType.AUDIO}),
+        (b"ID3\x04\x00", "mp3", {AssetType.AUDIO}),
+        (b"\xff\xfb\x90\x00", "mp3", {AssetType.AUDIO}),
+        (b"\xff\xf1\x50\x80", "aac", {AssetType.AUDIO}),
+        (b"\x00\x00\x00\x18ftypM4A \x00\x00", "m4a", {AssetType.AUDIO}),
+        (b"\x00\x00\x00\x18ftypqt  \x00\x00", "mov", {AssetType.VIDEO}),
+        (b"\x00\x00\x00\x18ftypisom\x00\x00", "mp4", {AssetType.AUDIO, AssetType.VIDEO}),
+        (b"\x1a\x45\xdf\xa3\x00webm", "webm", {AssetType.AUDIO, AssetType.VIDEO}),
+    ],
+)
+def test_sniff_signature(head, fmt, types):
+    """Test that leading bytes map to the right format and candidate types"""
+    assert sniff_signature(head) == (fmt, frozenset(types))
+
+
+def test_sniff_signature_unknown():
+    """Test that unrecognized content is reported as unknown"""
+    assert sniff_signature(b"hello world") is None
+
+
+def test_signature_overrides_extension(tmp_path):
+    """Test that a WebP saved as .png is an image and a WAV saved as .mp4 is audio"""
+    webp = tmp_path / "render.png"
+    Image.new("RGB", (8, 8)).save(webp, format="WEBP")
+    detected = detect_file_type(webp)
+    assert (detected.asset_type, detected.format, detected.source) == (AssetType.IMAGE, "webp", "signature")
+
+    wav = tmp_path / "clip.mp4"
+    wav.write_bytes(_wav_bytes())
+    assert detect_asset_type(wav) == AssetType.AUDIO
+
+
+def test_ambiguous_container_asks_ffprobe(tmp_path, monkeypatch):
+    """Test that a generic MP4 container is decided by its streams, the extension only as a fallback"""
+    head = b"\x00\x00\x00\x18ftypisom" + b"\x00" * 32
+    audio_only = tmp_path / "song.mp4"
+    audio_only.write_bytes(head)
+    monkeypatch.setattr(filetypes, "_type_from_ffprobe", lambda _path: AssetType.AUDIO)
+    assert detect_file_type(audio_only) == filetypes.DetectedType(AssetType.AUDIO, "mp4", "ffprobe")
+
+    clear_detection_cache()
+    monkeypatch.setattr(filetypes, "_type_from_ffprobe", lambda _path: None)  # ffprobe not installed
+    assert detect_file_type(audio_only) == filetypes.DetectedType(AssetType.VIDEO, "mp4", "extension")
+    audio = tmp_path / "song.m4a"
+    audio.write_bytes(head)
+    assert detect_file_type(audio) == filetypes.DetectedType(AssetType.AUDIO, "mp4", "extension")
+
+
+def test_image_extension_without_signature_is_rejected(tmp_path):
+    """Test that a corrupt or mislabelled .png/.jpg is not accepted as an image"""
+    corrupt = tmp_path / "broken.png"
+    corrupt.write_bytes(b"not really a png")
+    mislabelled = tmp_path / "notes.jpg"
+    mislabelled.write_text("plain text")
+
+    assert detect_asset_type(corrupt) is None
+    assert detect_asset_type(mislabelled) is None
+
+
+def test_empty_and_unsupported_files(tmp_path):
+    """Test that empty files and unsupported extensions are rejected"""
+    empty = tmp_path / "truncated.png"
+    empty.write_bytes(b"")
+    assert detect_asset_type(empty) is None
+
+    text = tmp_path / "notes.txt"
+    text.write_bytes(b"\x89PNG\r\n\x1a\n")
+    assert detect_asset_type(text) is None
+    assert detect_asset_type(tmp_path / "missing.png") is None
+
+
+def test_detection_is_cached_until_file_changes(tmp_path, monkeypatch):
+    """Test that repeated lookups do not re-read unchanged files"""
+    path = tmp_path / "image.png"
+    Image.new("RGB", (4, 4)).save(path, format="PNG")
+
+    reads = []
+    original = filetypes._detect
+    monkeypatch.setattr(filetypes, "_detect", lambda *args: reads.append(args) or original(*args))
+
+    assert detect_asset_type(path) == AssetType.IMAGE
+    assert detect_asset_type(path) == AssetType.IMAGE
+    assert len(reads) == 1
+
+    path.write_bytes(_wav_bytes())
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    assert detect_asset_type(path) == AssetType.AUDIO
+    assert len(reads) == 2
@@ -0,0 +1,60 @@
+"""
+Unit tests for tiered file hashing
+
+Tests the quick fingerprint and that every full-hash read path matches hashlib
+"""
+
+import hashlib
+
+from app.core import utils
+from app.core.utils import compute_hash, compute_quick_fingerprint
+
+
+def test_full_hash_matches_hashlib_for_buffered_and_mmap_reads(tmp_path, monkeypatch):
+    """Test that buffered and memory-mapped reads produce the same digest"""
+    path = tmp_path / "clip.mp4"
+    data = bytes(range(256)) * 20000  # ~5 MB, spans several buffers
+    path.write_bytes(data)
+    expected = hashlib.sha256(data).hexdigest()
+
+    assert compute_hash(str(path)) == expected
+
+    monkeypatch.setattr(utils, "HASH_MMAP_THRESHOLD", 1024)
+    monkeypatch.setattr(utils, "HASH_MMAP_SLICE", 1000)
+    assert compute_hash(str(path)) == expected
+
+
+def test_empty_file_hash(tmp_path, monkeypatch):
+    """Test that empty files hash (mmap cannot map zero bytes)"""
+    path = tmp_path / "empty.png"
+    path.write_bytes(b"")
+    monkeypatch.setattr(utils, "HASH_MMAP_THRESHOLD", 0)
+
+    assert compute_hash(str(path)) == hashlib.sha256(b"").hexdigest()
+    assert compute_quick_fingerprint(path).startswith("0-")
+
+
+def test_quick_fingerprint_samples_head_and_tail(tmp_path):
+    """Test that the fingerprint sees size, head and tail but not the middle"""
+    sample = 1024
+    base = bytearray(b"a" * sample * 8)
+
+    original = tmp_path / "original.wav"
+    original.write_bytes(base)
+    fingerprint = compute_quick_fingerprint(original, sample_size=sample)
+    assert fingerprint.startswith(f"{len(base):x}-")
+
+    middle = tmp_path / "middle.wav"
+    middle.write_bytes(base[: sample * 4] + b"b" + base[sample * 4 + 1 :])
+    assert compute_quick_fingerprint(middle, sample_size=sample) == fingerprint
+
+    for offset in (0, len(base) - 1):
+        changed = bytearray(base)
+        changed[offset] = ord("b")
+        other = tmp_path / f"changed_{offset}.wav"
+        other.write_bytes(changed)
+        assert compute_quick_fingerprint(other, sample_size=sample) != fingerprint
+
+    longer = tmp_path / "longer.wav"
+    longer.write_bytes(base + b"a")
+    assert compute_quick_fingerprint(longer, sample_size=sample) != fingerprint
@@ -0,0 +1,29 @@
+"""
+Unit tests for import-time side effects
+
+Tests that importing the backend neither creates the database nor loads
+heavy optional dependencies (see benchmarks/bench_importtime.py)
+"""
+
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+
+
+def test_server_import_is_lazy(tmp_path):
+    """Test that importing the server loads no ML/audio stack and touches no files"""
+    probe = (
+        "import sys; import app.backend.server, app.workers.jobs.bg_remove, app.workers.jobs.thumbnails; "
+        "print(','.join(m for m in ('rembg', 'onnxruntime', 'cv2', 'pydub', 'numpy') if m in sys.modules))"
+    )
+    env = {**os.environ, "PYTHONPATH": str(REPO_ROOT), "DB_PATH": str(tmp_path / "podstudio.db")}
+    result = subprocess.run(
+        [sys.executable, "-c", probe], cwd=tmp_path, env=env, capture_output=True, text=True, timeout=120
+    )
+
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.strip() == ""
+    assert list(tmp_path.iterdir()) == []
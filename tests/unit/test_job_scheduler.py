@@ -0,0 +1,66 @@
+"""
+Unit tests for job admission control
+
+Tests per-kind limits, CPU/RAM budgets and the interactive reserve
+"""
+
+from app.backend.models.entities import JobKind, JobPriority
+from app.workers.scheduler import SlotScheduler, default_priority, parse_kind_limits
+
+
+def test_kind_limits_follow_hardware():
+    """Test that heavy kinds get fewer slots on small machines"""
+    small = SlotScheduler(total_slots=4, cpu_budget=2, ram_budget_gb=2.0)
+    large = SlotScheduler(total_slots=4, cpu_budget=16, ram_budget_gb=32.0)
+
+    assert small.kind_limits[JobKind.BG_REMOVE] == 1
+    assert small.kind_limits[JobKind.THUMBNAIL] == 2
+    assert large.kind_limits[JobKind.BG_REMOVE] == 4
+
+
+def test_batch_jobs_leave_interactive_reserve():
+    """Test that batch work cannot take the reserved thread"""
+    scheduler = SlotScheduler(total_slots=3, cpu_budget=8, ram_budget_gb=8.0, interactive_reserve=1)
+
+    assert scheduler.acquire(JobKind.EXPORT_PACK)
+    assert scheduler.acquire(JobKind.EXPORT_PACK)
+    assert not scheduler.acquire(JobKind.EXPORT_PACK)
+    assert scheduler.acquire(JobKind.THUMBNAIL, JobPriority.INTERACTIVE)
+    assert scheduler.free_slots() == 0
+
+
+def test_budget_blocks_batch_but_not_interactive():
+    """Test that CPU budget admits one oversized job and still serves thumbnails"""
+    scheduler = SlotScheduler(total_slots=4, cpu_budget=1, ram_budget_gb=1.0, interactive_reserve=0)
+
+    assert scheduler.acquire(JobKind.UPSCALE)  # Costs more than the budget, but nothing else runs
+    assert not scheduler.acquire(JobKind.EXPORT_PACK)
+    assert scheduler.acquire(JobKind.THUMBNAIL, JobPriority.INTERACTIVE)
+
+    scheduler.release(JobKind.UPSCALE)
+    assert scheduler.acquire(JobKind.EXPORT_PACK) is False  # Thumbnail still holds the core
+    scheduler.release(JobKind.THUMBNAIL)
+    assert scheduler.acquire(JobKind.EXPORT_PACK)
+
+
+def test_from_hardware_uses_settings(monkeypatch):
+    """Test that limits come from probe data and config overrides"""
+    from app.core import config
+
+    monkeypatch.setattr(config.settings, "worker_threads", 6)
+    monkeypatch.setattr(config.settings, "job_kind_limits", "bg_remove=1,bogus=3")
+    hardware = {"cpu_cores_physical": 8, "ram_available_gb": 16.0}
+
+    scheduler = SlotScheduler.from_hardware(hardware)
+
+    assert scheduler.total_slots == 6
+    assert scheduler.ram_budget_gb == 16.0 * config.settings.job_ram_fraction
+    assert scheduler.kind_limits[JobKind.BG_REMOVE] == 1
+    assert scheduler.kind_limits[JobKind.UPSCALE] == 4
+
+
+def test_defaults_and_parsing():
+    """Test per-kind default priority and limit parsing"""
+    assert default_priority(JobKind.THUMBNAIL) == JobPriority.INTERACTIVE
+    assert default_priority(JobKind.BG_REMOVE) == JobPriority.BATCH
+    assert parse_kind_limits(" upscale=2, ,thumbnail=0") == {JobKind.UPSCALE: 2, JobKind.THUMBNAIL: 1}
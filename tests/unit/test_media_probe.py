@@ -0,0 +1,50 @@
+"""
+Unit tests for media metadata probing
+
+Tests ffprobe JSON parsing and header-only image probing
+"""
+
+from PIL import Image
+
+from app.core.media_probe import parse_ffprobe, probe_file
+
+
+def test_parse_ffprobe_video_with_audio():
+    """Test that video dimensions, duration and audio rate are extracted"""
+    data = {
+        "streams": [
+            {"codec_type": "video", "width": 1920, "height": 1080, "duration": "12.5"},
+            {"codec_type": "audio", "sample_rate": "48000"},
+        ],
+        "format": {"duration": "12.533"},
+    }
+
+    assert parse_ffprobe(data) == {"width": 1920, "height": 1080, "duration": 12.533, "samplerate": 48000}
+
+
+def test_parse_ffprobe_audio_ignores_cover_art():
+    """Test that embedded album art is not reported as video dimensions"""
+    data = {
+        "streams": [
+            {"codec_type": "audio", "sample_rate": "44100", "duration": "184.2"},
+            {"codec_type": "video", "width": 600, "height": 600, "disposition": {"attached_pic": 1}},
+        ],
+        "format": {},
+    }
+
+    assert parse_ffprobe(data) == {"width": None, "height": None, "duration": 184.2, "samplerate": 44100}
+
+
+def test_probe_image_and_failures(tmp_path):
+    """Test image header probing and that failures return None"""
+    image = tmp_path / "poster.png"
+    Image.new("RGB", (300, 200)).save(image)
+    assert probe_file(str(image), "image") == {"width": 300, "height": 200, "duration": None, "samplerate": None}
+
+    broken = tmp_path / "broken.png"
+    broken.write_bytes(b"nope")
+    assert probe_file(str(broken), "image") is None
+
+    audio = tmp_path / "theme.wav"
+    audio.write_bytes(b"RIFF")
+    assert probe_file(str(audio), "audio", ffprobe=str(tmp_path / "no-such-ffprobe")) is None
@@ -0,0 +1,68 @@
+"""
+Unit tests for perceptual hashing
+
+Tests dHash stability under resizing and BK-tree lookups against brute force
+"""
+
+import random
+
+from PIL import Image, ImageDraw
+
+from app.core.phash import BKTree, compute_dhash, hamming_distance
+
+
+def _render(path, size):
+    """Draw the same simple scene at any resolution"""
+    img = Image.new("RGB", size, "white")
+    draw = ImageDraw.Draw(img)
+    w, h = size
+    draw.ellipse((w * 0.1, h * 0.2, w * 0.5, h * 0.7), fill="red")
+    draw.rectangle((w * 0.6, h * 0.1, w * 0.9, h * 0.9), fill="navy")
+    img.save(path)
+
+
+def test_dhash_survives_resize_and_reencode(tmp_path):
+    """Test that a resized JPEG of the same scene hashes (almost) identically"""
+    original = tmp_path / "original.png"
+    resized = tmp_path / "resized.jpg"
+    other = tmp_path / "other.png"
+    _render(original, (512, 512))
+    _render(resized, (200, 200))
+    unrelated = Image.new("RGB", (512, 512), "white")
+    ImageDraw.Draw(unrelated).ellipse((300, 300, 500, 500), fill="black")
+    unrelated.save(other)
+
+    a, b, c = (int(compute_dhash(p), 16) for p in (original, resized, other))
+    assert len(compute_dhash(original)) == 16
+    assert hamming_distance(a, b) <= 4
+    assert hamming_distance(a, c) > 10
+
+
+def test_dhash_returns_none_for_non_images(tmp_path):
+    """Test that undecodable files are skipped instead of failing ingest"""
+    path = tmp_path / "broken.png"
+    path.write_bytes(b"not a png")
+    assert compute_dhash(path) is None
+
+
+def test_bktree_matches_brute_force():
+    """Test that BK-tree search returns exactly the brute-force neighbours"""
+    rng = random.Random(7)
+    hashes = [rng.getrandbits(64) for _ in range(2000)]
+    # Plant near-duplicates of the first hash
+    base = hashes[0]
+    for bits in (1, 3, 6):
+        hashes.append(base ^ sum(1 << rng.randrange(64) for _ in range(bits)))
+
+    tree = BKTree()
+    for item, value in enumerate(hashes):
+        tree.add(value, item)
+    assert len(tree) == len(hashes)
+
+    for radius in (0, 4, 8):
+        expected = sorted(
+            (hamming_distance(base, value), item)
+            for item, value in enumerate(hashes)
+            if hamming_distance(base, value) <= radius
+        )
+        assert tree.search(base, radius) == expected
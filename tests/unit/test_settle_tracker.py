@@ -0,0 +1,115 @@
+"""
+Unit tests for watcher write-completion detection
+
+Tests that files are only released once their size/mtime is stable
+"""
+
+import time
+
+from app.core.watcher import AssetFileHandler, SettleTracker
+
+
+def test_growing_file_is_held_until_quiet(tmp_path):
+    """Test that a file still being written is not released"""
+    settled = []
+    tracker = SettleTracker(settled.append, settle_seconds=0.2)
+    path = tmp_path / "render.mp4"
+
+    path.write_bytes(b"part 1")
+    tracker.touch(path)
+    assert tracker.poll() == []  # first look records size
+
+    time.sleep(0.1)
+    with path.open("ab") as f:
+        f.write(b" part 2")
+    assert tracker.poll() == []  # grew since last poll
+
+    time.sleep(0.25)
+    assert tracker.poll() == [path]
+    assert settled == [path]
+    assert tracker.tracked_count() == 0
+
+
+def test_closed_file_settles_without_waiting(tmp_path):
+    """Test that a close-after-write releases the file once one stat confirms it"""
+    settled = []
+    tracker = SettleTracker(settled.append, settle_seconds=60.0)
+    path = tmp_path / "image.png"
+
+    path.write_bytes(b"png")
+    tracker.touch(path)
+    tracker.mark_closed(path)
+
+    assert tracker.poll() == []  # records the size after the close
+    assert tracker.poll() == [path]
+
+
+def test_closed_file_still_changing_is_held(tmp_path):
+    """Test that a file rewritten after its close event waits for a stable stat"""
+    settled = []
+    tracker = SettleTracker(settled.append, settle_seconds=60.0)
+    path = tmp_path / "image.png"
+
+    path.write_bytes(b"png")
+    tracker.touch(path)
+    tracker.mark_closed(path)
+    assert tracker.poll() == []
+
+    path.write_bytes(b"png, saved again")
+    assert tracker.poll() == []
+    assert tracker.poll() == [path]
+
+
+def test_close_of_untracked_path_is_ignored(tmp_path):
+    """Test that a bare close event does not start tracking a file"""
+    tracker = SettleTracker([].append, settle_seconds=0.0)
+    path = tmp_path / "opened.png"
+    path.write_bytes(b"png")
+
+    tracker.mark_closed(path)
+
+    assert tracker.tracked_count() == 0
+    assert tracker.poll() == []
+
+
+def test_vanished_file_is_dropped(tmp_path):
+    """Test that temp files deleted before settling are forgotten"""
+    settled = []
+    tracker = SettleTracker(settled.append, settle_seconds=0.0)
+    path = tmp_path / "temp.png"
+
+    path.write_bytes(b"tmp")
+    tracker.touch(path)
+    path.unlink()
+
+    assert tracker.poll() == []
+    assert tracker.tracked_count() == 0
+    assert settled == []
+
+
+def test_recent_files_are_evicted(tmp_path):
+    """Test that the debounce map does not grow without bound"""
+
+    class _Pipeline:
+        def __init__(self):
+            self.submitted = []
+
+        def submit(self, path):
+            self.submitted.append(path)
+
+    pipeline = _Pipeline()
+    handler = AssetFileHandler(pipeline, settle_seconds=0.0)
+    handler._debounce_seconds = 0.05
+    handler._max_recent_files = 10
+
+    for idx in range(50):
+        handler._on_settled(tmp_path / f"file_{idx}.png")
+    assert len(handler._recent_files) <= 10
+
+    # Repeat within the window is debounced, after the window it is not
+    handler._on_settled(tmp_path / "file_49.png")
+    assert len(pipeline.submitted) == 50
+    time.sleep(0.1)
+    handler._on_settled(tmp_path / "file_49.png")
+    assert len(pipeline.submitted) == 51
+    assert len(handler._recent_files) == 1
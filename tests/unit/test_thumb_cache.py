@@ -0,0 +1,120 @@
+"""
+Unit tests for the content-keyed thumbnail cache
+
+Tests key invalidation on edit, reuse after a move, LRU eviction under the
+byte budget, index rebuild from disk and stats
+"""
+
+import os
+from pathlib import Path
+
+import pytest
+from PIL import Image
+
+from app.core import thumbnails
+from app.core.thumb_cache import ThumbnailCache
+
+
+@pytest.fixture
+def cache_root(tmp_path, monkeypatch):
+    """Point the module cache at a temporary cache_root"""
+    from app.core import config
+
+    monkeypatch.setattr(config.settings, "cache_root", str(tmp_path / "Cache"))
+    thumbnails.reset_thumbnail_cache()
+    yield tmp_path / "Cache"
+    thumbnails.reset_thumbnail_cache()
+
+
+def _put(cache: ThumbnailCache, key: str, size: int):
+    temp_path = cache.temp_path_for(key)
+    temp_path.parent.mkdir(parents=True, exist_ok=True)
+    temp_path.write_bytes(b"x" * size)
+    return cache.put(key, temp_path)
+
+
+def test_key_follows_content_not_path(tmp_path):
+    """Test that editing changes the key and moving or copying keeps it"""
+    cache = ThumbnailCache(tmp_path / "thumbs", max_bytes=10_000)
+    source = tmp_path / "a.png"
+    Image.new("RGB", (32, 32), "red").save(source)
+    key = cache.key(source, "256")
+
+    copy = tmp_path / "copy.png"
+    copy.write_bytes(source.read_bytes())
+    os.utime(copy, ns=(0, source.stat().st_mtime_ns + 1_000_000))  # Plain copy: fresh mtime
+    assert cache.key(copy, "256") == key
+
+    moved = tmp_path / "moved.png"
+    source.rename(moved)
+    assert cache.key(moved, "256") == key
+    assert cache.key(moved, "128") != key
+
+    Image.new("RGB", (32, 32), "blue").save(moved)
+    os.utime(moved, ns=(0, moved.stat().st_mtime_ns + 1_000_000))
+    assert cache.key(moved, "256") != key
+
+
+def test_lru_eviction_and_rebuild(tmp_path):
+    """Test that the least recently used file goes first, also after a restart"""
+    cache = ThumbnailCache(tmp_path / "thumbs", max_bytes=250)
+    first = _put(cache, "a", 100)
+    os.utime(first, (1, 1))  # Older mtime, as if written long ago
+    _put(cache, "b", 100)
+    assert cache.get("a") == first  # Now most recently used
+
+    _put(cache, "c", 100)
+    assert cache.get("b") is None
+    assert first.exists()
+
+    restarted = ThumbnailCache(tmp_path / "thumbs", max_bytes=150)
+    stats = restarted.get_stats()
+    assert stats["entries"] == 1
+    assert restarted.get("c") is not None  # "a" was older on disk than "c"
+
+    assert cache.get_stats()["evictions"] == 1
+    assert cache.get_stats()["hits"] == 1
+
+
+def test_generate_thumbnail_hits_cache(cache_root, tmp_path):
+    """Test that a second request is a hit and an edit produces a new thumbnail"""
+    source = tmp_path / "photo.png"
+    Image.new("RGB", (640, 480), "green").save(source)
+
+    first = thumbnails.generate_thumbnail(str(source), size=128)
+    assert thumbnails.generate_thumbnail(str(source), size=128) == first
+    assert first.startswith(str(cache_root))
+
+    Image.new("RGB", (640, 480), "yellow").save(source)
+    os.utime(source, ns=(0, source.stat().st_mtime_ns + 1_000_000))
+    assert thumbnails.generate_thumbnail(str(source), size=128) != first
+
+    # 200px is served from the 256 level rendered by the first decode
+    assert thumbnails.generate_thumbnail(str(source), size=200) != first
+    stats = thumbnails.get_thumbnail_cache_stats()
+    assert (stats["hits"], stats["misses"], stats["entries"]) == (2, 2, 8)
+
+
+@pytest.mark.usefixtures("cache_root")
+def test_page_survives_evicted_thumbnail(tmp_path, monkeypatch):
+    """Test that a thumbnail evicted before it is read only turns its own card into a placeholder"""
+    paths = []
+    for i in range(3):
+        path = tmp_path / f"img{i}.png"
+        Image.new("RGB", (320, 240), (i * 80, 0, 0)).save(path)
+        paths.append(str(path))
+
+    generate = thumbnails.generate_thumbnail
+
+    def generate_then_evict(path, size=256):
+        thumb_path = generate(path, size)
+        if path == paths[1]:
+            Path(thumb_path).unlink()  # Another thread's put() evicted it
+        return thumb_path
+
+    monkeypatch.setattr(thumbnails, "generate_thumbnail", generate_then_evict)
+    page = thumbnails.load_thumbnail_page(paths, size=128)
+
+    assert list(page) == paths
+    assert page[paths[0]][:4] == page[paths[2]][:4] == b"RIFF"
+    assert page[paths[1]][:3] == b"\xff\xd8\xff"  # JPEG placeholder
@@ -0,0 +1,118 @@
+"""
+Unit tests for the packed thumbnail store
+
+Tests batched page loads, LRU eviction under the byte budget, stats and
+load_thumbnail_page() with THUMB_STORE=pack
+"""
+
+import sqlite3
+
+import pytest
+from PIL import Image
+from sqlalchemy import event
+
+from app.core import thumbnails
+from app.core.thumb_pack import ThumbnailPack
+
+
+@pytest.fixture
+def pack_store(tmp_path, monkeypatch):
+    """Switch the module store to a pack under a temporary cache_root"""
+    from app.core import config
+
+    monkeypatch.setattr(config.settings, "cache_root", str(tmp_path / "Cache"))
+    monkeypatch.setattr(config.settings, "thumb_store", "pack")
+    thumbnails.reset_thumbnail_cache()
+    yield thumbnails.get_thumbnail_pack()
+    thumbnails.reset_thumbnail_cache()
+
+
+def _count_selects(pack: ThumbnailPack) -> list[str]:
+    statements = []
+
+    @event.listens_for(pack.engine, "before_cursor_execute")
+    def _record(_conn, _cursor, statement, *_args):
+        if statement.lstrip().upper().startswith("SELECT"):
+            statements.append(statement)
+
+    return statements
+
+
+def test_get_many_and_eviction(tmp_path):
+    """Test that a page is one query and the least recently used rows go first"""
+    pack = ThumbnailPack(tmp_path / "thumbs.pack.db", max_bytes=250)
+    pack.put_many({"a": b"x" * 100, "b": b"y" * 100})
+    assert pack.get("a") == b"x" * 100  # Now more recently used than "b"
+
+    pack.put_many({"c": b"z" * 100})
+    assert set(pack.get_many(["a", "b", "c"])) == {"a", "c"}
+
+    selects = _count_selects(pack)
+    assert pack.get_many([f"k{i}" for i in range(200)] + ["a"]) == {"a": b"x" * 100}
+    assert len(selects) == 1
+
+    stats = pack.get_stats()
+    assert (stats["entries"], stats["bytes"], stats["evictions"]) == (2, 200, 1)
+    assert (stats["hits"], stats["misses"]) == (4, 201)
+    pack.close()
+
+
+def test_reads_do_not_write(tmp_path):
+    """Test that hits only buffer their last use and the byte total follows upserts"""
+    pack = ThumbnailPack(tmp_path / "thumbs.pack.db", max_bytes=10_000)
+    pack.put_many({"a": b"x" * 100, "b": b"y" * 100})
+
+    writes = []
+
+    @event.listens_for(pack.engine, "before_cursor_execute")
+    def _record(_conn, _cursor, statement, *_args):
+        if not statement.lstrip().upper().startswith("SELECT"):
+            writes.append(statement)
+
+    assert pack.get_many(["a", "b"]) == {"a": b"x" * 100, "b": b"y" * 100}
+    assert writes == []
+
+    pack.put_many({"a": b"x" * 40})  # Replaced with a smaller thumbnail
+    assert pack.get_stats()["bytes"] == 140
+    assert pack.clear() == 2
+    assert pack.get_stats()["bytes"] == 0
+    pack.close()
+
+
+def test_old_layout_is_rebuilt(tmp_path):
+    """Test that a pack written before the column reorder is dropped and recreated"""
+    path = tmp_path / "thumbs.pack.db"
+    with sqlite3.connect(path) as connection:
+        connection.execute("CREATE TABLE thumbs (key TEXT PRIMARY KEY, data BLOB, size INTEGER, last_used FLOAT)")
+        connection.execute("INSERT INTO thumbs VALUES ('old', x'00', 1, 0)")
+    connection.close()
+
+    pack = ThumbnailPack(path, max_bytes=10_000)
+    assert pack.get("old") is None
+    pack.put_many({"new": b"n" * 10})
+    assert (pack.get_stats()["entries"], pack.get_stats()["bytes"]) == (1, 10)
+    pack.close()
+
+
+def test_page_load_renders_misses_once(pack_store, tmp_path):
+    """Test that a cold page is rendered into the pack and a warm page is one query"""
+    paths = []
+    for i in range(5):
+        path = tmp_path / f"img{i}.png"
+        Image.new("RGB", (800, 600), (i * 40, 0, 0)).save(path)
+        paths.append(str(path))
+    paths.append(str(tmp_path / "gone.png"))
+
+    cold = thumbnails.load_thumbnail_page(paths, size=128)
+    assert list(cold) == paths
+    assert cold[paths[-1]][:3] == b"\xff\xd8\xff"  # JPEG placeholder
+    assert pack_store.get_stats()["entries"] == 20  # Every level of 5 images
+
+    selects = _count_selects(pack_store)
+    warm = thumbnails.load_thumbnail_page(paths, size=256)
+    assert len(selects) == 1
+    assert not list((tmp_path / "Cache" / "thumbs").glob("*.webp"))  # Nothing written as files
+    for path in paths[:-1]:
+        assert warm[path][:4] == b"RIFF"
+        assert warm[path] != cold[path]
+    assert thumbnails.get_thumbnail_cache_stats()["misses"] == 5
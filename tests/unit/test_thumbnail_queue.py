@@ -0,0 +1,44 @@
+"""
+Unit tests for the grid thumbnail request queue
+
+Tests that visible cards are loaded first, re-prioritization on scroll and
+generations on refresh
+"""
+
+from app.ui.helpers.thumbnail_queue import ThumbnailRequestQueue
+
+
+def test_visible_paths_first_then_grid_order():
+    """Test that on-screen cards are taken before the rest of the grid"""
+    queue = ThumbnailRequestQueue(batch_size=3)
+    queue.reset([f"p{i}" for i in range(8)])
+    queue.set_visible(["p5", "p6"])
+
+    assert queue.next_batch() == ["p5", "p6", "p0"]
+    assert queue.next_batch() == ["p1", "p2", "p3"]
+    assert len(queue) == 2
+
+
+def test_scrolling_reprioritizes_pending():
+    """Test that a new visible set changes what is loaded next"""
+    queue = ThumbnailRequestQueue(batch_size=2)
+    queue.reset([f"p{i}" for i in range(6)])
+    queue.set_visible(["p0", "p1"])
+    assert queue.next_batch() == ["p0", "p1"]
+
+    queue.set_visible(["p4", "p5"])
+    assert queue.next_batch() == ["p4", "p5"]
+    assert queue.next_batch() == ["p2", "p3"]
+    assert queue.next_batch() == []
+
+
+def test_reset_starts_new_generation():
+    """Test that a refresh drops pending paths and the visible set"""
+    queue = ThumbnailRequestQueue()
+    first = queue.reset(["a", "b"])
+    queue.set_visible(["b"])
+
+    assert queue.reset(["c", "a"]) == first + 1
+    assert queue.next_batch() == ["c", "a"]
+    assert queue.reset([]) == first + 2
+    assert queue.next_batch() == []
@@ -0,0 +1,85 @@
+"""
+Unit tests for reduced-size thumbnail loading
+
+Tests that load_thumbnail() drafts JPEGs, keeps aspect ratio and flattens
+alpha/palette/16-bit sources to RGB, and the pyramid built from one decode
+"""
+
+from PIL import Image
+
+from app.core.thumbnails import load_thumbnail, pyramid_level, render_pyramid
+
+
+def test_jpeg_is_decoded_at_reduced_scale(tmp_path):
+    """Test that a large JPEG is drafted instead of decoded at full size"""
+    path = tmp_path / "large.jpg"
+    Image.new("RGB", (4096, 2048), "red").save(path, "JPEG")
+
+    with Image.open(path) as img:
+        thumb = load_thumbnail(img, (256, 256))
+        scale = img.decoderconfig[0]
+
+    assert scale == 4  # 2048 / 4 is still >= 2 * 256
+    assert thumb.size == (256, 128)
+    assert thumb.mode == "RGB"
+
+
+def test_alpha_is_flattened_on_white(tmp_path):
+    """Test that transparent areas become white"""
+    path = tmp_path / "cutout.png"
+    cutout = Image.new("RGBA", (1024, 1024), (255, 0, 0, 255))
+    cutout.paste((0, 0, 0, 0), (0, 0, 512, 1024))
+    cutout.save(path)
+
+    with Image.open(path) as img:
+        thumb = load_thumbnail(img, (128, 128))
+
+    assert thumb.mode == "RGB"
+    assert thumb.getpixel((10, 64)) == (255, 255, 255)
+    assert thumb.getpixel((118, 64)) == (255, 0, 0)
+
+
+def test_palette_and_16bit_sources(tmp_path):
+    """Test that modes without LANCZOS support are converted"""
+    palette = tmp_path / "palette.png"
+    Image.new("RGB", (600, 300), "blue").convert("P").save(palette)
+    deep = tmp_path / "deep.png"
+    Image.new("I;16", (300, 600), 40000).save(deep)
+
+    with Image.open(palette) as img:
+        assert load_thumbnail(img, (100, 100)).size == (100, 50)
+    with Image.open(deep) as img:
+        thumb = load_thumbnail(img, (100, 100))
+        assert (thumb.mode, thumb.size) == ("RGB", (50, 100))
+
+
+def test_pyramid_levels_from_one_decode(tmp_path):
+    """Test that every level is rendered from a single drafted decode"""
+    path = tmp_path / "wide.jpg"
+    Image.new("RGB", (4000, 2000), "purple").save(path, "JPEG")
+
+    with Image.open(path) as img:
+        levels = render_pyramid(img)
+        scale = img.decoderconfig[0]
+
+    assert scale == 1  # 2000 / 2 < 2 * 512
+    assert {level: thumb.size for level, thumb in levels.items()} == {
+        512: (512, 256),
+        256: (256, 128),
+        128: (128, 64),
+        64: (64, 32),
+    }
+
+
+def test_requested_sizes_snap_to_levels():
+    """Test that any grid size maps to the smallest level that covers it"""
+    assert [pyramid_level(size) for size in (16, 64, 65, 128, 200, 256, 512, 2048)] == [
+        64,
+        64,
+        128,
+        128,
+        256,
+        256,
+        512,
+        512,
+    ]